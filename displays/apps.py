@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DisplaysConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "displays"
+
+    def ready(self) -> None:
+        """Import signal handlers when the app is ready."""
+
+        # Import registers the hooks that keep the screen index in sync.
+        from . import signals  # noqa: F401
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+"""Pre-render the next day's display payloads shortly before local midnight.
+
+خروجی صفحه‌نمایش‌های وابسته به تاریخ در نیمه‌شب منقضی می‌شود. این فرمان خروجی
+روز بعد را یک‌بار می‌سازد و خارج می‌شود تا نخستین درخواست‌های کیوسک‌ها در روز
+جدید همزمان به بازسازی نیفتند. زمان‌بندی اجرا (مثلاً چند دقیقه پیش از نیمه‌شب)
+بر عهدهٔ cron یا زمان‌بند استقرار است::
+
+    58 23 * * * python manage.py prewarm_display_payloads
+
+The payloads are written to the default cache, which must be shared with the
+web workers; with the local-memory backend they would die with this process.
+"""
+
+import time as time_module
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from displays.services import display_cache, display_service
+from institutions.models import Institution
+
+
+class Command(BaseCommand):
+    help = "Pre-warm tomorrow's payloads of date-dependent display screens (run shortly before midnight)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--institution",
+            type=int,
+            help="Only warm the screens of this institution id.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Accepted for existing schedules; the command always runs once.",
+        )
+
+    def handle(self, *args, **options):
+        if not display_cache.is_cache_shared():
+            raise CommandError(
+                "The default cache is local to this process; pre-warmed payloads would "
+                "never reach the web workers. Configure a shared cache backend."
+            )
+
+        institution = None
+        if options["institution"] is not None:
+            institution = Institution.objects.filter(
+                id=options["institution"], is_deleted=False
+            ).first()
+            if institution is None:
+                raise CommandError(f"Institution {options['institution']} does not exist.")
+
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        started = time_module.monotonic()
+        count = display_service.prewarm_next_day_payloads(institution, for_date=tomorrow)
+        self.stdout.write(
+            f"Pre-warmed {count} display payload(s) for {tomorrow.isoformat()} "
+            f"in {time_module.monotonic() - started:.2f}s"
+        )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+"""Build and cache the payloads of every active display screen in parallel.
+
+پس از استقرار یا پاک‌شدن کش اجرا می‌شود تا نخستین درخواست کیوسک‌ها به کش گرم
+برسد و زمان ساخت و تعداد کوئری هر صفحه‌نمایش گزارش شود.
+
+With a process-local cache (the default ``LocMemCache``) the payloads built
+by worker processes would be discarded, so the command then builds in its
+own process and warns that the web workers do not benefit.
+"""
+
+import os
+import time as time_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from displays.services import display_cache, display_warmup
+from institutions.models import Institution
+
+
+class Command(BaseCommand):
+    help = "Pre-warm the public payload cache of all active display screens."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--institution",
+            type=int,
+            help="Only warm the screens of this institution id.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (1 builds in the current process).",
+        )
+
+    def handle(self, *args, **options):
+        institution = None
+        if options["institution"] is not None:
+            institution = Institution.objects.filter(id=options["institution"]).first()
+            if institution is None:
+                raise CommandError(f"Institution {options['institution']} does not exist.")
+
+        workers = display_warmup.effective_workers(options["workers"])
+        if not display_cache.is_cache_shared():
+            self.stderr.write(
+                self.style.WARNING(
+                    "The default cache is local to this process: payloads are built in a "
+                    "single process and the web workers will not see them. Configure a "
+                    "shared cache backend to warm kiosks."
+                )
+            )
+
+        screen_ids = display_warmup.list_screen_ids_to_warm(institution)
+        started = time_module.monotonic()
+        failures = 0
+        total_queries = 0
+        for result in display_warmup.warm_screens(screen_ids, workers=workers):
+            total_queries += result.queries
+            label = result.slug or f"#{result.screen_id}"
+            if result.error:
+                failures += 1
+                self.stderr.write(f"{label}: failed after {result.seconds * 1000:.1f} ms ({result.error})")
+                continue
+            self.stdout.write(
+                f"{label}: {result.seconds * 1000:.1f} ms, {result.queries} queries"
+            )
+
+        elapsed = time_module.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {len(screen_ids) - failures}/{len(screen_ids)} display screen(s) "
+                f"in {elapsed:.2f}s ({total_queries} queries)."
+            )
+        )
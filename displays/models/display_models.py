@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import secrets
-from typing import Dict
 
 from django.core.exceptions import ValidationError
 from django.db import models
@@ -15,17 +14,9 @@ from professors.models import Professor
 from semesters.models import Semester
 from schedules.models import ClassSession
 
-# Mapping Python's weekday index to the Persian choices used in ClassSession
-PY_WEEKDAY_TO_PERSIAN: Dict[int, str] = {
-    5: "شنبه",
-    6: "یکشنبه",
-    0: "دوشنبه",
-    1: "سه‌شنبه",
-    2: "چهارشنبه",
-    3: "پنجشنبه",
-    4: "جمعه",
-}
-
+# Path segments routed before ``<slug>/`` in the public display URLs; screens
+# never receive them as slugs.
+RESERVED_SCREEN_SLUGS = frozenset({"batch"})
 
 class DisplayScreen(BaseModel):
     """Public-facing playlist grouping for one or more display filters."""
@@ -191,7 +182,10 @@ class DisplayScreen(BaseModel):
             base_slug = slugify(self.title) or secrets.token_hex(4)
             slug_candidate = base_slug
             counter = 1
-            while type(self).objects_with_deleted.filter(slug=slug_candidate).exclude(pk=self.pk).exists():
+            while (
+                slug_candidate in RESERVED_SCREEN_SLUGS
+                or type(self).objects_with_deleted.filter(slug=slug_candidate).exclude(pk=self.pk).exists()
+            ):
                 slug_candidate = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug_candidate
@@ -5,6 +5,9 @@ from .display_screen_repository import (
     get_display_screen_by_slug,
     update_display_screen_fields,
     soft_delete_display_screen,
+    list_active_display_screens_by_institution,
+    list_active_display_screens,
+    list_active_display_screens_by_slugs,
 )
 
 __all__ = [
@@ -14,4 +17,7 @@ __all__ = [
     "get_display_screen_by_slug",
     "update_display_screen_fields",
     "soft_delete_display_screen",
+    "list_active_display_screens_by_institution",
+    "list_active_display_screens",
+    "list_active_display_screens_by_slugs",
 ]
@@ -61,3 +61,19 @@ def list_active_display_screens_by_institution(institution) -> QuerySet[DisplayS
     )
 
 
+
+
+def list_active_display_screens() -> QuerySet[DisplayScreen]:
+    return (
+        DisplayScreen.objects.filter(is_deleted=False, is_active=True)
+        .select_related("institution", "filter_classroom__building")
+        .order_by("institution_id", "title")
+    )
+
+
+def list_active_display_screens_by_slugs(slugs) -> QuerySet[DisplayScreen]:
+    return DisplayScreen.objects.filter(
+        slug__in=slugs,
+        is_deleted=False,
+        is_active=True,
+    ).select_related("institution", "filter_classroom__building")
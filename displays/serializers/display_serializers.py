@@ -6,7 +6,11 @@ from rest_framework import serializers
 
 from courses.models import Course
 from displays.models import DisplayScreen
-from displays.utils import compute_filter_day_of_week, compute_filter_week_type
+from displays.utils import (
+    compute_filter_day_of_week,
+    compute_filter_week_type,
+    resolve_screen_semesters,
+)
 from locations.models import Building, Classroom
 from professors.models import Professor
 from schedules.models import ClassSession
@@ -16,6 +20,24 @@ DAY_CHOICES = {choice for choice, _ in ClassSession.DAY_OF_WEEK_CHOICES}
 WEEK_TYPE_CHOICES = {choice for choice, _ in ClassSession.WeekTypeChoices.choices}
 
 
+class DisplayScreenListSerializer(serializers.ListSerializer):
+    """Resolve per-screen lookups for a whole page before serializing rows.
+
+    Reference semesters are fetched with one query and memoized in the
+    serializer context, so listing a page costs a constant number of queries.
+    """
+
+    def to_representation(self, data):
+        screens = list(data.all() if hasattr(data, "all") else data)
+        resolved = self.context.setdefault("resolved_semesters", {})
+        missing = [screen for screen in screens if screen.pk not in resolved]
+        if missing:
+            resolved.update(resolve_screen_semesters(missing))
+            for screen in missing:
+                resolved.setdefault(screen.pk, None)
+        return super().to_representation(screens)
+
+
 class DisplayScreenSerializer(serializers.ModelSerializer):
     """Expose screen configuration alongside computed filter metadata.
 
@@ -31,6 +53,7 @@ class DisplayScreenSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DisplayScreen
+        list_serializer_class = DisplayScreenListSerializer
         fields = [
             "id",
             "institution",
@@ -78,22 +101,37 @@ class DisplayScreenSerializer(serializers.ModelSerializer):
         )
 
     def get_filter_computed_day_of_week(self, obj: DisplayScreen) -> str | None:
+        resolved = self.context.get("resolved_filter")
+        if resolved is not None:
+            return resolved.day_of_week
         return compute_filter_day_of_week(obj)
 
     def get_filter_computed_week_type(self, obj: DisplayScreen) -> str | None:
+        resolved = self.context.get("resolved_filter")
+        if resolved is not None:
+            return resolved.week_type
+        semesters = self.context.get("resolved_semesters")
+        if semesters is not None and obj.pk in semesters:
+            return compute_filter_week_type(obj, semester=semesters[obj.pk])
         return compute_filter_week_type(obj)
 
     def get_institution_logo_url(self, obj: DisplayScreen) -> str | None:
         institution = obj.institution
         if not institution or not institution.logo:
             return None
+        # Screens of one institution share the logo; the URL is built once per
+        # serializer call.
+        logo_urls = self.context.setdefault("institution_logo_urls", {})
+        if institution.pk in logo_urls:
+            return logo_urls[institution.pk]
         request = self.context.get("request") if hasattr(self, "context") else None
         try:
             url = institution.logo.url
         except ValueError:
-            return None
-        if request is not None:
-            return request.build_absolute_uri(url)
+            url = None
+        if url is not None and request is not None:
+            url = request.build_absolute_uri(url)
+        logo_urls[institution.pk] = url
         return url
 
 
@@ -345,6 +383,9 @@ class DisplayPublicFilterSerializer(serializers.Serializer):
     خروجی شامل شناسه و برچسب برای selectorهای فعال است و علاوه بر مقادیر
     خام، فیلدهای محاسباتی ``computed_day_of_week`` و ``computed_week_type`` را
     نیز ارائه می‌دهد تا نحوهٔ اعمال فیلتر برای بیننده شفاف باشد.
+
+    When the caller already resolved the filter plan it can pass the result as
+    ``context["resolved_filter"]`` so the computed values are not derived again.
     """
 
     def to_representation(self, instance: DisplayScreen) -> dict[str, Any]:  # type: ignore[override]
@@ -361,6 +402,14 @@ class DisplayPublicFilterSerializer(serializers.Serializer):
                 label = str(value)
             return {"id": value.id, "label": label}
 
+        resolved = self.context.get("resolved_filter")
+        if resolved is not None:
+            computed_day_of_week = resolved.day_of_week
+            computed_week_type = resolved.week_type
+        else:
+            computed_day_of_week = compute_filter_day_of_week(instance)
+            computed_week_type = compute_filter_week_type(instance)
+
         professor = instance.filter_professor
         professor_label = None
         if professor:
@@ -382,8 +431,8 @@ class DisplayPublicFilterSerializer(serializers.Serializer):
             if instance.filter_end_time
             else None,
             "capacity": instance.filter_capacity,
-            "computed_day_of_week": compute_filter_day_of_week(instance),
-            "computed_week_type": compute_filter_week_type(instance),
+            "computed_day_of_week": computed_day_of_week,
+            "computed_week_type": computed_week_type,
             "day_of_week": instance.filter_day_of_week,
             "week_type": instance.filter_week_type,
             "use_current_day_of_week": instance.filter_use_current_day_of_week,
@@ -439,7 +488,7 @@ class DisplayPublicPayloadSerializer(serializers.Serializer):
         screen = instance.get("filter") or instance.get("screen")
         if not screen:
             return None
-        return DisplayPublicFilterSerializer(screen).data
+        return DisplayPublicFilterSerializer(screen, context=self.context).data
 
     def get_institution(self, instance: dict[str, Any]) -> dict[str, Any] | None:
         screen = instance.get("screen")
@@ -7,6 +7,7 @@ from .display_service import (
     delete_display_screen,
     get_display_screen_by_slug_or_404,
     build_public_payload,
+    resolve_public_payload,
     invalidate_screen_cache,
 )
 
@@ -19,5 +20,6 @@ __all__ = [
     "delete_display_screen",
     "get_display_screen_by_slug_or_404",
     "build_public_payload",
+    "resolve_public_payload",
     "invalidate_screen_cache",
 ]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+"""Thread pool used to rebuild display payloads outside the request path.
+
+بازسازی خروجی صفحه‌نمایش‌ها در حالت «stale-while-revalidate» به این صف سپرده
+می‌شود تا درخواست کیوسک بلافاصله با آخرین خروجی معتبر پاسخ داده شود.
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# A small pool is enough: rebuilds are single-flight per payload key.
+MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="display-refresh")
+
+
+def _run(task: Callable[..., object], *args, **kwargs) -> None:
+    try:
+        task(*args, **kwargs)
+    except Exception:  # pragma: no cover - logged for operators
+        logger.exception("Background display payload refresh failed.")
+    finally:
+        # Worker threads open their own database connections; close them so
+        # long-lived pool threads never hold stale or broken connections.
+        connections.close_all()
+
+
+def submit(task: Callable[..., object], *args, **kwargs) -> Future:
+    """Schedule ``task`` on the background refresh pool.
+
+    Args:
+        task: تابعی که باید در پس‌زمینه اجرا شود.
+
+    Returns:
+        Future: شیء آینده برای پیگیری اجرای کار.
+    """
+
+    return _executor.submit(_run, task, *args, **kwargs)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+"""Versioned multi-day bundles that let kiosks pick the current day locally.
+
+کیوسک‌ها عمدتاً به این دلیل هر دقیقه خروجی را دوباره می‌گیرند که «امروز» و نوع
+هفتهٔ زوج/فرد در سرور محاسبه می‌شود. بستهٔ چندروزه خروجی صفحه‌نمایش را برای
+چند روز آینده (به همراه نوع هفتهٔ تقویم ترم، لغوها و جلسات جبرانی) یک‌جا ارائه
+می‌کند تا دستگاه روز جاری را خودش انتخاب کند و فقط با تغییر نسخهٔ بسته دوباره
+همگام شود.
+
+Sessions of all days share one compact string table (see
+:mod:`displays.services.payload_compaction`); each day references a slice of
+it through ``offset`` and ``count``.
+"""
+
+import math
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from displays.models import DisplayScreen
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
+from displays.services import display_cache, display_service, payload_compaction, payload_expiry
+from displays.services.filter_plan import get_filter_plan
+from displays.utils import resolve_filter_semester
+from schedules.models import ClassSession
+from schedules.services.timetable_version import get_timetable_version
+
+BUNDLE_DEFAULT_DAYS = 7
+BUNDLE_MAX_DAYS = 14
+
+# Top-level payload keys that are replaced by per-day data in the bundle.
+_PER_DAY_KEYS = frozenset({"sessions", "generated_at", "version", "filter"})
+
+
+def _bundle_cache_key(screen: DisplayScreen, start: date, days: int) -> str:
+    # Any timetable edit of the institution may touch a future day that the
+    # screen's invalidation index (evaluated for today) does not see, so the
+    # timetable version is part of the key as well.
+    global_gen, institution_gen, screen_gen = display_cache.get_generations(screen)
+    timetable_version = get_timetable_version(screen.institution_id)
+    return (
+        f"display:bundle:{screen.slug}:{global_gen}.{institution_gen}.{screen_gen}:"
+        f"{timetable_version}:{start.isoformat()}:{days}"
+    )
+
+
+def build_display_bundle(screen: DisplayScreen, *, start: date, days: int) -> dict:
+    """Render the payloads of ``days`` consecutive days starting at ``start``.
+
+    Screens whose filters do not depend on the date are rendered once and
+    every day points at the same slice of the session table.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        start: نخستین روز بسته.
+        days: تعداد روزها.
+
+    Returns:
+        dict: بستهٔ شامل متادیتای صفحه‌نمایش، جدول فشردهٔ جلسات و فهرست روزها.
+    """
+
+    plan = get_filter_plan(screen)
+    week_reference_start = plan.week_reference_start
+    if week_reference_start is None:
+        # Screens without automatic week types still get the calendar of the
+        # semester they show (or the institution's active semester).
+        week_reference_start = getattr(resolve_filter_semester(screen), "start_date", None)
+    sessions: list = []
+    day_entries: list = []
+    metadata: dict = {}
+    static_slice = None
+
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if static_slice is None:
+            payload = display_service.render_payload_for_date(screen, day)
+            if not metadata:
+                metadata = {
+                    key: value for key, value in payload.items() if key not in _PER_DAY_KEYS
+                }
+            day_sessions = payload.get("sessions", [])
+            day_slice = (len(sessions), len(day_sessions))
+            sessions.extend(day_sessions)
+            day_filter = payload.get("filter")
+            if not plan.is_date_dependent:
+                static_slice = day_slice
+        else:
+            day_slice = static_slice
+        day_entries.append(
+            {
+                "date": day,
+                "day_of_week": PY_WEEKDAY_TO_PERSIAN[day.weekday()],
+                "week_type": ClassSession.week_type_for_date(week_reference_start, day),
+                "filter": day_filter,
+                "offset": day_slice[0],
+                "count": day_slice[1],
+            }
+        )
+
+    return {
+        **metadata,
+        "valid_from": start,
+        "valid_until": start + timedelta(days=days - 1),
+        "days": day_entries,
+        "sessions": payload_compaction.compact_sessions(sessions),
+        "layout": payload_compaction.COMPACT_LAYOUT,
+        "generated_at": timezone.now(),
+    }
+
+
+def get_display_bundle(
+    screen: DisplayScreen,
+    *,
+    days: int = BUNDLE_DEFAULT_DAYS,
+) -> tuple[dict, str]:
+    """Return the cached bundle of ``screen`` starting today, with its ETag.
+
+    The bundle is rebuilt when the screen, its institution or the timetable
+    changes, and at local midnight when the window moves.  ``version`` is the
+    content hash, so kiosks only re-sync when something they show changed.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        days: تعداد روزهای بسته (بین ۱ و :data:`BUNDLE_MAX_DAYS`).
+
+    Returns:
+        tuple[dict, str]: بستهٔ چندروزه و ETag آن.
+    """
+
+    days = min(max(days, 1), BUNDLE_MAX_DAYS)
+    now = timezone.localtime()
+    start = now.date()
+    cache_key = _bundle_cache_key(screen, start, days)
+    entry = cache.get(cache_key)
+    if entry is None:
+        bundle = build_display_bundle(screen, start=start, days=days)
+        etag = display_cache.compute_etag(bundle)
+        bundle["version"] = etag.strip('"')
+        entry = {"bundle": bundle, "etag": etag}
+        midnight = payload_expiry.start_of_day(start + timedelta(days=1))
+        cache.set(cache_key, entry, timeout=max(math.ceil((midnight - now).total_seconds()), 1))
+    return entry["bundle"], entry["etag"]
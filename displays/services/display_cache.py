@@ -0,0 +1,528 @@
+from __future__ import annotations
+
+"""Generation-counter cache keys for public display payloads.
+
+به‌جای حذف کلید کش تک‌تک صفحه‌نمایش‌ها، سه شمارندهٔ نسل (سراسری، مؤسسه و
+صفحه‌نمایش) در کلید خروجی درج می‌شوند. افزایش اتمیک یک شمارنده تمام
+خروجی‌های وابسته را در یک عملیات بی‌اعتبار می‌کند و بازسازی‌های در جریان نیز
+نمی‌توانند خروجی قدیمی را زیر کلید جدید بنویسند.
+
+The second half of the module protects rebuilds against cache stampedes with
+a per-key single-flight lock and probabilistic early refresh (XFetch).
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import random
+import time as time_module
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from displays.services.filter_plan import get_filter_plan
+
+GLOBAL_GENERATION_KEY = "display:gen:global"
+
+# Backends whose entries never leave the process that wrote them.
+PROCESS_LOCAL_CACHE_BACKENDS = frozenset(
+    {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }
+)
+
+
+def is_cache_shared() -> bool:
+    """Return whether payloads cached here are visible to other processes.
+
+    Pre-warming from a management command only helps the web workers when
+    the default cache is shared (Redis, Memcached, database, file).
+    """
+
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return backend not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def _institution_generation_key(institution_id: int | None) -> str:
+    return f"display:gen:institution:{institution_id}"
+
+
+def _screen_generation_key(screen_id: int | None) -> str:
+    return f"display:gen:screen:{screen_id}"
+
+
+def _initial_generation() -> int:
+    # Counters start from the current time so a counter that was evicted and
+    # recreated never returns to a value used by keys that are still cached.
+    return int(time_module.time() * 1000)
+
+
+def _bump(key: str) -> int:
+    """Atomically advance the counter at ``key`` and return its new value."""
+
+    try:
+        return cache.incr(key)
+    except ValueError:
+        initial = _initial_generation()
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+def get_generations(screen) -> tuple[int, int, int]:
+    """Return the ``(global, institution, screen)`` generations of ``screen``.
+
+    Missing counters are created on the fly; all three are read with a single
+    cache round trip in the common case.
+
+    Args:
+        screen: صفحه‌نمایش (یا هر شیء دارای ``id`` و ``institution_id``).
+
+    Returns:
+        tuple[int, int, int]: شمارنده‌های نسل سراسری، مؤسسه و صفحه‌نمایش.
+    """
+
+    keys = _generation_keys(screen)
+    values = _read_generations(keys)
+    return tuple(values[key] for key in keys)
+
+
+def _generation_keys(screen) -> tuple[str, str, str]:
+    return (
+        GLOBAL_GENERATION_KEY,
+        _institution_generation_key(screen.institution_id),
+        _screen_generation_key(screen.id),
+    )
+
+
+def _read_generations(keys) -> dict[str, int]:
+    values = cache.get_many(list(dict.fromkeys(keys)))
+    for key in keys:
+        if values.get(key) is None:
+            cache.add(key, _initial_generation(), timeout=None)
+            values[key] = cache.get(key)
+    return values
+
+
+def _format_payload_key(screen, generations, for_date: date | None) -> str:
+    global_gen, institution_gen, screen_gen = generations
+    key = f"display:payload:{screen.slug}:{global_gen}.{institution_gen}.{screen_gen}"
+    if get_filter_plan(screen).is_date_dependent:
+        key = f"{key}:{(for_date or timezone.localdate()).isoformat()}"
+    return key
+
+
+def payload_cache_key(screen, *, for_date: date | None = None) -> str:
+    """Return the cache key of the public payload for the current generations.
+
+    Screens whose filters depend on the current date also embed the local
+    date, so a payload built for yesterday is never served after midnight.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        for_date: تاریخ مرجع برای صفحه‌نمایش‌های وابسته به تاریخ (پیش‌فرض: امروز).
+
+    Returns:
+        str: کلید کش شامل slug، شمارنده‌های نسل و در صورت نیاز تاریخ.
+    """
+
+    return _format_payload_key(screen, get_generations(screen), for_date)
+
+
+async def apayload_cache_key(screen, *, for_date: date | None = None) -> str:
+    """Async variant of :func:`payload_cache_key` for streaming views.
+
+    Uses the async cache API so long-lived connections check their generations
+    without queueing on the shared sync thread.  The screen's filter plan must
+    already be compiled (see :func:`~displays.services.filter_plan.get_filter_plan`).
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        for_date: تاریخ مرجع برای صفحه‌نمایش‌های وابسته به تاریخ (پیش‌فرض: امروز).
+
+    Returns:
+        str: کلید کش خروجی برای نسل‌های فعلی.
+    """
+
+    keys = _generation_keys(screen)
+    values = await cache.aget_many(list(dict.fromkeys(keys)))
+    for key in keys:
+        if values.get(key) is None:
+            await cache.aadd(key, _initial_generation(), timeout=None)
+            values[key] = await cache.aget(key)
+    return _format_payload_key(screen, tuple(values[key] for key in keys), for_date)
+
+
+def payload_cache_keys(screens) -> dict[int, str]:
+    """Return the payload cache keys of several screens, keyed by screen id.
+
+    The generation counters of all screens are read with one ``get_many``.
+
+    Args:
+        screens: صفحه‌نمایش‌های هدف.
+
+    Returns:
+        dict[int, str]: نگاشت شناسهٔ صفحه‌نمایش به کلید کش خروجی آن.
+    """
+
+    screens = list(screens)
+    keys_by_screen = {screen.id: _generation_keys(screen) for screen in screens}
+    values = _read_generations([key for keys in keys_by_screen.values() for key in keys])
+    return {
+        screen.id: _format_payload_key(
+            screen, tuple(values[key] for key in keys_by_screen[screen.id]), None
+        )
+        for screen in screens
+    }
+
+
+def bump_screen_generation(screen_id: int | None) -> None:
+    """Invalidate every cached payload of a single screen."""
+
+    if screen_id is None:
+        return
+    _bump(_screen_generation_key(screen_id))
+
+
+def bump_institution_generation(institution_id: int | None) -> None:
+    """Invalidate every cached payload of an institution with one increment."""
+
+    if institution_id is None:
+        return
+    _bump(_institution_generation_key(institution_id))
+
+
+def bump_global_generation() -> None:
+    """Invalidate every cached display payload (e.g. after a deployment)."""
+
+    _bump(GLOBAL_GENERATION_KEY)
+
+
+# --- Stampede protection -------------------------------------------------------
+
+# Entries outlive their logical expiry by this many seconds so concurrent
+# readers can keep serving the previous payload while one worker rebuilds it.
+STALE_GRACE_SECONDS = 30
+
+# Longest time past expiry a payload is retained for stale-while-revalidate
+# readers; regular readers ignore entries older than ``STALE_GRACE_SECONDS``.
+STALE_MAX_AGE_SECONDS = 15 * 60
+
+# Upper bound on how long a rebuild may hold the single-flight lock.
+REBUILD_LOCK_TIMEOUT = 10
+
+# How long a reader without any cached copy waits for another worker's rebuild.
+REBUILD_WAIT_SECONDS = 2.0
+REBUILD_POLL_INTERVAL = 0.05
+
+# Payload keys that change on every build or serve without altering content.
+VOLATILE_PAYLOAD_KEYS = frozenset({"generated_at", "is_stale", "stale_seconds", "version"})
+
+# ``beta`` of the XFetch algorithm; values above 1 favour earlier refreshes.
+EARLY_REFRESH_BETA = 1.0
+
+
+def make_entry(payload: dict, *, ttl: int, build_seconds: float) -> dict:
+    """Wrap ``payload`` with the metadata used for early refresh decisions.
+
+    Args:
+        payload: خروجی سریال‌شدهٔ صفحه‌نمایش.
+        ttl: طول عمر منطقی خروجی بر حسب ثانیه.
+        build_seconds: مدت زمان صرف‌شده برای ساخت خروجی.
+
+    Returns:
+        dict: ساختار ذخیره‌شده در کش.
+    """
+
+    return {
+        "payload": payload,
+        "etag": compute_etag(payload),
+        "ttl": ttl,
+        "expires_at": time_module.time() + ttl,
+        "build_seconds": build_seconds,
+    }
+
+
+def compute_etag(payload: dict) -> str:
+    """Return a strong ETag for ``payload`` ignoring its ``generated_at`` stamp.
+
+    Args:
+        payload: خروجی سریال‌شدهٔ صفحه‌نمایش.
+
+    Returns:
+        str: مقدار ETag به همراه علامت نقل‌قول.
+    """
+
+    content = {key: value for key, value in payload.items() if key not in VOLATILE_PAYLOAD_KEYS}
+    encoded = json.dumps(content, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+    return f'"{hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def store_entry(key: str, entry: dict) -> None:
+    cache.set(key, entry, timeout=entry["ttl"] + STALE_MAX_AGE_SECONDS)
+
+
+def restore_entry(key: str, entry: dict) -> None:
+    """Write an updated ``entry`` back without extending its original lifetime."""
+
+    timeout = entry["expires_at"] - time_module.time() + STALE_MAX_AGE_SECONDS
+    if timeout > 0:
+        cache.set(key, entry, timeout=math.ceil(timeout))
+
+
+def seconds_past_expiry(entry: dict, *, now: float | None = None) -> float:
+    """Return how many seconds ``entry`` has outlived its logical expiry (>= 0)."""
+
+    now = time_module.time() if now is None else now
+    return max(now - entry.get("expires_at", 0), 0.0)
+
+
+def is_within_grace(entry: dict, *, now: float | None = None) -> bool:
+    """Return ``True`` while ``entry`` may still be served to regular readers."""
+
+    return seconds_past_expiry(entry, now=now) <= STALE_GRACE_SECONDS
+
+
+def should_refresh(entry: dict, *, now: float | None = None, beta: float = EARLY_REFRESH_BETA) -> bool:
+    """Decide whether ``entry`` should be rebuilt (XFetch early expiration).
+
+    The probability of refreshing rises as the logical expiry approaches and
+    is proportional to how expensive the last rebuild was, so a single early
+    reader normally refreshes the payload before it expires for everyone.
+
+    Args:
+        entry: ساختار ذخیره‌شده توسط :func:`make_entry`.
+        now: زمان فعلی (برای آزمون‌ها).
+        beta: ضریب تمایل به تازه‌سازی زودهنگام.
+
+    Returns:
+        bool: ``True`` اگر خروجی باید بازسازی شود.
+    """
+
+    now = time_module.time() if now is None else now
+    expires_at = entry.get("expires_at", 0)
+    if now >= expires_at:
+        return True
+    build_seconds = entry.get("build_seconds") or 0.0
+    if build_seconds <= 0:
+        return False
+    # ``random.random()`` may return 0.0; ``1 - random()`` keeps log() finite.
+    return now - build_seconds * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+def acquire_rebuild_lock(key: str) -> str | None:
+    """Try to become the single worker that rebuilds ``key``.
+
+    Returns:
+        str | None: توکن قفل در صورت موفقیت، در غیر این صورت ``None``.
+    """
+
+    token = uuid.uuid4().hex
+    if cache.add(_lock_key(key), token, timeout=REBUILD_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release_rebuild_lock(key: str, token: str) -> None:
+    """Release the lock of ``key`` if it is still held with ``token``."""
+
+    lock_key = _lock_key(key)
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def wait_for_entry(key: str, *, timeout: float = REBUILD_WAIT_SECONDS) -> dict | None:
+    """Poll ``key`` while another worker rebuilds it.
+
+    Returns:
+        dict | None: ورودی ساخته‌شده یا ``None`` اگر در زمان مقرر آماده نشود.
+    """
+
+    deadline = time_module.monotonic() + timeout
+    while time_module.monotonic() < deadline:
+        entry = cache.get(key)
+        if entry is not None and is_within_grace(entry):
+            return entry
+        if cache.get(_lock_key(key)) is None:
+            return None
+        time_module.sleep(REBUILD_POLL_INTERVAL)
+    return None
+
+
+# --- Payload versions ----------------------------------------------------------
+
+
+def _head_key(screen_id: int) -> str:
+    return f"display:head:{screen_id}"
+
+
+def _version_counter_key(screen_id: int) -> str:
+    return f"display:version:{screen_id}"
+
+
+def get_payload_version(screen_id: int) -> int | None:
+    """Return the latest payload version recorded for ``screen_id``."""
+
+    head = cache.get(_head_key(screen_id))
+    return head["version"] if head else None
+
+
+def record_payload_version(screen_id: int, etag: str) -> int:
+    """Return the version of a freshly built payload, advancing it on change.
+
+    A rebuild with the same ETag keeps the current version, while different
+    content takes the value returned by an atomic ``incr`` of the per-screen
+    counter, so two workers rebuilding at once never share a version number.
+    The counter is seeded from the clock so it keeps increasing even if the
+    cache evicts it.
+
+    Args:
+        screen_id: شناسهٔ صفحه‌نمایش.
+        etag: ETag خروجی تازه ساخته‌شده.
+
+    Returns:
+        int: شمارهٔ نسخهٔ خروجی.
+    """
+
+    head = cache.get(_head_key(screen_id))
+    if head and head["etag"] == etag:
+        return head["version"]
+    version = _bump(_version_counter_key(screen_id))
+    head = cache.get(_head_key(screen_id))
+    # A concurrent rebuild may already have published a newer version.
+    if not head or head["version"] < version:
+        cache.set(_head_key(screen_id), {"etag": etag, "version": version}, timeout=None)
+    return version
+
+
+# --- Recent version history ----------------------------------------------------
+
+# Number of recent payload versions kept per screen for delta responses.
+VERSION_HISTORY_SIZE = 10
+
+
+def _history_key(screen_id: int, version: int) -> str:
+    # Versions are unique per screen, so each one owns a slot of the ring and
+    # recording never needs a read-modify-write of a shared list.
+    return f"display:history:{screen_id}:{version % VERSION_HISTORY_SIZE}"
+
+
+def session_entry_key(item: dict) -> str:
+    """Return the identity of a session entry inside a payload.
+
+    Canonical sessions and makeups have independent id sequences, so the
+    identity combines ``id`` with the kind of entry.  A cancellation keeps the
+    key of its session and therefore shows up as a modification.
+    """
+
+    kind = "makeup" if item.get("is_makeup") else "session"
+    return f"{kind}:{item.get('id')}"
+
+
+def session_fingerprints(sessions) -> dict[str, str]:
+    """Map every session entry key to a short hash of its content."""
+
+    fingerprints = {}
+    for item in sessions:
+        encoded = json.dumps(item, cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+        fingerprints[session_entry_key(item)] = hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+    return fingerprints
+
+
+def record_version_history(screen_id: int, version: int, sessions) -> None:
+    """Store ``version`` in the ring buffer of recent versions of a screen.
+
+    Args:
+        screen_id: شناسهٔ صفحه‌نمایش.
+        version: نسخهٔ خروجی ساخته‌شده.
+        sessions: فهرست جلسات همان نسخه.
+    """
+
+    cache.set(
+        _history_key(screen_id, version),
+        (version, session_fingerprints(sessions)),
+        timeout=None,
+    )
+
+
+def get_version_fingerprints(screen_id: int, version: int) -> dict[str, str] | None:
+    """Return the session fingerprints of ``version`` if it is still buffered."""
+
+    slot = cache.get(_history_key(screen_id, version))
+    if slot is None or slot[0] != version:
+        return None
+    return slot[1]
+
+
+# --- Pre-rendered response bodies ----------------------------------------------
+
+
+def rendered_body_key(slug: str, etag: str, *, host: str, query: str) -> str:
+    """Return the cache key of an encoded public response page.
+
+    The key is tied to the payload ``etag`` so a new payload version never
+    reuses bodies rendered for the previous one.  ``host`` and ``query`` are
+    part of the key because pagination links are absolute URLs.
+
+    Args:
+        slug: شناسهٔ متنی صفحه‌نمایش.
+        etag: ETag خروجی که بدنه از آن ساخته شده است.
+        host: میزبان و طرح درخواست.
+        query: رشتهٔ پرس‌وجوی نرمال‌شده (شامل ``page`` و ``page_size``).
+
+    Returns:
+        str: کلید کش بدنهٔ رندرشده.
+    """
+
+    digest = hashlib.sha256(f"{etag}|{host}|{query}".encode("utf-8")).hexdigest()[:32]
+    return f"display:body:{slug}:{digest}"
+
+
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESSED_BODY_BYTES = 512
+
+GZIP_COMPRESS_LEVEL = 6
+
+
+def encode_body_variants(body: bytes) -> dict[str, bytes]:
+    """Return ``body`` together with its precompressed content codings.
+
+    ``gzip`` is produced for bodies above :data:`MIN_COMPRESSED_BODY_BYTES`;
+    ``mtime=0`` keeps its output deterministic across workers.
+
+    Args:
+        body: بدنهٔ JSON رمزگذاری‌شده.
+
+    Returns:
+        dict[str, bytes]: نگاشت content-coding (``identity``، ``gzip``) به بایت‌ها.
+    """
+
+    variants = {"identity": body}
+    if len(body) < MIN_COMPRESSED_BODY_BYTES:
+        return variants
+    variants["gzip"] = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+    return variants
+
+
+def get_rendered_body(key: str) -> dict[str, bytes] | None:
+    """Return the stored variants of a rendered body (see :func:`encode_body_variants`)."""
+
+    return cache.get(key)
+
+
+def store_rendered_body(key: str, body: bytes, *, ttl: int) -> dict[str, bytes]:
+    """Compress ``body`` once and store every variant under ``key``."""
+
+    variants = encode_body_variants(body)
+    cache.set(key, variants, timeout=ttl)
+    return variants
@@ -8,12 +8,13 @@ from __future__ import annotations
 دسترسی به پایگاه داده را از طریق لایهٔ مخزن هماهنگ می‌کنند.
 """
 
+import math
+import time as time_module
 from datetime import date, time as time_cls, timedelta
 from typing import Iterable, List
 
 from django.db.models import QuerySet
 from django.core.cache import cache
-from django.db.models import Q
 from django.utils import timezone
 
 from unischedule.core.error_codes import ErrorCodes
@@ -21,24 +22,34 @@ from unischedule.core.exceptions import CustomValidationError
 
 from displays import repositories as display_repository
 from displays.models import DisplayScreen
-from displays.models.display_models import PY_WEEKDAY_TO_PERSIAN
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
 from displays.serializers import (
     DisplayScreenSerializer,
     DisplayScreenWriteSerializer,
     DisplayPublicPayloadSerializer,
 )
-from displays.utils import (
-    compute_filter_day_of_week,
-    compute_filter_week_type,
-    parse_date,
+from displays.services import (
+    background_refresh,
+    display_cache,
+    payload_compaction,
+    payload_expiry,
+    screen_cache,
 )
-from schedules.models import (
-    ClassSession,
-    ClassCancellation,
-    MakeupClassSession,
+from displays.services.filter_plan import (
+    ResolvedFilter,
+    ScreenFilterPlan,
+    get_filter_plan,
+    invalidate_filter_plan,
 )
-
-PERSIAN_TO_PY_WEEKDAY = {value: key for key, value in PY_WEEKDAY_TO_PERSIAN.items()}
+from displays.services.screen_index import IndexedScreen
+from displays.services.timetable_snapshot import (
+    TimetableSnapshot,
+    get_timetable_snapshot,
+    load_timetable_snapshot,
+    resolve_snapshot_scope,
+)
+from displays.utils import format_professor_name
+from schedules.models import ClassSession
 
 DAY_ORDER = {value: index for index, (value, _) in enumerate(ClassSession.DAY_OF_WEEK_CHOICES)}
 
@@ -172,21 +183,27 @@ def update_display_screen(screen: DisplayScreen, data: dict) -> dict:
     )
     _validate_serializer(serializer)
     updated = serializer.save()
-    cache.delete(f"display:{updated.slug}")
+    invalidate_filter_plan(updated)
+    display_cache.bump_screen_generation(updated.id)
+    screen_cache.forget_screen(updated.slug)
     return DisplayScreenSerializer(updated).data
 
 
 def delete_display_screen(screen: DisplayScreen) -> None:
     """Soft delete a screen and purge any cached payloads."""
 
-    slug = screen.slug
     display_repository.soft_delete_display_screen(screen)
-    cache.delete(f"display:{slug}")
+    invalidate_filter_plan(screen)
+    display_cache.bump_screen_generation(screen.id)
+    screen_cache.forget_screen(screen.slug)
 
 
 def get_display_screen_by_slug_or_404(slug: str) -> DisplayScreen:
     """Return a screen by slug regardless of authentication context.
 
+    Warm lookups are answered from the in-process LRU of
+    :mod:`displays.services.screen_cache` without touching the database.
+
     Args:
         slug: شناسهٔ متنی که در URL عمومی استفاده می‌شود.
 
@@ -197,7 +214,7 @@ def get_display_screen_by_slug_or_404(slug: str) -> DisplayScreen:
         CustomValidationError: اگر صفحه‌نمایش یافت نشود.
     """
 
-    screen = display_repository.get_display_screen_by_slug(slug)
+    screen = screen_cache.get_screen(slug, display_repository.get_display_screen_by_slug)
     if not screen:
         raise CustomValidationError(
             message=ErrorCodes.DISPLAY_SCREEN_NOT_FOUND["message"],
@@ -208,46 +225,45 @@ def get_display_screen_by_slug_or_404(slug: str) -> DisplayScreen:
     return screen
 
 
-def _apply_week_type_filter(qs, week_type: str | None):
-    """Apply the appropriate week-type filter for the current selector set.
+def get_screen_with_plan_or_404(slug: str) -> DisplayScreen:
+    """Return a screen by slug with its filter plan already compiled.
 
-    Screens can pin a specific week type (odd/even) but should also include
-    sessions that are marked to occur every week.  This helper encapsulates
-    that behaviour so it can be reused by both cached and uncached payload
-    builders.
+    Used by the async public views: once the plan is compiled, building the
+    payload cache key of the screen no longer needs the database.
 
     Args:
-        qs: کوئری‌ست اولیه‌ای که قرار است فیلتر شود.
-        week_type: مقدار انتخابی (odd/even/every) یا ``None``.
+        slug: شناسهٔ متنی صفحه‌نمایش.
 
     Returns:
-        QuerySet: کوئری‌ست فیلترشده بر اساس نوع هفته.
+        DisplayScreen: نمونهٔ صفحه‌نمایش فعال.
+
+    Raises:
+        CustomValidationError: اگر صفحه‌نمایش یافت نشود.
     """
-    if not week_type:
-        return qs
-    if week_type == ClassSession.WeekTypeChoices.EVERY:
-        return qs.filter(week_type=ClassSession.WeekTypeChoices.EVERY)
-    return qs.filter(
-        Q(week_type=week_type) | Q(week_type=ClassSession.WeekTypeChoices.EVERY)
-    )
 
+    screen = get_display_screen_by_slug_or_404(slug)
+    get_filter_plan(screen)
+    return screen
 
-def _base_session_queryset(screen: DisplayScreen):
-    """Construct the base queryset for class sessions tied to a screen.
+
+def _select_rows(columns: dict, indexes: Iterable[int], conditions) -> List[int]:
+    """Narrow ``indexes`` column by column using the plan ``conditions``.
 
     Args:
-        screen: نمونهٔ صفحه‌نمایش که مؤسسهٔ آن برای فیلتر استفاده می‌شود.
+        columns: جدول ستونی snapshot (جلسات یا جلسات جبرانی).
+        indexes: ردیف‌های کاندید اولیه.
+        conditions: زوج‌های ``(ستون، تابع آزمون)`` حاصل از طرح فیلتر.
 
     Returns:
-        QuerySet: کوئری‌ست اولیه با ``select_related`` مناسب برای کاهش تعداد کوئری‌ها.
+        list[int]: ردیف‌هایی که همهٔ شرط‌ها را پاس می‌کنند، به همان ترتیب ورودی.
     """
-    return (
-        ClassSession.objects.filter(
-            institution=screen.institution,
-            is_deleted=False,
-        )
-        .select_related("course", "professor", "classroom__building", "semester")
-    )
+    selected = list(indexes)
+    for column_name, test in conditions or ():
+        column = columns[column_name]
+        selected = [index for index in selected if test(column[index])]
+        if not selected:
+            break
+    return selected
 
 
 def _sort_sessions(sessions: Iterable[dict]) -> List[dict]:
@@ -287,105 +303,53 @@ def _sort_sessions(sessions: Iterable[dict]) -> List[dict]:
     )
 
 
-def _resolve_target_date(screen: DisplayScreen, computed_day: str | None) -> date | None:
-    """Determine the calendar date that should anchor the payload.
-
-    Args:
-        screen: صفحه‌نمایشی که تنظیمات فیلتر از آن خوانده می‌شود.
-        computed_day: مقدار روز هفته (به فارسی) که از تنظیمات محاسبه شده است.
-
-    Returns:
-        date | None: تاریخ هدف یا ``None`` اگر نیازی به محدودسازی روز نباشد.
-    """
-    override = parse_date(screen.filter_date_override)
-    if override:
-        return override
-
-    if computed_day or screen.filter_use_current_day_of_week or screen.filter_use_current_week_type:
-        base_date = timezone.localdate()
-        if computed_day:
-            weekday = PERSIAN_TO_PY_WEEKDAY.get(computed_day)
-            if weekday is not None:
-                delta = weekday - base_date.weekday()
-                if delta < 0:
-                    delta += 7
-                return base_date + timedelta(days=delta)
-        return base_date
-    return None
-
-
-def _load_cancellations(
-    screen: DisplayScreen, sessions: Iterable[ClassSession], target_date: date | None
-):
-    """Load cancellation instances relevant to the computed session set.
-
-    Args:
-        screen: صفحه‌نمایشی که مؤسسه‌اش مبنای جستجو قرار می‌گیرد.
-        sessions: لیست جلسات اصلی که شناسهٔ آن‌ها برای فیلتر استفاده می‌شود.
-        target_date: تاریخ هدف برای محدودسازی لغوها.
-
-    Returns:
-        dict[int, ClassCancellation]: نگاشت شناسهٔ جلسه به شیء لغو متناظر.
-    """
-    if not target_date:
-        return {}
-    session_ids = [session.id for session in sessions]
-    if not session_ids:
-        return {}
-    cancellations = (
-        ClassCancellation.objects.filter(
-            institution=screen.institution,
-            class_session_id__in=session_ids,
-            date=target_date,
-            is_deleted=False,
-        )
-        .select_related("class_session__professor", "class_session__course")
-    )
-    return {cancellation.class_session_id: cancellation for cancellation in cancellations}
-
-
 def _build_session_payload(
-    session: ClassSession,
+    snapshot: TimetableSnapshot,
+    index: int,
     *,
     target_date: date | None,
-    cancellation: ClassCancellation | None,
 ) -> dict:
     """Construct the API payload for a canonical class session.
 
     Args:
-        session: نمونهٔ جلسه.
+        snapshot: snapshot جدول زمانی مؤسسه.
+        index: شمارهٔ ردیف جلسه در ستون‌های snapshot.
         target_date: تاریخ نهایی نمایش داده شده.
-        cancellation: لغو متناظر (در صورت وجود).
 
     Returns:
         dict: ساختار داده‌ای آماده برای سریالایزر عمومی.
     """
-    professor = session.professor
-    classroom = session.classroom
-    building = classroom.building if classroom else None
-    note = session.note or ""
+    columns = snapshot.sessions
+    session_id = columns["id"][index]
+    note = columns["note"][index] or ""
+    cancellation = None
+    if target_date:
+        cancellation = snapshot.cancellations.get((session_id, target_date))
     cancellation_note = None
     cancellation_reason = None
     status = "scheduled"
     if cancellation:
-        cancellation_reason = cancellation.reason or None
-        cancellation_note = cancellation.note or None
+        reason, cancellation_text = cancellation
+        cancellation_reason = reason or None
+        cancellation_note = cancellation_text or None
         if cancellation_note:
             note = cancellation_note
         status = "cancelled"
 
     return {
-        "id": session.id,
-        "session_id": session.id,
-        "course_title": session.course.title,
-        "professor_name": f"{professor.first_name} {professor.last_name}".strip(),
-        "day_of_week": session.day_of_week,
-        "start_time": session.start_time,
-        "end_time": session.end_time,
-        "week_type": session.week_type,
-        "classroom_title": classroom.title if classroom else None,
-        "building_title": building.title if building else None,
-        "group_code": session.group_code,
+        "id": session_id,
+        "session_id": session_id,
+        "course_title": columns["course_title"][index],
+        "professor_name": format_professor_name(
+            columns["professor_first_name"][index], columns["professor_last_name"][index]
+        ),
+        "day_of_week": columns["day_of_week"][index],
+        "start_time": columns["start_time"][index],
+        "end_time": columns["end_time"][index],
+        "week_type": columns["week_type"][index],
+        "classroom_title": columns["classroom_title"][index],
+        "building_title": columns["building_title"][index],
+        "group_code": columns["group_code"][index],
         "note": note,
         "date": target_date,
         "is_cancelled": bool(cancellation),
@@ -397,30 +361,6 @@ def _build_session_payload(
     }
 
 
-def _week_type_for_date(semester, target_date: date | None) -> str | None:
-    """Compute the week type (odd/even) for a specific calendar date.
-
-    Args:
-        semester: نمونهٔ ترم مرتبط با جلسهٔ کلاس.
-        target_date: تاریخی که باید نوع هفته برای آن تعیین شود.
-
-    Returns:
-        str | None: مقدار نوع هفته یا ``None`` اگر محاسبه امکان‌پذیر نباشد.
-    """
-    if not semester or not target_date:
-        return None
-    start_date = getattr(semester, "start_date", None)
-    if not start_date:
-        return None
-    delta_days = (target_date - start_date).days
-    if delta_days < 0:
-        delta_days = 0
-    weeks_since_start = delta_days // 7
-    if weeks_since_start % 2 == 0:
-        return ClassSession.WeekTypeChoices.ODD
-    return ClassSession.WeekTypeChoices.EVEN
-
-
 def _makeup_matches_week_type(
     *,
     screen_week_type: str | None,
@@ -447,286 +387,570 @@ def _makeup_matches_week_type(
     return date_week_type in valid_types
 
 
-def _build_makeup_payload(makeup: MakeupClassSession) -> dict:
+def _build_makeup_payload(snapshot: TimetableSnapshot, index: int) -> dict:
     """Construct the API payload for a makeup class session.
 
     Args:
-        makeup: نمونهٔ جلسهٔ جبرانی ثبت‌شده.
+        snapshot: snapshot جدول زمانی مؤسسه.
+        index: شمارهٔ ردیف جلسهٔ جبرانی در ستون‌های snapshot.
 
     Returns:
         dict: دیکشنری آماده برای ادغام با لیست جلسات اصلی.
     """
-    session = makeup.class_session
-    professor = session.professor
-    classroom = makeup.classroom
-    building = classroom.building if classroom else None
-    semester = session.semester
-    week_type = _week_type_for_date(semester, makeup.date)
+    columns = snapshot.makeups
+    makeup_date = columns["date"][index]
+    session_id = columns["session_id"][index]
+    session_week_type = columns["session_week_type"][index]
+    week_type = ClassSession.week_type_for_date(columns["semester_start"][index], makeup_date)
     return {
-        "id": makeup.id,
-        "session_id": session.id,
-        "course_title": session.course.title,
-        "professor_name": f"{professor.first_name} {professor.last_name}".strip(),
-        "day_of_week": PY_WEEKDAY_TO_PERSIAN.get(makeup.date.weekday(), session.day_of_week),
-        "start_time": makeup.start_time,
-        "end_time": makeup.end_time,
-        "week_type": week_type or session.week_type,
-        "classroom_title": classroom.title if classroom else None,
-        "building_title": building.title if building else None,
-        "group_code": makeup.group_code or session.group_code,
-        "note": makeup.note or session.note or "",
-        "date": makeup.date,
+        "id": columns["id"][index],
+        "session_id": session_id,
+        "course_title": columns["course_title"][index],
+        "professor_name": format_professor_name(
+            columns["professor_first_name"][index], columns["professor_last_name"][index]
+        ),
+        "day_of_week": PY_WEEKDAY_TO_PERSIAN.get(
+            makeup_date.weekday(), columns["session_day_of_week"][index]
+        ),
+        "start_time": columns["start_time"][index],
+        "end_time": columns["end_time"][index],
+        "week_type": week_type or session_week_type,
+        "classroom_title": columns["classroom_title"][index],
+        "building_title": columns["building_title"][index],
+        "group_code": columns["group_code"][index] or columns["session_group_code"][index],
+        "note": columns["note"][index] or columns["session_note"][index] or "",
+        "date": makeup_date,
         "is_cancelled": False,
         "cancellation_reason": None,
         "cancellation_note": None,
         "status": "makeup",
         "is_makeup": True,
-        "makeup_for_session_id": session.id,
+        "makeup_for_session_id": session_id,
     }
 
 
 def _collect_makeup_payloads(
-    screen: DisplayScreen,
+    snapshot: TimetableSnapshot,
     *,
-    target_date: date | None,
-    computed_week_type: str | None,
+    plan: ScreenFilterPlan,
+    resolved: ResolvedFilter,
 ) -> List[dict]:
     """Gather serialized payloads for makeup sessions that match filters.
 
     Args:
-        screen: صفحه‌نمایش مبنا.
-        target_date: تاریخ انتخاب شده برای نمایش.
-        computed_week_type: نوع هفتهٔ استخراج شده از تنظیمات.
+        snapshot: snapshot جدول زمانی مؤسسهٔ صفحه‌نمایش.
+        plan: طرح فیلتر کامپایل‌شدهٔ صفحه‌نمایش.
+        resolved: مقادیر روز، نوع هفته و تاریخ هدف محاسبه‌شده از طرح.
 
     Returns:
         list[dict]: آرایه‌ای از دیکشنری‌های جلسهٔ جبرانی.
     """
+    target_date = resolved.target_date
     if not target_date:
         return []
 
-    qs = (
-        MakeupClassSession.objects.filter(
-            institution=screen.institution,
-            is_deleted=False,
-            date=target_date,
-        )
-        .select_related(
-            "class_session__course",
-            "class_session__professor",
-            "class_session__semester",
-            "classroom__building",
-        )
+    columns = snapshot.makeups
+    rows = _select_rows(
+        columns, snapshot.makeup_rows_for_date(target_date), plan.makeup_conditions()
     )
 
-    if screen.filter_classroom_id:
-        qs = qs.filter(classroom_id=screen.filter_classroom_id)
-
-    if screen.filter_building_id:
-        qs = qs.filter(classroom__building_id=screen.filter_building_id)
-
-    if screen.filter_course_id:
-        qs = qs.filter(class_session__course_id=screen.filter_course_id)
-
-    if screen.filter_professor_id:
-        qs = qs.filter(class_session__professor_id=screen.filter_professor_id)
-
-    if screen.filter_semester_id:
-        qs = qs.filter(class_session__semester_id=screen.filter_semester_id)
-
-    if screen.filter_start_time:
-        qs = qs.filter(start_time__gte=screen.filter_start_time)
-
-    if screen.filter_end_time:
-        qs = qs.filter(end_time__lte=screen.filter_end_time)
-
     payloads: List[dict] = []
-    for makeup in qs:
-        session = makeup.class_session
-        if screen.filter_capacity is not None:
-            if session.capacity is None or session.capacity < screen.filter_capacity:
+    for index in rows:
+        if plan.capacity is not None:
+            capacity = columns["session_capacity"][index]
+            if capacity is None or capacity < plan.capacity:
                 continue
 
-        if screen.filter_group_code:
-            group_code = screen.filter_group_code
+        if plan.group_code:
             available_codes = {
                 code
-                for code in [makeup.group_code, session.group_code]
+                for code in [columns["group_code"][index], columns["session_group_code"][index]]
                 if code not in (None, "")
             }
-            if group_code not in available_codes:
+            if plan.group_code not in available_codes:
                 continue
 
-        week_type_for_date = _week_type_for_date(session.semester, makeup.date)
+        week_type_for_date = ClassSession.week_type_for_date(
+            columns["semester_start"][index], columns["date"][index]
+        )
         if not _makeup_matches_week_type(
-            screen_week_type=computed_week_type,
-            session_week_type=session.week_type,
+            screen_week_type=resolved.week_type,
+            session_week_type=columns["session_week_type"][index],
             date_week_type=week_type_for_date,
         ):
             continue
 
-        payloads.append(_build_makeup_payload(makeup))
+        payloads.append(_build_makeup_payload(snapshot, index))
 
     return payloads
 
-def _collect_sessions_for_screen(screen: DisplayScreen) -> List[ClassSession]:
-    """Return all sessions that match the screen filter configuration.
 
-    The function centralises the filtering logic so it can be reused when the
-    payload is fetched from cache and when it is rebuilt.  It honours the
-    activation flag, the user-provided selectors, and computed fallbacks such
-    as day-of-week and week-type rules.
+def _collect_sessions_for_screen(
+    snapshot: TimetableSnapshot,
+    *,
+    plan: ScreenFilterPlan,
+    resolved: ResolvedFilter,
+) -> List[int]:
+    """Return the snapshot rows of every session that matches the screen filters.
+
+    Selector interpretation (activation flag, user-provided selectors and
+    computed fallbacks such as day-of-week and week-type rules) lives in the
+    compiled :class:`~displays.services.filter_plan.ScreenFilterPlan`; this
+    function only evaluates the plan conditions against the institution-wide
+    snapshot, so no query is issued per screen.
 
     Args:
-        screen: صفحه‌نمایش که فیلترها از آن خوانده می‌شوند.
+        snapshot: snapshot جدول زمانی مؤسسهٔ صفحه‌نمایش.
+        plan: طرح فیلتر کامپایل‌شده.
+        resolved: مقادیر وابسته به تاریخ که از طرح محاسبه شده‌اند.
 
     Returns:
-        list[ClassSession]: لیست جلساتی که معیارها را پاس می‌کنند.
+        list[int]: شمارهٔ ردیف جلساتی که معیارها را پاس می‌کنند، به ترتیب روز،
+        زمان شروع و عنوان درس.
     """
-    qs = _base_session_queryset(screen)
+    conditions = plan.session_conditions(resolved)
+    candidates = snapshot.session_rows_for_day(resolved.day_of_week if conditions else None)
+    return _select_rows(snapshot.sessions, candidates, conditions)
 
-    if not screen.filter_is_active:
-        return list(qs.order_by("day_of_week", "start_time", "course__title"))
 
-    def _has_value(value) -> bool:
-        if value is None:
-            return False
-        if isinstance(value, str):
-            return value.strip() != ""
-        if isinstance(value, bool):
-            return value
-        return True
+def _render_public_payload(
+    screen: DisplayScreen,
+    *,
+    use_cache: bool = True,
+    today: date | None = None,
+) -> dict:
+    """Compute the public payload of ``screen`` without consulting the payload cache.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        use_cache: اگر ``False`` باشد snapshot جدول زمانی نیز تازه بارگذاری می‌شود.
+        today: تاریخ مرجع فیلترهای وابسته به روز (پیش‌فرض: امروز).
+
+    Returns:
+        dict: ساختار کامل شامل متادیتای فیلتر، جلسات و زمان تولید.
+    """
+    # The compiled plan is resolved once per build; every helper below reuses
+    # the same day/week-type/target-date values instead of re-deriving them.
+    plan = get_filter_plan(screen)
+    resolved = plan.resolve(today)
+    # Every screen of the institution evaluates its plan against the same
+    # in-memory snapshot; the database is only hit when the timetable version
+    # changes.
+    snapshot = get_timetable_snapshot(screen.institution_id, use_cache=use_cache)
+    if not snapshot.covers(resolved.target_date, plan.semester_id):
+        # A date or semester outside the shared snapshot's window (e.g. a
+        # screen edited since the snapshot was loaded) gets a one-off load.
+        snapshot = load_timetable_snapshot(
+            screen.institution_id,
+            scope=resolve_snapshot_scope(
+                screen.institution_id,
+                pinned_dates=[resolved.target_date] if resolved.target_date else (),
+                pinned_semester_ids=[plan.semester_id] if plan.semester_id else (),
+            ),
+        )
+    session_rows = _collect_sessions_for_screen(snapshot, plan=plan, resolved=resolved)
 
-    selectors = [
-        screen.filter_classroom_id,
-        screen.filter_building_id,
-        screen.filter_professor_id,
-        screen.filter_course_id,
-        screen.filter_semester_id,
-        screen.filter_day_of_week,
-        screen.filter_week_type,
-        screen.filter_use_current_day_of_week,
-        screen.filter_use_current_week_type,
-        screen.filter_date_override,
-        screen.filter_group_code,
-        screen.filter_start_time,
-        screen.filter_end_time,
-        screen.filter_capacity,
+    session_payloads = [
+        _build_session_payload(snapshot, index, target_date=resolved.target_date)
+        for index in session_rows
     ]
 
-    has_selector = any(_has_value(value) for value in selectors)
+    makeup_payloads = _collect_makeup_payloads(snapshot, plan=plan, resolved=resolved)
 
-    if not has_selector:
-        return list(qs.order_by("day_of_week", "start_time", "course__title"))
+    sessions = _sort_sessions(session_payloads + makeup_payloads)
+
+    payload_serializer = DisplayPublicPayloadSerializer(
+        {
+            "screen": screen,
+            "filter": screen,
+            "sessions": sessions,
+            "generated_at": timezone.now(),
+        },
+        context={"resolved_filter": resolved},
+    )
+    return payload_serializer.data
 
-    if screen.filter_building_id:
-        qs = qs.filter(classroom__building_id=screen.filter_building_id)
 
-    if screen.filter_semester_id:
-        qs = qs.filter(semester_id=screen.filter_semester_id)
+def render_payload_for_date(screen: DisplayScreen, day: date) -> dict:
+    """Render the public payload of ``screen`` as it should look on ``day``.
 
-    if screen.filter_course_id:
-        qs = qs.filter(course_id=screen.filter_course_id)
+    The payload cache is bypassed; callers such as the multi-day bundle cache
+    the combined result themselves.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        day: تاریخ مرجع فیلترهای وابسته به روز.
 
-    if screen.filter_professor_id:
-        qs = qs.filter(professor_id=screen.filter_professor_id)
+    Returns:
+        dict: خروجی کامل صفحه‌نمایش برای همان روز.
+    """
+    return _render_public_payload(screen, today=day)
 
-    if screen.filter_classroom_id:
-        qs = qs.filter(classroom_id=screen.filter_classroom_id)
 
-    if screen.filter_group_code:
-        qs = qs.filter(group_code=screen.filter_group_code)
+def _render_entry(
+    screen: DisplayScreen,
+    *,
+    use_cache: bool = True,
+    today: date | None = None,
+) -> dict:
+    """Render the payload of ``screen`` into a cache entry (payload, ETag, expiry).
 
-    if screen.filter_start_time:
-        qs = qs.filter(start_time__gte=screen.filter_start_time)
+    The lifetime runs until the next semantic change point of the screen's
+    filters (see :mod:`displays.services.payload_expiry`).  Entries rendered
+    ahead of time for ``today`` start counting from that day's midnight.
+    """
 
-    if screen.filter_end_time:
-        qs = qs.filter(end_time__lte=screen.filter_end_time)
+    started = time_module.monotonic()
+    payload = _render_public_payload(screen, use_cache=use_cache, today=today)
+    plan = get_filter_plan(screen)
+    now = timezone.localtime()
+    if today is not None and today > now.date():
+        day_start = payload_expiry.start_of_day(today)
+        ttl = math.ceil((day_start - now).total_seconds()) + payload_expiry.payload_ttl(
+            plan, day_start
+        )
+    else:
+        ttl = payload_expiry.payload_ttl(plan, now)
+    return display_cache.make_entry(
+        payload,
+        ttl=ttl,
+        build_seconds=time_module.monotonic() - started,
+    )
 
-    if screen.filter_capacity is not None:
-        qs = qs.filter(capacity__gte=screen.filter_capacity)
 
-    computed_day = compute_filter_day_of_week(screen)
-    if computed_day:
-        qs = qs.filter(day_of_week=computed_day)
+def _ensure_version(screen: DisplayScreen, entry: dict, cache_key: str | None = None) -> dict:
+    """Attach the per-screen payload version to ``entry`` (recording it if new).
 
-    computed_week_type = compute_filter_week_type(screen)
-    qs = _apply_week_type_filter(qs, computed_week_type)
+    Prewarmed entries are stored without a version; once it is attached the
+    entry is written back under ``cache_key`` with its original expiry, so
+    later polls do not record the version again.
+    """
 
-    date_override = parse_date(screen.filter_date_override)
-    if date_override:
-        qs = qs.filter(
-            semester__start_date__lte=date_override,
-            semester__end_date__gte=date_override,
+    if entry.get("version") is None:
+        version = display_cache.record_payload_version(screen.id, entry["etag"])
+        display_cache.record_version_history(
+            screen.id, version, entry["payload"].get("sessions", [])
         )
+        entry["version"] = version
+        entry["payload"]["version"] = version
+        if cache_key is not None:
+            display_cache.restore_entry(cache_key, entry)
+    return entry
 
-    return list(qs.order_by("day_of_week", "start_time", "course__title"))
 
+def _rebuild_and_store(screen: DisplayScreen, cache_key: str) -> dict:
+    """Render the entry of ``screen`` and store it under ``cache_key``."""
 
-def build_public_payload(screen: DisplayScreen, *, use_cache: bool = True) -> dict:
-    """Serialize the public payload for a display screen.
+    entry = _ensure_version(screen, _render_entry(screen))
+    display_cache.store_entry(cache_key, entry)
+    return entry
+
+
+def warm_public_payload(screen: DisplayScreen) -> dict:
+    """Rebuild and store the current payload of ``screen`` unconditionally.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+
+    Returns:
+        dict: ورودی ذخیره‌شده در کش (خروجی، ETag و نسخه).
+    """
+    return _rebuild_and_store(screen, display_cache.payload_cache_key(screen))
+
+
+def prewarm_display_screen(screen: DisplayScreen, for_date: date) -> bool:
+    """Render the payload ``screen`` will serve on ``for_date`` ahead of time.
+
+    Only screens whose filters depend on the current date get a separate
+    entry per day; for the others the call is a no-op.  The payload version is
+    assigned lazily when the entry is first served so versions do not move
+    before the day actually starts.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        for_date: روزی که خروجی برای آن ساخته می‌شود.
+
+    Returns:
+        bool: ``True`` اگر ورودی تازه‌ای در کش ذخیره شده باشد.
+    """
+    if not get_filter_plan(screen).is_date_dependent:
+        return False
+    cache_key = display_cache.payload_cache_key(screen, for_date=for_date)
+    display_cache.store_entry(cache_key, _render_entry(screen, today=for_date))
+    return True
+
+
+def prewarm_next_day_payloads(institution=None, *, for_date: date | None = None) -> int:
+    """Pre-render tomorrow's payloads of every date-dependent active screen.
+
+    Meant to run shortly before local midnight so the first kiosk polls of the
+    new day hit a warm cache instead of rebuilding every screen at once.
+
+    Args:
+        institution: در صورت تعیین، فقط صفحه‌نمایش‌های این مؤسسه گرم می‌شوند.
+        for_date: روز هدف (پیش‌فرض: فردا به وقت محلی).
+
+    Returns:
+        int: تعداد خروجی‌های ساخته‌شده.
+    """
+    if for_date is None:
+        for_date = timezone.localdate() + timedelta(days=1)
+    if institution is not None:
+        screens = display_repository.list_active_display_screens_by_institution(institution)
+    else:
+        screens = display_repository.list_active_display_screens()
+    return sum(1 for screen in screens if prewarm_display_screen(screen, for_date))
+
+
+def _refresh_in_background(screen: DisplayScreen, cache_key: str, token: str) -> None:
+    """Rebuild ``cache_key`` on a worker thread and release its lock afterwards."""
+
+    try:
+        _rebuild_and_store(screen, cache_key)
+    finally:
+        display_cache.release_rebuild_lock(cache_key, token)
+
+
+def _with_staleness(payload: dict, entry: dict | None) -> dict:
+    """Annotate ``payload`` with how stale it is relative to its expiry."""
+
+    stale_seconds = int(display_cache.seconds_past_expiry(entry)) if entry else 0
+    annotated = dict(payload)
+    annotated["is_stale"] = stale_seconds > 0
+    annotated["stale_seconds"] = stale_seconds
+    return annotated
+
+
+def _single_flight_rebuild(screen: DisplayScreen, cache_key: str, entry: dict | None) -> dict:
+    """Rebuild ``cache_key`` once across workers, serving ``entry`` to the others."""
+
+    token = display_cache.acquire_rebuild_lock(cache_key)
+    if token is None:
+        if entry is not None:
+            # Another worker is already rebuilding; the previous copy is
+            # still within its grace period.
+            return entry
+        entry = display_cache.wait_for_entry(cache_key)
+        if entry is not None:
+            return entry
+        return _rebuild_and_store(screen, cache_key)
+
+    try:
+        return _rebuild_and_store(screen, cache_key)
+    finally:
+        display_cache.release_rebuild_lock(cache_key, token)
+
+
+def resolve_public_payload(
+    screen: DisplayScreen,
+    *,
+    use_cache: bool = True,
+    stale_while_revalidate: bool = False,
+) -> tuple[dict, str]:
+    """Return the public payload of ``screen`` together with its ETag.
 
     When ``use_cache`` is True a cached copy is returned if available, otherwise
     the session list is calculated, sorted and serialised together with the
     computed filter metadata.  Newly generated payloads are stored in the cache
-    for the screen ``refresh_interval``.
+    until the next semantic change point of the screen filters (local midnight
+    for date-dependent screens), capped at
+    ``payload_expiry.PAYLOAD_MAX_TTL_SECONDS``; timetable edits invalidate
+    them earlier through the cache generations.
+
+    Rebuilds are single-flight: only the worker holding the per-key lock
+    renders the payload while concurrent readers keep serving the previous
+    copy (or briefly wait for the first one).  Entries are also refreshed
+    probabilistically shortly before they expire so expiry does not trigger a
+    burst of identical rebuilds.
+
+    With ``stale_while_revalidate`` the last good payload is returned
+    immediately even past its expiry (up to
+    ``display_cache.STALE_MAX_AGE_SECONDS``) and the rebuild is scheduled on
+    the background pool.  Such payloads carry ``is_stale`` and
+    ``stale_seconds`` next to ``generated_at``.
+
+    The ETag is a content hash computed once when the payload is built; it
+    ignores ``generated_at`` so identical timetables keep the same tag.
 
     Args:
         screen: صفحه‌نمایش هدف.
         use_cache: آیا از کش استفاده شود یا خیر.
+        stale_while_revalidate: آیا خروجی قدیمی فوراً بازگردانده و بازسازی در
+            پس‌زمینه انجام شود.
 
     Returns:
-        dict: ساختار کامل شامل متادیتای فیلتر، جلسات و زمان تولید.
+        tuple[dict, str]: خروجی کامل صفحه‌نمایش و ETag محتوای آن.
     """
-    # Cache keys are namespaced with the ``display:`` prefix so they do not
-    # collide with other app caches; the slug uniquely identifies each screen.
-    cache_key = f"display:{screen.slug}"
-    if use_cache:
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
-
-    base_sessions = _collect_sessions_for_screen(screen)
-    computed_day = compute_filter_day_of_week(screen)
-    computed_week_type = compute_filter_week_type(screen)
-    target_date = _resolve_target_date(screen, computed_day)
-    cancellations = _load_cancellations(screen, base_sessions, target_date)
+    if not use_cache:
+        entry = _render_entry(screen, use_cache=False)
+        payload = entry["payload"]
+        if stale_while_revalidate:
+            payload = _with_staleness(payload, None)
+        return payload, entry["etag"]
+
+    # The key embeds the global, institution and screen generations; bumping
+    # any of them makes older entries unreachable, so a rebuild that started
+    # before an invalidation can only write under an already-retired key.
+    cache_key = display_cache.payload_cache_key(screen)
+    return _resolve_cached_entry(
+        screen, cache_key, cache.get(cache_key), stale_while_revalidate=stale_while_revalidate
+    )
 
-    session_payloads = [
-        _build_session_payload(
-            session,
-            target_date=target_date,
-            cancellation=cancellations.get(session.id),
+
+def _resolve_cached_entry(
+    screen: DisplayScreen,
+    cache_key: str,
+    entry: dict | None,
+    *,
+    stale_while_revalidate: bool,
+) -> tuple[dict, str]:
+    """Turn the cached ``entry`` of ``cache_key`` into a servable payload and ETag."""
+
+    if stale_while_revalidate and entry is not None:
+        if display_cache.should_refresh(entry):
+            token = display_cache.acquire_rebuild_lock(cache_key)
+            if token is not None:
+                try:
+                    background_refresh.submit(_refresh_in_background, screen, cache_key, token)
+                except RuntimeError:  # pragma: no cover - pool shut down
+                    display_cache.release_rebuild_lock(cache_key, token)
+        entry = _ensure_version(screen, entry, cache_key)
+        return _with_staleness(entry["payload"], entry), entry["etag"]
+
+    if entry is not None and not display_cache.is_within_grace(entry):
+        entry = None
+    if entry is None or display_cache.should_refresh(entry):
+        entry = _single_flight_rebuild(screen, cache_key, entry)
+    entry = _ensure_version(screen, entry, cache_key)
+    payload = entry["payload"]
+    if stale_while_revalidate:
+        payload = _with_staleness(payload, None)
+    return payload, entry["etag"]
+
+
+def resolve_public_payloads(
+    slugs: Iterable[str],
+    *,
+    stale_while_revalidate: bool = True,
+) -> tuple[dict[str, tuple[dict, str]], list[str]]:
+    """Resolve the payloads of several screens with batched lookups.
+
+    Screen configurations are read with one query and cached entries with a
+    single ``get_many``; only missing or expired payloads are rebuilt.  The
+    rebuilds share the institution's in-memory timetable snapshot, so the
+    sessions of an institution are loaded at most once per batch.
+
+    Args:
+        slugs: شناسه‌های متنی صفحه‌نمایش‌ها.
+        stale_while_revalidate: همان رفتار :func:`resolve_public_payload`.
+
+    Returns:
+        tuple[dict, list[str]]: نگاشت slug به ``(payload, etag)`` و فهرست slugهای نامعتبر.
+    """
+    slugs = list(dict.fromkeys(slugs))
+    screens = {
+        screen.slug: screen
+        for screen in display_repository.list_active_display_screens_by_slugs(slugs)
+    }
+    cache_keys = display_cache.payload_cache_keys(screens.values())
+    entries = cache.get_many(list(cache_keys.values()))
+
+    resolved: dict[str, tuple[dict, str]] = {}
+    for slug, screen in screens.items():
+        cache_key = cache_keys[screen.id]
+        resolved[slug] = _resolve_cached_entry(
+            screen,
+            cache_key,
+            entries.get(cache_key),
+            stale_while_revalidate=stale_while_revalidate,
         )
-        for session in base_sessions
-    ]
+    missing = [slug for slug in slugs if slug not in screens]
+    return resolved, missing
+
+
+def build_public_payload(
+    screen: DisplayScreen,
+    *,
+    use_cache: bool = True,
+    stale_while_revalidate: bool = False,
+    compact: bool = False,
+) -> dict:
+    """Serialize the public payload for a display screen.
+
+    See :func:`resolve_public_payload` for the caching behaviour.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        use_cache: آیا از کش استفاده شود یا خیر.
+        stale_while_revalidate: آیا خروجی قدیمی فوراً بازگردانده و بازسازی در
+            پس‌زمینه انجام شود.
+        compact: اگر ``True`` باشد جلسات در قالب ستونی با جدول رشته‌ها
+            (:mod:`displays.services.payload_compaction`) بازگردانده می‌شوند.
 
-    makeup_payloads = _collect_makeup_payloads(
+    Returns:
+        dict: ساختار کامل شامل متادیتای فیلتر، جلسات و زمان تولید.
+    """
+    payload, _ = resolve_public_payload(
         screen,
-        target_date=target_date,
-        computed_week_type=computed_week_type,
+        use_cache=use_cache,
+        stale_while_revalidate=stale_while_revalidate,
     )
+    if compact:
+        return payload_compaction.compact_payload(payload)
+    return payload
 
-    sessions = _sort_sessions(session_payloads + makeup_payloads)
 
-    payload_serializer = DisplayPublicPayloadSerializer({
-        "screen": screen,
-        "filter": screen,
-        "sessions": sessions,
-        "generated_at": timezone.now(),
-    })
-    payload = payload_serializer.data
+def build_payload_delta(screen: DisplayScreen, since_version: int) -> dict:
+    """Describe how the session list changed since ``since_version``.
 
-    if use_cache:
-        cache.set(cache_key, payload, timeout=screen.refresh_interval)
-    return payload
+    Entries are matched by :func:`display_cache.session_entry_key` and compared
+    through content fingerprints kept in a small per-screen ring buffer.  When
+    ``since_version`` is no longer buffered the result only carries
+    ``reset=True`` so the client downloads the full payload again.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+        since_version: نسخه‌ای که کلاینت در اختیار دارد.
+
+    Returns:
+        dict: نسخهٔ فعلی به همراه جلسات افزوده، تغییریافته و حذف‌شده.
+    """
+    payload, _ = resolve_public_payload(screen, stale_while_revalidate=True)
+    version = payload.get("version")
+    delta = {"version": version, "since_version": since_version, "reset": False}
+    if version == since_version:
+        delta.update({"added": [], "modified": [], "removed": []})
+        return delta
+
+    previous = display_cache.get_version_fingerprints(screen.id, since_version)
+    if previous is None or version is None or since_version > version:
+        delta["reset"] = True
+        return delta
+
+    sessions = payload.get("sessions", [])
+    current = display_cache.session_fingerprints(sessions)
+    added, modified = [], []
+    for item in sessions:
+        key = display_cache.session_entry_key(item)
+        if key not in previous:
+            added.append(item)
+        elif previous[key] != current[key]:
+            modified.append(item)
+    removed = [key for key in previous if key not in current]
+
+    delta.update(
+        {key: value for key, value in payload.items() if key not in ("sessions", "version")}
+    )
+    delta.update({"added": added, "modified": modified, "removed": removed})
+    return delta
 
 
-def invalidate_screen_cache(screen: DisplayScreen) -> None:
+def invalidate_screen_cache(screen: DisplayScreen | IndexedScreen) -> None:
     """Remove the cached payload for the provided screen.
 
     Args:
-        screen: صفحه‌نمایشی که کش آن باید پاک شود.
+        screen: صفحه‌نمایش (یا ورودی نمایهٔ صفحه‌نمایش‌ها) که کش آن باید پاک شود.
     """
-    # Mirrors the naming strategy in ``build_public_payload`` to target only the
-    # affected screen without disturbing other cached responses.
-    cache.delete(f"display:{screen.slug}")
+    # Retires the screen generation embedded in ``build_public_payload`` keys
+    # without disturbing other cached responses.
+    display_cache.bump_screen_generation(screen.id)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+"""Bulk warming of public display payloads across worker processes.
+
+پس از استقرار یا پاک‌شدن کش، نخستین درخواست همهٔ کیوسک‌ها همزمان هزینهٔ کامل
+ساخت خروجی را می‌پردازد. این ماژول خروجی صفحه‌نمایش‌های فعال را پیش از بازگشت
+ترافیک در چند فرایند موازی می‌سازد؛ هر فرایند اتصال پایگاه دادهٔ مستقل خود را
+باز می‌کند و snapshot جدول زمانی هر مؤسسه را تنها یک‌بار بارگذاری می‌کند.
+
+The cache backend must be shared between processes (Redis, Memcached,
+database); with the local-memory backend whatever a worker process builds is
+lost when it exits, so :func:`warm_screens` only uses a pool when
+:func:`~displays.services.display_cache.is_cache_shared` says so.
+"""
+
+import math
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Sequence
+
+import django
+from django.apps import apps
+from django.db import connection, connections
+
+from displays import repositories as display_repository
+from displays.models import DisplayScreen
+from displays.services import display_cache, display_service
+
+# Screens are handed to workers in contiguous chunks (at most this many); ids are ordered by
+# institution so one worker usually reuses the same timetable snapshot.
+WARMUP_CHUNK_SIZE = 16
+
+
+class _QueryCounter:
+    """``connection.execute_wrapper`` hook that counts executed statements."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@dataclass(frozen=True)
+class ScreenWarmResult:
+    """Outcome of warming one screen."""
+
+    screen_id: int
+    slug: str
+    seconds: float
+    queries: int
+    error: str | None = None
+
+
+def warm_screen(screen_id: int) -> ScreenWarmResult:
+    """Build and cache the payload of one screen, measuring time and queries.
+
+    Args:
+        screen_id: شناسهٔ صفحه‌نمایش فعال.
+
+    Returns:
+        ScreenWarmResult: زمان ساخت، تعداد کوئری‌ها و خطای احتمالی.
+    """
+
+    started = time_module.monotonic()
+    slug = ""
+    queries = _QueryCounter()
+    with connection.execute_wrapper(queries):
+        try:
+            screen = (
+                DisplayScreen.objects.select_related("institution", "filter_classroom__building")
+                .get(id=screen_id, is_active=True)
+            )
+            slug = screen.slug
+            display_service.warm_public_payload(screen)
+        except Exception as exc:  # reported per screen, the batch goes on
+            error = f"{type(exc).__name__}: {exc}"
+        else:
+            error = None
+    return ScreenWarmResult(
+        screen_id=screen_id,
+        slug=slug,
+        seconds=time_module.monotonic() - started,
+        queries=queries.count,
+        error=error,
+    )
+
+
+def _init_worker() -> None:
+    # Spawned workers start without Django; forked ones inherit the parent's
+    # connection objects, which must never be shared across processes.
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def warm_screens(screen_ids: Sequence[int], *, workers: int = 1) -> Iterator[ScreenWarmResult]:
+    """Warm ``screen_ids`` with a pool of ``workers`` processes.
+
+    Callers should pass ``workers=1`` when the cache is not shared (see
+    :func:`effective_workers`).
+
+    Args:
+        screen_ids: شناسهٔ صفحه‌نمایش‌ها، ترجیحاً مرتب بر اساس مؤسسه.
+        workers: تعداد فرایندهای موازی؛ مقدار ۱ یا کمتر یعنی اجرای درون‌فرایندی.
+
+    Returns:
+        Iterator[ScreenWarmResult]: نتیجهٔ هر صفحه‌نمایش به ترتیب ورودی.
+    """
+
+    if workers <= 1 or len(screen_ids) <= 1:
+        for screen_id in screen_ids:
+            yield warm_screen(screen_id)
+        return
+
+    # Close the parent's connections before forking so no worker inherits an
+    # open socket.
+    connections.close_all()
+    chunksize = max(1, min(WARMUP_CHUNK_SIZE, math.ceil(len(screen_ids) / workers)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        yield from executor.map(warm_screen, screen_ids, chunksize=chunksize)
+
+
+def effective_workers(requested: int) -> int:
+    """Return how many worker processes warming may use with the current cache.
+
+    Args:
+        requested: تعداد فرایندهای درخواستی.
+
+    Returns:
+        int: همان مقدار برای کش مشترک؛ ۱ برای کش محلی فرایند.
+    """
+
+    if requested > 1 and not display_cache.is_cache_shared():
+        return 1
+    return max(requested, 1)
+
+
+def list_screen_ids_to_warm(institution=None) -> List[int]:
+    """Return the ids of active screens, grouped by institution."""
+
+    if institution is not None:
+        screens = display_repository.list_active_display_screens_by_institution(institution)
+    else:
+        screens = display_repository.list_active_display_screens()
+    return list(screens.values_list("id", flat=True))
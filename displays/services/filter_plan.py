@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+"""Compiled, hashable filter plans for display screens.
+
+هر صفحه‌نمایش مجموعه‌ای از فیلدهای ``filter_*`` دارد که در هر بار ساخت خروجی
+عمومی دوباره تفسیر می‌شدند. این ماژول آن فیلدها را یک‌بار به یک «طرح فیلتر»
+تغییرناپذیر تبدیل می‌کند تا بازسازی خروجی فقط مقادیر وابسته به تاریخ (روز و
+نوع هفته) را بدون دسترسی به پایگاه داده محاسبه کند.
+"""
+
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from typing import Any, Callable, List, Mapping, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from displays.models import DisplayScreen
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
+from displays.utils import parse_date, resolve_filter_semester
+from schedules.models import ClassSession
+
+PERSIAN_TO_PY_WEEKDAY = {value: key for key, value in PY_WEEKDAY_TO_PERSIAN.items()}
+
+# Plans are cheap to rebuild, so a bounded lifetime keeps the resolved semester
+# reference (used by automatic week-type detection) from drifting for long.
+FILTER_PLAN_TIMEOUT = 60 * 60
+
+# Attribute used to memoise the compiled plan on the screen instance itself.
+_INSTANCE_ATTR = "_compiled_filter_plan"
+
+
+Condition = Tuple[str, Callable[[Any], bool]]
+
+
+def _equals(expected) -> Callable[[Any], bool]:
+    return lambda value: value == expected
+
+
+def _at_least(bound) -> Callable[[Any], bool]:
+    return lambda value: value is not None and value >= bound
+
+
+def _at_most(bound) -> Callable[[Any], bool]:
+    return lambda value: value is not None and value <= bound
+
+
+def _has_value(value) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip() != ""
+    if isinstance(value, bool):
+        return value
+    return True
+
+
+@dataclass(frozen=True)
+class ResolvedFilter:
+    """Date-dependent values derived from a plan for one reference day."""
+
+    day_of_week: str | None
+    week_type: str | None
+    target_date: date | None
+
+
+@dataclass(frozen=True)
+class ScreenFilterPlan:
+    """Immutable snapshot of a screen's selector configuration.
+
+    The plan only holds primitive values so it can be hashed, compared and
+    pickled into the shared cache.  ``week_reference_start`` stores the start
+    date of the semester used for automatic week-type detection, which removes
+    the per-request ``Semester`` lookup performed by
+    :func:`displays.utils.compute_filter_week_type`.
+    """
+
+    screen_id: int | None
+    institution_id: int | None
+    fingerprint: str
+    unfiltered: bool
+    classroom_id: int | None = None
+    building_id: int | None = None
+    course_id: int | None = None
+    professor_id: int | None = None
+    semester_id: int | None = None
+    group_code: str | None = None
+    start_time: time | None = None
+    end_time: time | None = None
+    capacity: int | None = None
+    day_of_week: str | None = None
+    use_current_day_of_week: bool = False
+    week_type: str | None = None
+    use_current_week_type: bool = False
+    date_override: date | None = None
+    week_reference_start: date | None = None
+
+    @property
+    def is_date_dependent(self) -> bool:
+        """Whether the resolved filter (day, week type or target date) moves with ``today``.
+
+        Such plans change meaning at every local midnight; semester week
+        boundaries always fall on a midnight as well.
+        """
+
+        if self.date_override:
+            return False
+        return bool(self.day_of_week or self.use_current_day_of_week or self.use_current_week_type)
+
+    def computed_day_of_week(self, today: date | None = None) -> str | None:
+        """Mirror :func:`displays.utils.compute_filter_day_of_week` in memory."""
+
+        if self.day_of_week:
+            return self.day_of_week
+        if self.date_override:
+            return PY_WEEKDAY_TO_PERSIAN.get(self.date_override.weekday())
+        if self.use_current_day_of_week:
+            today = today or timezone.localdate()
+            return PY_WEEKDAY_TO_PERSIAN.get(today.weekday())
+        return None
+
+    def computed_week_type(self, today: date | None = None) -> str | None:
+        """Mirror :func:`displays.utils.compute_filter_week_type` in memory."""
+
+        if self.week_type:
+            return self.week_type
+        if not self.use_current_week_type or not self.week_reference_start:
+            return None
+        reference_date = self.date_override or today or timezone.localdate()
+        delta_days = max((reference_date - self.week_reference_start).days, 0)
+        if (delta_days // 7) % 2 == 0:
+            return ClassSession.WeekTypeChoices.ODD
+        return ClassSession.WeekTypeChoices.EVEN
+
+    def target_date(self, computed_day: str | None, today: date | None = None) -> date | None:
+        """Return the calendar date that anchors cancellations and makeups."""
+
+        if self.date_override:
+            return self.date_override
+        if computed_day or self.use_current_day_of_week or self.use_current_week_type:
+            base_date = today or timezone.localdate()
+            if computed_day:
+                weekday = PERSIAN_TO_PY_WEEKDAY.get(computed_day)
+                if weekday is not None:
+                    return base_date + timedelta(days=(weekday - base_date.weekday()) % 7)
+            return base_date
+        return None
+
+    def resolve(self, today: date | None = None) -> ResolvedFilter:
+        """Evaluate every date-dependent selector once for ``today``."""
+
+        today = today or timezone.localdate()
+        day = self.computed_day_of_week(today)
+        return ResolvedFilter(
+            day_of_week=day,
+            week_type=self.computed_week_type(today),
+            target_date=self.target_date(day, today),
+        )
+
+    def session_conditions(self, resolved: ResolvedFilter) -> List[Condition] | None:
+        """Return the per-column tests a session must pass for this plan.
+
+        Each condition is a ``(column, test)`` pair where ``column`` names a
+        field of :data:`displays.services.timetable_snapshot.SESSION_COLUMNS`.
+        Returns ``None`` when the screen shows every session of the institution.
+        """
+
+        if self.unfiltered:
+            return None
+        conditions: List[Condition] = []
+        if self.building_id:
+            conditions.append(("building_id", _equals(self.building_id)))
+        if self.semester_id:
+            conditions.append(("semester_id", _equals(self.semester_id)))
+        if self.course_id:
+            conditions.append(("course_id", _equals(self.course_id)))
+        if self.professor_id:
+            conditions.append(("professor_id", _equals(self.professor_id)))
+        if self.classroom_id:
+            conditions.append(("classroom_id", _equals(self.classroom_id)))
+        if self.group_code:
+            conditions.append(("group_code", _equals(self.group_code)))
+        if self.start_time:
+            conditions.append(("start_time", _at_least(self.start_time)))
+        if self.end_time:
+            conditions.append(("end_time", _at_most(self.end_time)))
+        if self.capacity is not None:
+            conditions.append(("capacity", _at_least(self.capacity)))
+        if resolved.day_of_week:
+            conditions.append(("day_of_week", _equals(resolved.day_of_week)))
+        if resolved.week_type:
+            if resolved.week_type == ClassSession.WeekTypeChoices.EVERY:
+                conditions.append(("week_type", _equals(ClassSession.WeekTypeChoices.EVERY)))
+            else:
+                allowed = frozenset({resolved.week_type, ClassSession.WeekTypeChoices.EVERY})
+                conditions.append(("week_type", allowed.__contains__))
+        if self.date_override:
+            conditions.append(("semester_start", _at_most(self.date_override)))
+            conditions.append(("semester_end", _at_least(self.date_override)))
+        return conditions
+
+    def matches_session(self, resolved: ResolvedFilter, values: Mapping[str, Any]) -> bool:
+        """Evaluate :meth:`session_conditions` against a single session row."""
+
+        conditions = self.session_conditions(resolved)
+        if conditions is None:
+            return True
+        return all(test(values.get(column)) for column, test in conditions)
+
+    def makeup_conditions(self) -> List[Condition]:
+        """Return the selector tests applied to makeup rows.
+
+        Makeups have always been filtered by the raw selectors regardless of
+        ``filter_is_active``; the plan keeps that behaviour intact.  Columns
+        refer to :data:`displays.services.timetable_snapshot.MAKEUP_COLUMNS`.
+        """
+
+        conditions: List[Condition] = []
+        if self.classroom_id:
+            conditions.append(("classroom_id", _equals(self.classroom_id)))
+        if self.building_id:
+            conditions.append(("building_id", _equals(self.building_id)))
+        if self.course_id:
+            conditions.append(("course_id", _equals(self.course_id)))
+        if self.professor_id:
+            conditions.append(("professor_id", _equals(self.professor_id)))
+        if self.semester_id:
+            conditions.append(("semester_id", _equals(self.semester_id)))
+        if self.start_time:
+            conditions.append(("start_time", _at_least(self.start_time)))
+        if self.end_time:
+            conditions.append(("end_time", _at_most(self.end_time)))
+        return conditions
+
+
+def _fingerprint(screen: DisplayScreen) -> str:
+    updated_at = getattr(screen, "updated_at", None)
+    return updated_at.isoformat() if updated_at else ""
+
+
+def compile_filter_plan(screen: DisplayScreen) -> ScreenFilterPlan:
+    """Interpret the ``filter_*`` fields of ``screen`` into a plan.
+
+    Args:
+        screen: صفحه‌نمایشی که تنظیمات فیلتر از آن خوانده می‌شود.
+
+    Returns:
+        ScreenFilterPlan: طرح فیلتر تغییرناپذیر و قابل کش.
+    """
+
+    selectors = [
+        screen.filter_classroom_id,
+        screen.filter_building_id,
+        screen.filter_professor_id,
+        screen.filter_course_id,
+        screen.filter_semester_id,
+        screen.filter_day_of_week,
+        screen.filter_week_type,
+        screen.filter_use_current_day_of_week,
+        screen.filter_use_current_week_type,
+        screen.filter_date_override,
+        screen.filter_group_code,
+        screen.filter_start_time,
+        screen.filter_end_time,
+        screen.filter_capacity,
+    ]
+    unfiltered = not screen.filter_is_active or not any(_has_value(value) for value in selectors)
+
+    week_reference_start = None
+    if screen.filter_use_current_week_type and not screen.filter_week_type:
+        semester = resolve_filter_semester(screen)
+        week_reference_start = getattr(semester, "start_date", None)
+
+    return ScreenFilterPlan(
+        screen_id=screen.pk,
+        institution_id=screen.institution_id,
+        fingerprint=_fingerprint(screen),
+        unfiltered=unfiltered,
+        classroom_id=screen.filter_classroom_id,
+        building_id=screen.filter_building_id,
+        course_id=screen.filter_course_id,
+        professor_id=screen.filter_professor_id,
+        semester_id=screen.filter_semester_id,
+        group_code=screen.filter_group_code or None,
+        start_time=screen.filter_start_time,
+        end_time=screen.filter_end_time,
+        capacity=screen.filter_capacity,
+        day_of_week=screen.filter_day_of_week or None,
+        use_current_day_of_week=bool(screen.filter_use_current_day_of_week),
+        week_type=screen.filter_week_type or None,
+        use_current_week_type=bool(screen.filter_use_current_week_type),
+        date_override=parse_date(screen.filter_date_override),
+        week_reference_start=week_reference_start,
+    )
+
+
+def _plan_cache_key(screen: DisplayScreen) -> str:
+    return f"display:plan:{screen.pk}"
+
+
+def get_filter_plan(screen: DisplayScreen) -> ScreenFilterPlan:
+    """Return the compiled plan for ``screen``, compiling it only when needed.
+
+    The plan is memoised on the instance and shared through the cache.  A
+    cached plan is only reused when its fingerprint (the screen's
+    ``updated_at``) still matches, so edits made outside the service layer
+    (e.g. Django admin) are picked up automatically.
+
+    Args:
+        screen: صفحه‌نمایش هدف.
+
+    Returns:
+        ScreenFilterPlan: طرح فیلتر معتبر برای وضعیت فعلی صفحه‌نمایش.
+    """
+
+    fingerprint = _fingerprint(screen)
+    plan = getattr(screen, _INSTANCE_ATTR, None)
+    if plan is not None and plan.fingerprint == fingerprint:
+        return plan
+
+    if screen.pk is not None:
+        plan = cache.get(_plan_cache_key(screen))
+    if plan is None or plan.fingerprint != fingerprint:
+        plan = compile_filter_plan(screen)
+        if screen.pk is not None:
+            cache.set(_plan_cache_key(screen), plan, timeout=FILTER_PLAN_TIMEOUT)
+
+    setattr(screen, _INSTANCE_ATTR, plan)
+    return plan
+
+
+def invalidate_filter_plan(screen: DisplayScreen) -> None:
+    """Drop the compiled plan of ``screen`` from the instance and the cache."""
+
+    if hasattr(screen, _INSTANCE_ATTR):
+        delattr(screen, _INSTANCE_ATTR)
+    if screen.pk is not None:
+        cache.delete(_plan_cache_key(screen))
+
+
+def invalidate_institution_filter_plans(institution) -> None:
+    """Drop the compiled plans of every screen that belongs to ``institution``.
+
+    Semester changes (activation, start date edits) alter the reference used by
+    automatic week-type detection, so every plan of the institution is reset.
+
+    Args:
+        institution: مؤسسه‌ای که طرح فیلتر صفحه‌نمایش‌های آن باید بازسازی شود.
+    """
+
+    keys = [
+        f"display:plan:{screen_id}"
+        for screen_id in DisplayScreen.objects.filter(institution=institution).values_list(
+            "id", flat=True
+        )
+    ]
+    if keys:
+        cache.delete_many(keys)
+
+    from displays.services.screen_index import bump_screen_index_version
+
+    bump_screen_index_version(getattr(institution, "id", None))
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+"""Compact string-table representation of public display payloads.
+
+در خروجی صفحه‌نمایش‌های ساختمانی عنوان درس، نام استاد، کلاس و ساختمان در ده‌ها
+جلسه تکرار می‌شوند و بسیاری از فیلدها (مانند ``cancellation_reason``) خالی‌اند.
+قالب فشرده جلسات را به صورت ستونی ارائه می‌کند: هر رشته تنها یک‌بار در جدول
+``strings`` آمده و در ستون‌ها با اندیس آن ارجاع داده می‌شود.
+
+Decoding rules for clients::
+
+    row[field] = constants[field]                      # uniform columns
+    row[field] = strings[v] if field in string_fields  # interned strings
+                 else v                                # numbers, booleans, null
+"""
+
+from typing import Any, Dict, Iterable, List
+
+COMPACT_MEDIA_TYPE = "application/vnd.unischedule.compact+json"
+COMPACT_LAYOUT = "compact"
+
+
+def compact_sessions(sessions: Iterable[dict]) -> dict:
+    """Encode ``sessions`` as a string table plus one array per field.
+
+    Columns whose values are identical in every row (typically all ``null``)
+    are moved to ``constants`` instead of being repeated.
+
+    Args:
+        sessions: فهرست جلسات سریال‌شده.
+
+    Returns:
+        dict: ساختاری با کلیدهای ``count``، ``fields``، ``strings``،
+        ``string_fields``، ``columns`` و ``constants``.
+    """
+
+    sessions = list(sessions)
+    fields: List[str] = []
+    for session in sessions:
+        for field in session:
+            if field not in fields:
+                fields.append(field)
+
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+    string_fields: List[str] = []
+    columns: Dict[str, List[Any]] = {}
+    constants: Dict[str, Any] = {}
+
+    for field in fields:
+        values = [session.get(field) for session in sessions]
+        first = values[0]
+        if all(value == first and type(value) is type(first) for value in values):
+            constants[field] = first
+            continue
+        if all(value is None or isinstance(value, str) for value in values):
+            encoded = []
+            for value in values:
+                if value is None:
+                    encoded.append(None)
+                    continue
+                index = string_ids.get(value)
+                if index is None:
+                    index = string_ids[value] = len(strings)
+                    strings.append(value)
+                encoded.append(index)
+            string_fields.append(field)
+            columns[field] = encoded
+        else:
+            columns[field] = values
+
+    return {
+        "count": len(sessions),
+        "fields": fields,
+        "strings": strings,
+        "string_fields": string_fields,
+        "columns": columns,
+        "constants": constants,
+    }
+
+
+def expand_sessions(compact: dict) -> List[dict]:
+    """Decode the output of :func:`compact_sessions` back into session dicts."""
+
+    strings = compact["strings"]
+    string_fields = set(compact["string_fields"])
+    rows = []
+    for row in range(compact["count"]):
+        session = {}
+        for field in compact["fields"]:
+            if field in compact["constants"]:
+                session[field] = compact["constants"][field]
+                continue
+            value = compact["columns"][field][row]
+            if field in string_fields and value is not None:
+                value = strings[value]
+            session[field] = value
+        rows.append(session)
+    return rows
+
+
+def compact_payload(payload: dict) -> dict:
+    """Return a copy of ``payload`` whose ``sessions`` use the compact layout."""
+
+    compacted = dict(payload)
+    compacted["sessions"] = compact_sessions(payload.get("sessions", []))
+    compacted["layout"] = COMPACT_LAYOUT
+    return compacted
+
+
+def compact_etag(etag: str) -> str:
+    """Derive the ETag of the compact representation from the payload ETag."""
+
+    return f'{etag[:-1]}-{COMPACT_LAYOUT}"' if etag.endswith('"') else f"{etag}-{COMPACT_LAYOUT}"
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+"""Compute how long a display payload stays semantically valid.
+
+خروجی صفحه‌نمایش‌هایی که فیلتر آن‌ها به تاریخ روز وابسته است (روز جاری، نوع
+هفتهٔ جاری یا تاریخ هدف بعدی) در نیمه‌شب محلی معنای خود را تغییر می‌دهد. سایر
+تغییرات از طریق شمارنده‌های نسل کش اعمال می‌شوند، بنابراین طول عمر خروجی تا
+نزدیک‌ترین نقطهٔ تغییر معنایی (و حداکثر یک ساعت) تعیین می‌شود.
+"""
+
+import math
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+from displays.services.filter_plan import ScreenFilterPlan
+
+# Upper bound for payloads whose content only changes through invalidation.
+PAYLOAD_MAX_TTL_SECONDS = 60 * 60
+
+
+def start_of_day(day: date) -> datetime:
+    """Return the aware local datetime of ``day`` at 00:00."""
+
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def next_change_point(plan: ScreenFilterPlan, now: datetime | None = None) -> datetime | None:
+    """Return when the resolved filter of ``plan`` next changes, if ever.
+
+    Args:
+        plan: طرح فیلتر کامپایل‌شدهٔ صفحه‌نمایش.
+        now: زمان مرجع (پیش‌فرض: اکنون به وقت محلی).
+
+    Returns:
+        datetime | None: نیمه‌شب بعدی برای طرح‌های وابسته به تاریخ، در غیر این صورت ``None``.
+    """
+
+    if not plan.is_date_dependent:
+        return None
+    now = timezone.localtime(now)
+    return start_of_day(now.date() + timedelta(days=1))
+
+
+def payload_ttl(plan: ScreenFilterPlan, now: datetime | None = None) -> int:
+    """Return the cache lifetime of a payload built for ``plan`` at ``now``.
+
+    Args:
+        plan: طرح فیلتر کامپایل‌شدهٔ صفحه‌نمایش.
+        now: زمان ساخت خروجی.
+
+    Returns:
+        int: طول عمر بر حسب ثانیه (حداقل یک ثانیه).
+    """
+
+    now = timezone.localtime(now)
+    ttl = PAYLOAD_MAX_TTL_SECONDS
+    change_point = next_change_point(plan, now)
+    if change_point is not None:
+        ttl = min(ttl, math.ceil((change_point - now).total_seconds()))
+    return max(ttl, 1)
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+"""Per-classroom timelines of today's occurrences for room-door signage.
+
+تبلت‌های کنار در کلاس فقط به جلسهٔ در حال برگزاری و جلسهٔ بعدی همان کلاس نیاز
+دارند. برای هر مؤسسه یک خط زمانی مرتب از رخدادهای امروز (جلسات هفتگی پس از
+اعمال لغوها به همراه جلسات جبرانی) به تفکیک کلاس ساخته می‌شود و پاسخ «اکنون و
+بعدی» تنها با یک جست‌وجوی دودویی روی آن محاسبه می‌شود.
+
+Timelines are derived from the institution's
+:class:`~displays.services.timetable_snapshot.TimetableSnapshot` and rebuilt
+whenever the snapshot is reloaded or the local date changes.  Every classroom
+of the institution has a timeline, so free rooms are listed as well.
+"""
+
+import threading
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Tuple
+
+from django.utils import timezone
+
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
+from displays.services.timetable_snapshot import TimetableSnapshot, get_timetable_snapshot
+from displays.utils import format_professor_name
+from locations.models import Classroom
+from schedules.models import ClassSession
+from unischedule.core.error_codes import ErrorCodes
+from unischedule.core.exceptions import CustomValidationError
+
+@dataclass(frozen=True)
+class RoomOccurrence:
+    """One scheduled or makeup class held in a classroom on a given day."""
+
+    session_id: int
+    makeup_id: int | None
+    course_title: str
+    professor_name: str
+    group_code: str
+    start_time: time
+    end_time: time
+    note: str
+    is_makeup: bool
+
+
+@dataclass(frozen=True)
+class ClassroomTimeline:
+    """Occurrences of one classroom sorted by start time."""
+
+    classroom_id: int
+    classroom_title: str
+    building_id: int
+    building_title: str
+    occurrences: Tuple[RoomOccurrence, ...]
+    starts: Tuple[time, ...]
+
+    def now_and_next(self, at: time) -> Tuple[RoomOccurrence | None, RoomOccurrence | None]:
+        """Return the occurrence running at ``at`` and the one starting after it."""
+
+        position = bisect_right(self.starts, at)
+        current = None
+        if position and self.occurrences[position - 1].end_time > at:
+            current = self.occurrences[position - 1]
+        upcoming = self.occurrences[position] if position < len(self.occurrences) else None
+        return current, upcoming
+
+
+@dataclass(frozen=True)
+class RoomTimeline:
+    """Today's classroom timelines of one institution."""
+
+    institution_id: int
+    day: date
+    snapshot: TimetableSnapshot
+    classrooms: Dict[int, ClassroomTimeline]
+    classrooms_by_building: Dict[int, Tuple[int, ...]]
+
+
+def _session_occurs_on(columns: dict, index: int, day: date) -> bool:
+    semester_start = columns["semester_start"][index]
+    semester_end = columns["semester_end"][index]
+    if semester_start and day < semester_start:
+        return False
+    if semester_end and day > semester_end:
+        return False
+    week_type = columns["week_type"][index]
+    if week_type == ClassSession.WeekTypeChoices.EVERY:
+        return True
+    return week_type == ClassSession.week_type_for_date(semester_start, day)
+
+
+def list_institution_classrooms(institution_id: int) -> List[tuple]:
+    """Return ``(id, title, building_id, building_title)`` of every classroom of an institution."""
+
+    return list(
+        Classroom.objects.filter(
+            building__institution_id=institution_id,
+            building__is_deleted=False,
+        ).values_list("id", "title", "building_id", "building__title")
+    )
+
+
+def build_room_timeline(
+    snapshot: TimetableSnapshot,
+    day: date,
+    classrooms: Iterable[tuple] = (),
+) -> RoomTimeline:
+    """Build the per-classroom timelines of ``day`` from ``snapshot``.
+
+    Cancelled sessions are left out; makeups held on ``day`` are added to the
+    classroom they are scheduled in.
+
+    Args:
+        snapshot: snapshot جدول زمانی مؤسسه.
+        day: روزی که خط زمانی برای آن ساخته می‌شود.
+        classrooms: کلاس‌های مؤسسه (خروجی :func:`list_institution_classrooms`) تا
+            کلاس‌های بدون رخداد نیز خط زمانی خالی داشته باشند.
+
+    Returns:
+        RoomTimeline: خطوط زمانی مرتب به تفکیک کلاس.
+    """
+
+    rooms: Dict[int, dict] = {}
+
+    def _room(classroom_id, classroom_title, building_id, building_title) -> List[RoomOccurrence]:
+        room = rooms.setdefault(
+            classroom_id,
+            {
+                "classroom_title": classroom_title,
+                "building_id": building_id,
+                "building_title": building_title,
+                "occurrences": [],
+            },
+        )
+        return room["occurrences"]
+
+    for classroom in classrooms:
+        _room(*classroom)
+
+    sessions = snapshot.sessions
+    for index in snapshot.session_rows_for_day(PY_WEEKDAY_TO_PERSIAN[day.weekday()]):
+        session_id = sessions["id"][index]
+        if (session_id, day) in snapshot.cancellations:
+            continue
+        if not _session_occurs_on(sessions, index, day):
+            continue
+        _room(
+            sessions["classroom_id"][index],
+            sessions["classroom_title"][index],
+            sessions["building_id"][index],
+            sessions["building_title"][index],
+        ).append(
+            RoomOccurrence(
+                session_id=session_id,
+                makeup_id=None,
+                course_title=sessions["course_title"][index],
+                professor_name=format_professor_name(
+                    sessions["professor_first_name"][index], sessions["professor_last_name"][index]
+                ),
+                group_code=sessions["group_code"][index] or "",
+                start_time=sessions["start_time"][index],
+                end_time=sessions["end_time"][index],
+                note=sessions["note"][index] or "",
+                is_makeup=False,
+            )
+        )
+
+    makeups = snapshot.makeups
+    for index in snapshot.makeup_rows_for_date(day):
+        _room(
+            makeups["classroom_id"][index],
+            makeups["classroom_title"][index],
+            makeups["building_id"][index],
+            makeups["building_title"][index],
+        ).append(
+            RoomOccurrence(
+                session_id=makeups["session_id"][index],
+                makeup_id=makeups["id"][index],
+                course_title=makeups["course_title"][index],
+                professor_name=format_professor_name(
+                    makeups["professor_first_name"][index], makeups["professor_last_name"][index]
+                ),
+                group_code=makeups["group_code"][index] or makeups["session_group_code"][index] or "",
+                start_time=makeups["start_time"][index],
+                end_time=makeups["end_time"][index],
+                note=makeups["note"][index] or makeups["session_note"][index] or "",
+                is_makeup=True,
+            )
+        )
+
+    classrooms: Dict[int, ClassroomTimeline] = {}
+    by_building: Dict[int, List[int]] = {}
+    for classroom_id, room in rooms.items():
+        occurrences = tuple(
+            sorted(room["occurrences"], key=lambda item: (item.start_time, item.end_time))
+        )
+        classrooms[classroom_id] = ClassroomTimeline(
+            classroom_id=classroom_id,
+            classroom_title=room["classroom_title"],
+            building_id=room["building_id"],
+            building_title=room["building_title"],
+            occurrences=occurrences,
+            starts=tuple(item.start_time for item in occurrences),
+        )
+        by_building.setdefault(room["building_id"], []).append(classroom_id)
+
+    return RoomTimeline(
+        institution_id=snapshot.institution_id,
+        day=day,
+        snapshot=snapshot,
+        classrooms=classrooms,
+        classrooms_by_building={
+            building_id: tuple(sorted(ids, key=lambda pk: classrooms[pk].classroom_title))
+            for building_id, ids in by_building.items()
+        },
+    )
+
+
+_timelines: Dict[int, RoomTimeline] = {}
+_timelines_lock = threading.Lock()
+
+
+def get_room_timeline(institution_id: int, day: date | None = None) -> RoomTimeline:
+    """Return today's room timeline of an institution, rebuilding it when stale.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        day: روز مورد نظر (پیش‌فرض: امروز به وقت محلی).
+
+    Returns:
+        RoomTimeline: خط زمانی معتبر برای snapshot فعلی.
+    """
+
+    day = day or timezone.localdate()
+    snapshot = get_timetable_snapshot(institution_id, today=day)
+    timeline = _timelines.get(institution_id)
+    if timeline is not None and timeline.snapshot is snapshot and timeline.day == day:
+        return timeline
+
+    timeline = build_room_timeline(snapshot, day, list_institution_classrooms(institution_id))
+    with _timelines_lock:
+        _timelines[institution_id] = timeline
+    return timeline
+
+
+def clear_room_timelines() -> None:
+    """Forget every in-process timeline (used by tests and cache flushes)."""
+
+    with _timelines_lock:
+        _timelines.clear()
+
+
+def _serialize_occurrence(occurrence: RoomOccurrence | None) -> dict | None:
+    if occurrence is None:
+        return None
+    data = asdict(occurrence)
+    data["start_time"] = occurrence.start_time.isoformat()
+    data["end_time"] = occurrence.end_time.isoformat()
+    return data
+
+
+def _serialize_classroom(
+    timeline: RoomTimeline,
+    classroom_id: int,
+    at: time,
+) -> dict:
+    classroom = timeline.classrooms.get(classroom_id)
+    if classroom is None:
+        # Created after the timeline was built; it has no occurrences yet.
+        return {"classroom_id": classroom_id, "current": None, "next": None}
+    current, upcoming = classroom.now_and_next(at)
+    return {
+        "classroom_id": classroom_id,
+        "classroom_title": classroom.classroom_title,
+        "building_id": classroom.building_id,
+        "building_title": classroom.building_title,
+        "current": _serialize_occurrence(current),
+        "next": _serialize_occurrence(upcoming),
+    }
+
+
+def now_and_next(
+    institution_id: int,
+    *,
+    classroom_id: int | None = None,
+    building_id: int | None = None,
+    at: datetime | None = None,
+) -> dict:
+    """Return the current and next occurrence of a classroom or a whole building.
+
+    Args:
+        institution_id: شناسهٔ مؤسسهٔ مالک کلاس یا ساختمان.
+        classroom_id: شناسهٔ کلاس مورد نظر.
+        building_id: شناسهٔ ساختمان برای دریافت همهٔ کلاس‌های آن.
+        at: لحظهٔ مرجع (پیش‌فرض: اکنون به وقت محلی).
+
+    Returns:
+        dict: زمان مرجع و فهرست کلاس‌ها با رخداد جاری و بعدی هر کدام.
+    """
+
+    at = timezone.localtime(at)
+    timeline = get_room_timeline(institution_id, at.date())
+    moment = at.time().replace(tzinfo=None)
+    if classroom_id is not None:
+        classroom_ids: Tuple[int, ...] = (classroom_id,)
+    else:
+        classroom_ids = timeline.classrooms_by_building.get(building_id, ())
+    return {
+        "at": at.isoformat(),
+        "classrooms": [
+            _serialize_classroom(timeline, pk, moment) for pk in classroom_ids
+        ],
+    }
+
+
+def screen_now_and_next(screen, *, at: datetime | None = None) -> dict:
+    """Return the current and next occurrence of the room or building a screen is filtered to.
+
+    The room is never taken from the request, so a public slug only exposes
+    the classroom (or the building) its screen already shows.
+
+    Args:
+        screen: صفحه‌نمایشی که با ``filter_classroom`` یا ``filter_building`` محدود شده است.
+        at: لحظهٔ مرجع (پیش‌فرض: اکنون به وقت محلی).
+
+    Returns:
+        dict: خروجی :func:`now_and_next` برای کلاس یا ساختمان صفحه‌نمایش.
+
+    Raises:
+        CustomValidationError: اگر صفحه‌نمایش به کلاس یا ساختمانی محدود نشده باشد.
+    """
+
+    if screen.filter_classroom_id is not None:
+        return now_and_next(screen.institution_id, classroom_id=screen.filter_classroom_id, at=at)
+    if screen.filter_building_id is not None:
+        return now_and_next(screen.institution_id, building_id=screen.filter_building_id, at=at)
+    raise CustomValidationError(
+        message=ErrorCodes.DISPLAY_ROOM_FILTER_MISSING["message"],
+        code=ErrorCodes.DISPLAY_ROOM_FILTER_MISSING["code"],
+        status_code=ErrorCodes.DISPLAY_ROOM_FILTER_MISSING["status_code"],
+        errors=ErrorCodes.DISPLAY_ROOM_FILTER_MISSING["errors"],
+    )
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+"""Bounded in-process LRU for slug → screen resolution on the public path.
+
+هر درخواست کیوسک پیش از رسیدن به کش خروجی، صفحه‌نمایش را با slug از پایگاه
+داده می‌خواند. این ماژول نمونه‌های بارگذاری‌شده را در حافظهٔ فرایند نگه می‌دارد
+تا درخواست‌های گرم بدون هیچ کوئری SQL پاسخ داده شوند.
+
+Entries are validated against the screen's cache generations on every hit, so
+``update_display_screen``, ``delete_display_screen`` and institution profile
+updates (which bump those generations) are picked up by every process.  The
+TTL bounds staleness for changes that bypass the generations.
+"""
+
+import threading
+import time as time_module
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from displays.models import DisplayScreen
+from displays.services import display_cache
+
+SCREEN_CACHE_MAX_ENTRIES = 1024
+SCREEN_CACHE_TTL_SECONDS = 60
+
+
+class _CachedScreen(NamedTuple):
+    screen: DisplayScreen
+    generations: tuple[int, int, int]
+    expires_at: float
+
+
+_entries: OrderedDict[str, _CachedScreen] = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_screen(slug: str, loader: Callable[[str], DisplayScreen | None]) -> DisplayScreen | None:
+    """Return the screen of ``slug`` from the LRU, calling ``loader`` on a miss.
+
+    Args:
+        slug: شناسهٔ متنی صفحه‌نمایش.
+        loader: تابعی که صفحه‌نمایش را از پایگاه داده بارگذاری می‌کند.
+
+    Returns:
+        DisplayScreen | None: صفحه‌نمایش معتبر یا ``None`` در صورت نبود آن.
+    """
+
+    with _lock:
+        cached = _entries.get(slug)
+        if cached is not None:
+            _entries.move_to_end(slug)
+
+    if (
+        cached is not None
+        and cached.expires_at > time_module.monotonic()
+        and display_cache.get_generations(cached.screen) == cached.generations
+    ):
+        return cached.screen
+
+    screen = loader(slug)
+    if screen is None:
+        forget_screen(slug)
+        return None
+
+    entry = _CachedScreen(
+        screen=screen,
+        generations=display_cache.get_generations(screen),
+        expires_at=time_module.monotonic() + SCREEN_CACHE_TTL_SECONDS,
+    )
+    with _lock:
+        _entries[slug] = entry
+        _entries.move_to_end(slug)
+        while len(_entries) > SCREEN_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return screen
+
+
+def forget_screen(slug: str) -> None:
+    """Drop ``slug`` from this process's LRU."""
+
+    with _lock:
+        _entries.pop(slug, None)
+
+
+def clear_screen_cache() -> None:
+    """Forget every cached screen (used by tests and cache flushes)."""
+
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+"""Inverted index from selector values to the display screens that use them.
+
+برای یافتن صفحه‌نمایش‌هایی که تغییر یک جلسه بر آن‌ها اثر دارد، به‌جای بررسی
+تک‌تک صفحه‌نمایش‌های فعال مؤسسه، نمایه‌ای از مقدار هر selector (کلاس،
+ساختمان، درس، استاد، ترم، روز و کد گروه) به شناسهٔ صفحه‌نمایش‌ها نگه‌داری
+می‌شود. تنها صفحه‌نمایش‌های کاندید با طرح فیلتر کامپایل‌شده و بدون دسترسی به
+پایگاه داده ارزیابی می‌شوند.
+"""
+
+import threading
+import time as time_module
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Mapping, Tuple
+
+from django.core.cache import cache
+
+from displays.repositories import display_screen_repository
+from displays.services.filter_plan import FILTER_PLAN_TIMEOUT, ScreenFilterPlan, get_filter_plan
+
+# Session attributes indexed by the screen selectors, mapped to the plan
+# attribute that constrains them.  ``day_of_week`` is resolved separately
+# because it can be derived from a date override.
+INDEXED_SELECTORS: Tuple[Tuple[str, str], ...] = (
+    ("classroom_id", "classroom_id"),
+    ("building_id", "building_id"),
+    ("course_id", "course_id"),
+    ("professor_id", "professor_id"),
+    ("semester_id", "semester_id"),
+    ("group_code", "group_code"),
+    ("day_of_week", "day_of_week"),
+)
+
+
+@dataclass(frozen=True)
+class IndexedScreen:
+    """Minimal screen data kept by the index."""
+
+    id: int
+    slug: str
+    plan: ScreenFilterPlan
+
+
+@dataclass(frozen=True)
+class ScreenIndex:
+    """Postings of one institution's active screens.
+
+    ``postings[column][value]`` holds the ids of screens whose selector for
+    ``column`` equals ``value``; ``wildcards[column]`` holds the screens that
+    do not constrain ``column`` at all.
+    """
+
+    institution_id: int
+    version: str
+    built_at: float
+    screens: Dict[int, IndexedScreen]
+    postings: Dict[str, Dict[Any, FrozenSet[int]]]
+    wildcards: Dict[str, FrozenSet[int]]
+
+    def candidate_ids(self, values: Mapping[str, Any]) -> FrozenSet[int]:
+        """Return the screens whose indexed selectors accept ``values``."""
+
+        candidates: FrozenSet[int] | None = None
+        for column, _ in INDEXED_SELECTORS:
+            matching = self.wildcards[column] | self.postings[column].get(
+                values.get(column), frozenset()
+            )
+            candidates = matching if candidates is None else candidates & matching
+            if not candidates:
+                return frozenset()
+        return candidates if candidates is not None else frozenset(self.screens)
+
+    def is_fresh(self, version: str) -> bool:
+        return (
+            self.version == version
+            and time_module.monotonic() - self.built_at < FILTER_PLAN_TIMEOUT
+        )
+
+
+def _version_key(institution_id: int) -> str:
+    return f"displays:screen-index-version:{institution_id}"
+
+
+def get_screen_index_version(institution_id: int) -> str:
+    """Return the version token of an institution's screen configuration."""
+
+    key = _version_key(institution_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_screen_index_version(institution_id: int | None) -> None:
+    """Mark the screen index of ``institution_id`` as outdated.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه‌ای که صفحه‌نمایش‌ها یا ترم‌های آن تغییر کرده‌اند.
+    """
+
+    if institution_id is None:
+        return
+    cache.set(_version_key(institution_id), uuid.uuid4().hex, timeout=None)
+
+
+def _indexed_value(plan: ScreenFilterPlan, attribute: str):
+    """Return the static value a plan requires for ``attribute`` (or ``None``)."""
+
+    if plan.unfiltered:
+        return None
+    if attribute == "day_of_week":
+        # ``use_current_day_of_week`` changes daily, so such screens stay
+        # wildcards and the exact day is checked by the plan predicate.
+        if plan.day_of_week or plan.date_override:
+            return plan.computed_day_of_week()
+        return None
+    return getattr(plan, attribute) or None
+
+
+def build_screen_index(institution, *, version: str | None = None) -> ScreenIndex:
+    """Compile the active screens of ``institution`` into a :class:`ScreenIndex`.
+
+    Args:
+        institution: مؤسسهٔ مالک صفحه‌نمایش‌ها.
+        version: نسخه‌ای که نمایه با آن برچسب می‌خورد.
+
+    Returns:
+        ScreenIndex: نمایهٔ معکوس selectorها.
+    """
+
+    if version is None:
+        version = get_screen_index_version(institution.id)
+
+    screens: Dict[int, IndexedScreen] = {}
+    postings: Dict[str, Dict[Any, set]] = {column: {} for column, _ in INDEXED_SELECTORS}
+    wildcards: Dict[str, set] = {column: set() for column, _ in INDEXED_SELECTORS}
+
+    for screen in display_screen_repository.list_active_display_screens_by_institution(institution):
+        plan = get_filter_plan(screen)
+        screens[screen.id] = IndexedScreen(id=screen.id, slug=screen.slug, plan=plan)
+        for column, attribute in INDEXED_SELECTORS:
+            value = _indexed_value(plan, attribute)
+            if value is None:
+                wildcards[column].add(screen.id)
+            else:
+                postings[column].setdefault(value, set()).add(screen.id)
+
+    return ScreenIndex(
+        institution_id=institution.id,
+        version=version,
+        built_at=time_module.monotonic(),
+        screens=screens,
+        postings={
+            column: {value: frozenset(ids) for value, ids in values.items()}
+            for column, values in postings.items()
+        },
+        wildcards={column: frozenset(ids) for column, ids in wildcards.items()},
+    )
+
+
+_indexes: Dict[int, ScreenIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_screen_index(institution) -> ScreenIndex:
+    """Return the current screen index of ``institution``, rebuilding it when stale."""
+
+    version = get_screen_index_version(institution.id)
+    index = _indexes.get(institution.id)
+    if index is not None and index.is_fresh(version):
+        return index
+
+    index = build_screen_index(institution, version=version)
+    with _indexes_lock:
+        _indexes[institution.id] = index
+    return index
+
+
+def find_affected_screens(institution, values: Mapping[str, Any]) -> List[IndexedScreen]:
+    """Return the screens whose filters accept a session described by ``values``.
+
+    Args:
+        institution: مؤسسهٔ مالک جلسه.
+        values: مقادیر جلسه با نام ستون‌های
+            :data:`displays.services.timetable_snapshot.SESSION_COLUMNS`.
+
+    Returns:
+        list[IndexedScreen]: صفحه‌نمایش‌هایی که خروجی آن‌ها باید باطل شود.
+    """
+
+    index = get_screen_index(institution)
+    affected: List[IndexedScreen] = []
+    for screen_id in index.candidate_ids(values):
+        entry = index.screens[screen_id]
+        if entry.plan.matches_session(entry.plan.resolve(), values):
+            affected.append(entry)
+    return affected
+
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+"""Institution-wide, versioned in-memory timetable snapshots.
+
+به‌جای آنکه هر صفحه‌نمایش کوئری مستقل ``ClassSession`` اجرا کند، جلسات فعال،
+لغوها و جلسات جبرانی هر مؤسسه یک‌بار بارگذاری شده و به صورت ستونی در حافظه
+نگه‌داری می‌شوند. فیلتر هر صفحه‌نمایش روی همین داده ارزیابی می‌شود و snapshot
+تنها زمانی بازسازی می‌شود که نسخهٔ جدول زمانی مؤسسه تغییر کند.
+
+A snapshot does not hold the institution's whole history: sessions are limited
+to the current semesters and makeups/cancellations to a window around today
+(see :func:`resolve_snapshot_scope`), so its size and rebuild cost stay
+bounded as past semesters accumulate.
+"""
+
+import threading
+import time as time_module
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from displays.models import DisplayScreen
+from schedules.models import ClassCancellation, ClassSession, MakeupClassSession
+from schedules.services.timetable_version import get_timetable_version
+from semesters.models import Semester
+
+# Upper bound on how long a snapshot is trusted even without a version bump.
+# Reference-data edits bump the version through ``displays.signals``; bulk
+# ``update()`` calls bypass signals, so the snapshot is still refreshed
+# periodically to pick them up.
+SNAPSHOT_MAX_AGE = 5 * 60
+
+# Days after today whose makeups and cancellations a snapshot holds; covers the
+# longest display bundle.  The day before today is kept as well so screens
+# that are still showing yesterday around midnight stay consistent.
+SNAPSHOT_HORIZON_DAYS = 14
+
+SESSION_COLUMNS = (
+    "id",
+    "course_id",
+    "course_title",
+    "professor_id",
+    "professor_first_name",
+    "professor_last_name",
+    "classroom_id",
+    "classroom_title",
+    "building_id",
+    "building_title",
+    "semester_id",
+    "semester_start",
+    "semester_end",
+    "day_of_week",
+    "start_time",
+    "end_time",
+    "week_type",
+    "group_code",
+    "capacity",
+    "note",
+)
+
+_SESSION_FIELDS = (
+    "id",
+    "course_id",
+    "course__title",
+    "professor_id",
+    "professor__first_name",
+    "professor__last_name",
+    "classroom_id",
+    "classroom__title",
+    "classroom__building_id",
+    "classroom__building__title",
+    "semester_id",
+    "semester__start_date",
+    "semester__end_date",
+    "day_of_week",
+    "start_time",
+    "end_time",
+    "week_type",
+    "group_code",
+    "capacity",
+    "note",
+)
+
+MAKEUP_COLUMNS = (
+    "id",
+    "date",
+    "start_time",
+    "end_time",
+    "classroom_id",
+    "classroom_title",
+    "building_id",
+    "building_title",
+    "group_code",
+    "note",
+    "session_id",
+    "course_id",
+    "course_title",
+    "professor_id",
+    "professor_first_name",
+    "professor_last_name",
+    "semester_id",
+    "semester_start",
+    "session_day_of_week",
+    "session_week_type",
+    "session_group_code",
+    "session_note",
+    "session_capacity",
+)
+
+_MAKEUP_FIELDS = (
+    "id",
+    "date",
+    "start_time",
+    "end_time",
+    "classroom_id",
+    "classroom__title",
+    "classroom__building_id",
+    "classroom__building__title",
+    "group_code",
+    "note",
+    "class_session_id",
+    "class_session__course_id",
+    "class_session__course__title",
+    "class_session__professor_id",
+    "class_session__professor__first_name",
+    "class_session__professor__last_name",
+    "class_session__semester_id",
+    "class_session__semester__start_date",
+    "class_session__day_of_week",
+    "class_session__week_type",
+    "class_session__group_code",
+    "class_session__note",
+    "class_session__capacity",
+)
+
+
+def _to_columns(rows, names) -> Dict[str, tuple]:
+    if not rows:
+        return {name: () for name in names}
+    return dict(zip(names, zip(*rows)))
+
+
+@dataclass(frozen=True)
+class TimetableSnapshot:
+    """Columnar copy of an institution's active timetable.
+
+    ``sessions`` and ``makeups`` map column names to tuples of equal length;
+    row ``i`` of a table is made of the ``i``-th item of every column.
+    Secondary indexes narrow evaluation to the rows of one weekday or date.
+    """
+
+    institution_id: int
+    version: str
+    loaded_at: float
+    sessions: Dict[str, tuple]
+    makeups: Dict[str, tuple]
+    cancellations: Dict[Tuple[int, date], Tuple[str, str]]
+    sessions_by_day: Dict[str, Tuple[int, ...]] = field(default_factory=dict)
+    makeups_by_date: Dict[date, Tuple[int, ...]] = field(default_factory=dict)
+    scope: SnapshotScope | None = None
+
+    @property
+    def session_count(self) -> int:
+        return len(self.sessions["id"])
+
+    def session_rows_for_day(self, day_of_week: str | None) -> Tuple[int, ...] | range:
+        """Return candidate session row indexes, optionally limited to a weekday."""
+
+        if day_of_week:
+            return self.sessions_by_day.get(day_of_week, ())
+        return range(self.session_count)
+
+    def makeup_rows_for_date(self, target_date: date | None) -> Tuple[int, ...]:
+        if target_date is None:
+            return ()
+        return self.makeups_by_date.get(target_date, ())
+
+    def covers(self, target_date: date | None, semester_id: int | None = None) -> bool:
+        """Return whether the snapshot holds the rows a screen needs for ``target_date``."""
+
+        return self.scope is None or self.scope.covers(target_date, semester_id)
+
+    def is_fresh(self, version: str, today: date | None = None) -> bool:
+        return (
+            self.version == version
+            and time_module.monotonic() - self.loaded_at < SNAPSHOT_MAX_AGE
+            and (
+                today is None
+                or self.scope is None
+                or self.scope.window_start == today - timedelta(days=1)
+            )
+        )
+
+
+@dataclass(frozen=True)
+class SnapshotScope:
+    """The semesters and dates a snapshot was loaded for."""
+
+    window_start: date
+    window_end: date
+    pinned_dates: FrozenSet[date]
+    semester_ids: FrozenSet[int]
+
+    def covers(self, target_date: date | None, semester_id: int | None = None) -> bool:
+        if semester_id and semester_id not in self.semester_ids:
+            return False
+        if target_date is None:
+            return True
+        return self.window_start <= target_date <= self.window_end or target_date in self.pinned_dates
+
+
+def resolve_snapshot_scope(
+    institution_id: int,
+    today: date | None = None,
+    *,
+    pinned_dates: Iterable[date] = (),
+    pinned_semester_ids: Iterable[int] = (),
+) -> SnapshotScope:
+    """Decide which semesters and dates a snapshot of ``institution_id`` loads.
+
+    Sessions come from the active semester, semesters that have not ended
+    before the window, and semesters selected explicitly by a screen.  Dates
+    pinned by a screen's ``filter_date_override`` are loaded besides the
+    window, together with the semesters that contain them.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        today: تاریخ مرجع پنجره (پیش‌فرض: امروز به وقت محلی).
+        pinned_dates: تاریخ‌های اضافه‌ای که باید بارگذاری شوند.
+        pinned_semester_ids: ترم‌های اضافه‌ای که باید بارگذاری شوند.
+
+    Returns:
+        SnapshotScope: پنجرهٔ تاریخ و ترم‌های snapshot.
+    """
+
+    today = today or timezone.localdate()
+    window_start = today - timedelta(days=1)
+    window_end = today + timedelta(days=SNAPSHOT_HORIZON_DAYS)
+    dates = set(pinned_dates)
+    semester_ids = set(pinned_semester_ids)
+    for semester_id, date_override in DisplayScreen.objects.filter(
+        institution_id=institution_id
+    ).values_list("filter_semester_id", "filter_date_override"):
+        if semester_id:
+            semester_ids.add(semester_id)
+        if date_override:
+            dates.add(date_override)
+    dates = {day for day in dates if not window_start <= day <= window_end}
+
+    current = Q(is_active=True) | Q(end_date__gte=window_start) | Q(pk__in=semester_ids)
+    for day in dates:
+        current |= Q(start_date__lte=day, end_date__gte=day)
+    semesters = Semester.objects_with_deleted.filter(current, institution_id=institution_id)
+    return SnapshotScope(
+        window_start=window_start,
+        window_end=window_end,
+        pinned_dates=frozenset(dates),
+        semester_ids=frozenset(semesters.values_list("pk", flat=True)),
+    )
+
+
+def load_timetable_snapshot(
+    institution_id: int,
+    *,
+    version: str | None = None,
+    scope: SnapshotScope | None = None,
+) -> TimetableSnapshot:
+    """Load a snapshot for ``institution_id`` with three projection queries.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        version: نسخهٔ جدول زمانی که snapshot با آن برچسب می‌خورد.
+        scope: ترم‌ها و تاریخ‌های بارگذاری‌شده (پیش‌فرض: پنجرهٔ امروز).
+
+    Returns:
+        TimetableSnapshot: دادهٔ ستونی جلسات، لغوها و جلسات جبرانی.
+    """
+
+    if version is None:
+        version = get_timetable_version(institution_id)
+    if scope is None:
+        scope = resolve_snapshot_scope(institution_id)
+    in_window = Q(date__range=(scope.window_start, scope.window_end)) | Q(
+        date__in=scope.pinned_dates
+    )
+
+    session_rows = list(
+        ClassSession.objects.filter(
+            institution_id=institution_id,
+            is_deleted=False,
+            semester_id__in=scope.semester_ids,
+        )
+        .order_by("day_of_week", "start_time", "course__title")
+        .values_list(*_SESSION_FIELDS)
+    )
+    makeup_rows = list(
+        MakeupClassSession.objects.filter(in_window, institution_id=institution_id, is_deleted=False)
+        .order_by("date", "start_time")
+        .values_list(*_MAKEUP_FIELDS)
+    )
+    cancellations = {
+        (session_id, cancellation_date): (reason, note)
+        for session_id, cancellation_date, reason, note in ClassCancellation.objects.filter(
+            in_window,
+            institution_id=institution_id,
+            is_deleted=False,
+        ).values_list("class_session_id", "date", "reason", "note")
+    }
+
+    sessions = _to_columns(session_rows, SESSION_COLUMNS)
+    makeups = _to_columns(makeup_rows, MAKEUP_COLUMNS)
+
+    sessions_by_day: Dict[str, list] = {}
+    for index, day in enumerate(sessions["day_of_week"]):
+        sessions_by_day.setdefault(day, []).append(index)
+    makeups_by_date: Dict[date, list] = {}
+    for index, makeup_date in enumerate(makeups["date"]):
+        makeups_by_date.setdefault(makeup_date, []).append(index)
+
+    return TimetableSnapshot(
+        institution_id=institution_id,
+        version=version,
+        loaded_at=time_module.monotonic(),
+        sessions=sessions,
+        makeups=makeups,
+        cancellations=cancellations,
+        sessions_by_day={key: tuple(value) for key, value in sessions_by_day.items()},
+        makeups_by_date={key: tuple(value) for key, value in makeups_by_date.items()},
+        scope=scope,
+    )
+
+
+_snapshots: Dict[int, TimetableSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_timetable_snapshot(
+    institution_id: int,
+    *,
+    use_cache: bool = True,
+    today: date | None = None,
+) -> TimetableSnapshot:
+    """Return the current snapshot of an institution, loading it when stale.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        use_cache: اگر ``False`` باشد snapshot تازه‌ای بدون ذخیره‌سازی بارگذاری می‌شود.
+        today: روزی که پنجرهٔ snapshot حول آن ساخته می‌شود (پیش‌فرض: امروز).
+
+    Returns:
+        TimetableSnapshot: snapshot معتبر برای نسخهٔ فعلی جدول زمانی.
+    """
+
+    today = today or timezone.localdate()
+    if not use_cache:
+        return load_timetable_snapshot(
+            institution_id, scope=resolve_snapshot_scope(institution_id, today)
+        )
+
+    version = get_timetable_version(institution_id)
+    snapshot = _snapshots.get(institution_id)
+    if snapshot is not None and snapshot.is_fresh(version, today):
+        return snapshot
+
+    snapshot = load_timetable_snapshot(
+        institution_id,
+        version=version,
+        scope=resolve_snapshot_scope(institution_id, today),
+    )
+    with _snapshots_lock:
+        _snapshots[institution_id] = snapshot
+    return snapshot
+
+
+def clear_timetable_snapshots() -> None:
+    """Forget every in-process snapshot (used by tests and cache flushes)."""
+
+    with _snapshots_lock:
+        _snapshots.clear()
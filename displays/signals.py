@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from courses.models import Course
+from displays.models import DisplayScreen
+from displays.services.display_cache import bump_institution_generation, bump_screen_generation
+from displays.services.screen_index import bump_screen_index_version
+from locations.models import Building, Classroom
+from professors.models import Professor
+from schedules.services.timetable_version import bump_timetable_version
+from semesters.models import Semester
+
+
+# Any change to a screen (including admin edits and soft deletes) alters the
+# selector postings, so the institution's screen index is rebuilt lazily.  The
+# screen generation bump also retires in-process slug lookups in every worker.
+@receiver(post_save, sender=DisplayScreen)
+@receiver(post_delete, sender=DisplayScreen)
+def bump_screen_index_on_change(sender, instance, **kwargs) -> None:
+    bump_screen_index_version(instance.institution_id)
+    bump_screen_generation(instance.id)
+
+
+# Payloads live until the next day boundary, so edits to the labels and dates
+# they embed (titles, names, semester ranges) invalidate the institution's
+# snapshot and payloads right away instead of waiting for expiry.
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Professor)
+@receiver(post_save, sender=Building)
+@receiver(post_save, sender=Semester)
+@receiver(post_save, sender=Classroom)
+def invalidate_displays_on_reference_change(sender, instance, **kwargs) -> None:
+    if sender is Classroom:
+        institution_id = instance.building.institution_id if instance.building_id else None
+    else:
+        institution_id = instance.institution_id
+    if institution_id is None:
+        return
+    bump_timetable_version(institution_id)
+    bump_institution_generation(institution_id)
@@ -1,35 +1,60 @@
 from __future__ import annotations
 
+import gzip
 import shutil
 import tempfile
-from datetime import date, time
+import time as time_module
+from datetime import date, datetime, time, timedelta
+from io import StringIO
 from unittest.mock import patch
 
+from asgiref.sync import sync_to_async
 from django.contrib.admin.sites import AdminSite
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.http import HttpResponseRedirect
+from django.db import connection
 from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from accounts.models import User
 from courses.models import Course
 from displays.admin import DisplayScreenAdmin
 from displays.models import DisplayScreen
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
 from displays.services import display_service
+from displays.services import (
+    display_bundle,
+    display_cache,
+    display_warmup,
+    payload_compaction,
+    payload_expiry,
+    room_timeline,
+)
+from displays.services.display_cache import bump_institution_generation, payload_cache_key
+from displays.services.filter_plan import get_filter_plan
+from displays.services.timetable_snapshot import get_timetable_snapshot
+from displays.views import display_views
 from institutions.models import Institution
 from locations.models import Building, Classroom
 from professors.models import Professor
-from schedules.models import ClassSession
+from schedules.models import ClassCancellation, ClassSession, MakeupClassSession
 from schedules.services import class_session_service
+from schedules.services.display_invalidation import invalidate_related_displays
 from semesters.models import Semester
 from unischedule.core.exceptions import CustomValidationError
+from unischedule.core.error_codes import ErrorCodes
 
 
 class DisplayServiceViewAdminTests(TestCase):
     maxDiff = None
 
     def setUp(self):
+        cache.clear()
         self.tempdir = tempfile.mkdtemp(prefix="display-logos-")
         self.addCleanup(shutil.rmtree, self.tempdir, ignore_errors=True)
         override = override_settings(MEDIA_ROOT=self.tempdir)
@@ -71,6 +96,7 @@ class DisplayServiceViewAdminTests(TestCase):
             title="Fall",
             start_date=date(2024, 9, 1),
             end_date=date(2025, 1, 20),
+            is_active=True,
         )
         self.building = Building.objects.create(title="Main", institution=self.institution)
         self.classroom = Classroom.objects.create(title="101", building=self.building)
@@ -192,6 +218,93 @@ class DisplayServiceViewAdminTests(TestCase):
         self.assertNotIn(odd_session.id, session_ids)
         self.assertTrue(payload["filter"]["use_current_week_type"])
 
+    def test_filter_plan_is_reused_until_screen_update(self):
+        """Compiled plans are shared between builds and reset by updates."""
+        self._update_screen_filter(filter_classroom=self.classroom.id)
+
+        plan = get_filter_plan(self.screen)
+        reloaded = DisplayScreen.objects.get(pk=self.screen.pk)
+        self.assertEqual(get_filter_plan(reloaded), plan)
+        self.assertEqual(plan.classroom_id, self.classroom.id)
+
+        self._update_screen_filter(filter_classroom=self.second_classroom.id, filter_building=None)
+        updated_plan = get_filter_plan(self.screen)
+        self.assertNotEqual(updated_plan, plan)
+        self.assertEqual(updated_plan.classroom_id, self.second_classroom.id)
+
+    def test_payload_rebuild_reuses_resolved_semester(self):
+        """Automatic week-type detection must not query semesters per rebuild."""
+        self._create_session(week_type=ClassSession.WeekTypeChoices.EVEN)
+        with patch("django.utils.timezone.localdate", return_value=date(2024, 9, 8)):
+            self._update_screen_filter(
+                filter_semester=self.semester.id,
+                filter_use_current_week_type=True,
+            )
+            get_filter_plan(self.screen)
+            with CaptureQueriesContext(connection) as queries:
+                payload = display_service.build_public_payload(self.screen, use_cache=False)
+
+        self.assertEqual(payload["filter"]["computed_week_type"], ClassSession.WeekTypeChoices.EVEN)
+        self.assertEqual(payload["screen"]["filter_computed_week_type"], ClassSession.WeekTypeChoices.EVEN)
+        semester_lookups = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "semesters_semester"' in query["sql"]
+            and "classsession" not in query["sql"]
+        ]
+        # Only the filter summary label may still touch the semester row.
+        self.assertLessEqual(len(semester_lookups), 1)
+
+    def test_timetable_snapshot_is_shared_between_screens(self):
+        """Screens of one institution reuse a single snapshot until a write."""
+        session = self._create_session()
+        second_screen = DisplayScreen.objects.create(institution=self.institution, title="Hall")
+        self._update_screen_filter(filter_classroom=self.classroom.id)
+
+        display_service.build_public_payload(self.screen)
+        with CaptureQueriesContext(connection) as queries:
+            payload = display_service.build_public_payload(second_screen)
+        self.assertFalse(
+            [query for query in queries.captured_queries if "schedules_classsession" in query["sql"]]
+        )
+        self.assertEqual([item["id"] for item in payload["sessions"]], [session.id])
+
+        second_session = self._create_session(classroom=self.second_classroom, start_time=time(12, 0))
+        display_service.invalidate_screen_cache(second_screen)
+        payload = display_service.build_public_payload(second_screen)
+        self.assertEqual(
+            [item["id"] for item in payload["sessions"]], [session.id, second_session.id]
+        )
+
+    def test_timetable_snapshot_skips_past_semesters_and_distant_dates(self):
+        """Snapshots hold current semesters and a date window, not the whole history."""
+        current = self._create_session()
+        past_semester = Semester.objects.create(
+            institution=self.institution,
+            title="Old",
+            start_date=date(2020, 2, 1),
+            end_date=date(2020, 6, 30),
+        )
+        past = self._create_session(semester=past_semester, group_code="P")
+        today = date(2024, 9, 7)
+        for offset in (1, 30):
+            MakeupClassSession.objects.create(
+                institution=self.institution,
+                class_session=current,
+                date=today + timedelta(days=offset),
+                start_time=time(14, 0),
+                end_time=time(15, 0),
+                classroom=self.classroom,
+            )
+
+        snapshot = get_timetable_snapshot(self.institution.id, use_cache=False, today=today)
+        self.assertEqual(list(snapshot.sessions["id"]), [current.id])
+        self.assertEqual(list(snapshot.makeups["date"]), [today + timedelta(days=1)])
+
+        self._update_screen_filter(filter_semester=past_semester.id)
+        payload = display_service.build_public_payload(self.screen, use_cache=False)
+        self.assertEqual([item["id"] for item in payload["sessions"]], [past.id])
+
     def test_service_does_not_infer_week_type_from_date_override(self):
         """Date overrides should not infer implicit week-type constraints."""
         odd_session = self._create_session(week_type=ClassSession.WeekTypeChoices.ODD)
@@ -221,7 +334,7 @@ class DisplayServiceViewAdminTests(TestCase):
             SimpleUploadedFile("logo.png", b"logo-bytes", content_type="image/png"),
             save=True,
         )
-        cache.delete(f"display:{self.screen.slug}")
+        display_service.invalidate_screen_cache(self.screen)
 
         payload = display_service.build_public_payload(self.screen, use_cache=False)
 
@@ -324,6 +437,33 @@ class DisplayServiceViewAdminTests(TestCase):
         self.assertTrue(second_meta["is_last_page"])
         self.assertFalse(second_meta["has_more"])
 
+    def test_list_display_screens_resolves_semesters_in_bulk(self):
+        """Listing costs the same number of queries for 2 or 10 screens."""
+        self.semester.is_active = True
+        self.semester.save()
+
+        def list_queries(extra: int) -> int:
+            for index in range(extra):
+                DisplayScreen.objects.create(
+                    institution=self.institution,
+                    title=f"Week Screen {extra}-{index}",
+                    filter_use_current_week_type=True,
+                    filter_semester=self.semester if index % 2 else None,
+                )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.api_client.get("/api/displays/screens/")
+            self.assertEqual(response.status_code, 200)
+            computed = {
+                screen["filter_computed_week_type"]
+                for screen in response.data["data"]["screens"]
+                if screen["filter_use_current_week_type"]
+            }
+            self.assertTrue(computed)
+            self.assertNotIn(None, computed)
+            return len(queries)
+
+        self.assertEqual(list_queries(1), list_queries(8))
+
     def test_api_screen_and_filter_flow(self):
         screen_response = self.api_client.post(
             "/api/displays/screens/create/",
@@ -602,6 +742,183 @@ class DisplayServiceViewAdminTests(TestCase):
         self.assertEqual(meta["items_on_page"], len(sessions))
         self.assertEqual(meta["total_count"], len(sessions))
 
+    def test_public_view_supports_conditional_requests(self):
+        """Unchanged payloads are answered with 304 using the stored ETag."""
+        self._create_session()
+        response = self.client.get(f"/displays/{self.screen.slug}/")
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+
+        not_modified = self.client.get(f"/displays/{self.screen.slug}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], etag)
+        self.assertEqual(not_modified.content, b"")
+
+        display_service.invalidate_screen_cache(self.screen)
+        rebuilt = self.client.get(f"/displays/{self.screen.slug}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(rebuilt.status_code, 304)
+
+        self._create_session(start_time=time(12, 0), end_time=time(14, 0))
+        display_service.invalidate_screen_cache(self.screen)
+        changed = self.client.get(f"/displays/{self.screen.slug}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_public_view_serves_pre_rendered_body(self):
+        """Repeated polls reuse the encoded body instead of re-paginating."""
+        self._create_session()
+        url = f"/displays/{self.screen.slug}/?page=1&page_size=5"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+
+        with patch("displays.views.display_views.BaseResponse.paginate_queryset") as paginate:
+            second = self.client.get(url)
+        paginate.assert_not_called()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Content-Type"], "application/json")
+
+        other_page_size = self.client.get(f"/displays/{self.screen.slug}/?page=1&page_size=2")
+        self.assertEqual(other_page_size.json()["meta"]["page_size"], 2)
+
+    def test_public_view_serves_precompressed_variants(self):
+        self._create_session()
+        url = f"/displays/{self.screen.slug}/"
+        plain = self.client.get(url)
+
+        with patch("displays.services.display_cache.gzip.compress") as compress:
+            gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        compress.assert_not_called()
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", gzipped["Vary"])
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+        # Different codings never share a strong validator.
+        self.assertEqual(gzipped["ETag"], f"W/{plain['ETag']}")
+
+        revalidated = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=gzipped["ETag"]
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["ETag"], gzipped["ETag"])
+        self.assertIn("Accept-Encoding", revalidated["Vary"])
+        plain_revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(plain_revalidated.status_code, 304)
+        self.assertEqual(plain_revalidated["ETag"], plain["ETag"])
+
+        refused = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertFalse(refused.has_header("Content-Encoding"))
+        self.assertEqual(refused.content, plain.content)
+
+    async def test_public_stream_pushes_payload_and_changes(self):
+        """SSE stream sends the payload, then a new event after invalidation."""
+        session = await sync_to_async(self._create_session)()
+        response = await self.async_client.get(f"/displays/{self.screen.slug}/stream/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        self.assertEqual(
+            await display_cache.apayload_cache_key(self.screen),
+            await sync_to_async(payload_cache_key)(self.screen),
+        )
+        first_event = (await anext(stream)).decode("utf-8")
+        self.assertIn("event: payload", first_event)
+        self.assertIn(f'"session_id": {session.id}', first_event)
+
+        with patch("displays.views.display_stream_views.POLL_INTERVAL_SECONDS", 0):
+            await sync_to_async(self._create_session)(start_time=time(12, 0), end_time=time(14, 0))
+            await sync_to_async(display_service.invalidate_screen_cache)(self.screen)
+            second_event = (await anext(stream)).decode("utf-8")
+        self.assertIn("event: payload", second_event)
+        self.assertNotEqual(first_event.split("\n", 1)[0], second_event.split("\n", 1)[0])
+
+    def test_public_view_long_polls_since_version(self):
+        """``since_version`` is held until the payload version changes or the timeout passes."""
+        self._create_session()
+        url = f"/displays/{self.screen.slug}/"
+        version = self.client.get(url).json()["data"]["version"]
+
+        unchanged = self.client.get(url, {"since_version": version, "timeout": 0})
+        self.assertEqual(unchanged.status_code, 200)
+        self.assertEqual(unchanged.json()["code"], "2791")
+        self.assertEqual(unchanged.json()["data"], {"version": version, "changed": False})
+
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            # A change lands while the request is parked.
+            sleeps.append(seconds)
+            await sync_to_async(self._create_session)(start_time=time(16, 0), end_time=time(18, 0))
+            await sync_to_async(display_service.invalidate_screen_cache)(self.screen)
+
+        with patch("displays.views.display_views.asyncio.sleep", fake_sleep):
+            held = self.client.get(url, {"since_version": version, "timeout": 20}).json()
+        self.assertEqual(sleeps, [display_views.LONG_POLL_INTERVAL_SECONDS])
+        self.assertEqual(held["code"], "2790")
+        self.assertGreater(held["data"]["version"], version)
+        version = held["data"]["version"]
+
+        display_service.invalidate_screen_cache(self.screen)
+        rebuilt = self.client.get(url, {"since_version": version, "timeout": 0})
+        self.assertEqual(rebuilt.json()["code"], "2791")
+
+        self._create_session(start_time=time(12, 0), end_time=time(14, 0))
+        display_service.invalidate_screen_cache(self.screen)
+        changed = self.client.get(url, {"since_version": version, "timeout": 0}).json()
+        self.assertEqual(changed["code"], "2790")
+        self.assertGreater(changed["data"]["version"], version)
+        self.assertEqual(len(changed["data"]["sessions"]), 3)
+
+        invalid = self.client.get(url, {"since_version": "abc"})
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(invalid.json()["code"], "4804")
+
+    def test_public_delta_lists_changed_sessions(self):
+        """The changes endpoint returns only added, modified and removed entries."""
+        first = self._create_session()
+        second = self._create_session(start_time=time(12, 0), end_time=time(14, 0))
+        version = self.client.get(f"/displays/{self.screen.slug}/").json()["data"]["version"]
+
+        second.delete()
+        third = self._create_session(start_time=time(16, 0), end_time=time(18, 0))
+        first.note = "Moved online"
+        first.save()
+        display_service.invalidate_screen_cache(self.screen)
+
+        response = self.client.get(
+            f"/displays/{self.screen.slug}/changes/", {"since_version": version}
+        )
+        self.assertEqual(response.status_code, 200)
+        delta = response.json()["data"]
+        self.assertFalse(delta["reset"])
+        self.assertGreater(delta["version"], version)
+        self.assertEqual([item["id"] for item in delta["added"]], [third.id])
+        self.assertEqual([item["id"] for item in delta["modified"]], [first.id])
+        self.assertEqual(delta["removed"], [f"session:{second.id}"])
+
+        unknown = self.client.get(
+            f"/displays/{self.screen.slug}/changes/", {"since_version": version - 100}
+        ).json()["data"]
+        self.assertTrue(unknown["reset"])
+
+    def test_payload_versions_are_unique_and_history_is_slotted(self):
+        """Every new ETag gets its own version and a ring-buffer slot of its own."""
+        versions = [
+            display_cache.record_payload_version(self.screen.id, f'"etag-{index}"')
+            for index in range(display_cache.VERSION_HISTORY_SIZE + 2)
+        ]
+        self.assertEqual(len(set(versions)), len(versions))
+        self.assertEqual(versions, sorted(versions))
+        latest_etag = f'"etag-{len(versions) - 1}"'
+        self.assertEqual(display_cache.record_payload_version(self.screen.id, latest_etag), versions[-1])
+
+        for version in versions:
+            display_cache.record_version_history(self.screen.id, version, [{"id": version}])
+        self.assertIsNone(display_cache.get_version_fingerprints(self.screen.id, versions[0]))
+        self.assertEqual(
+            display_cache.get_version_fingerprints(self.screen.id, versions[-1]),
+            display_cache.session_fingerprints([{"id": versions[-1]}]),
+        )
+
     def test_public_view_paginates_sessions(self):
         """Public endpoint must expose page navigators for kiosk clients."""
         for index in range(3):
@@ -634,6 +951,142 @@ class DisplayServiceViewAdminTests(TestCase):
         self.assertEqual(second_meta["current_page"], 2)
         self.assertFalse(second_meta["is_first_page"])
 
+    def test_public_view_compact_layout_round_trips(self):
+        self._create_session()
+        self._create_session(group_code="B", start_time=time(10, 0), end_time=time(12, 0))
+        self._create_session(
+            classroom=self.second_classroom,
+            group_code="C",
+            start_time=time(12, 0),
+            end_time=time(14, 0),
+        )
+        regular = self.client.get(f"/displays/{self.screen.slug}/")
+        compact = self.client.get(f"/displays/{self.screen.slug}/?layout=compact")
+        negotiated = self.client.get(
+            f"/displays/{self.screen.slug}/",
+            HTTP_ACCEPT=payload_compaction.COMPACT_MEDIA_TYPE,
+        )
+
+        self.assertEqual(compact.status_code, 200)
+        self.assertEqual(compact["Content-Type"], payload_compaction.COMPACT_MEDIA_TYPE)
+        self.assertNotEqual(compact["ETag"], regular["ETag"])
+        self.assertEqual(negotiated.json()["data"], compact.json()["data"])
+
+        sessions = compact.json()["data"]["sessions"]
+        self.assertEqual(sessions["count"], 3)
+        self.assertEqual(sessions["constants"]["course_title"], "Algorithms")
+        self.assertEqual(sessions["strings"].count("101"), 1)
+        self.assertIsNone(sessions["constants"]["cancellation_reason"])
+        self.assertEqual(
+            payload_compaction.expand_sessions(sessions),
+            regular.json()["data"]["sessions"],
+        )
+
+    def test_room_now_next_applies_cancellations_and_makeups(self):
+        day = date(2024, 9, 7)  # a Saturday within the semester
+        first = self._create_session()
+        cancelled = self._create_session(group_code="B", start_time=time(10, 0), end_time=time(12, 0))
+        self._create_session(classroom=self.second_classroom, group_code="C")
+        free_classroom = Classroom.objects.create(title="103", building=self.second_building)
+        ClassCancellation.objects.create(
+            institution=self.institution, class_session=cancelled, date=day, reason="Holiday"
+        )
+        makeup = MakeupClassSession.objects.create(
+            institution=self.institution,
+            class_session=first,
+            date=day,
+            start_time=time(14, 0),
+            end_time=time(15, 30),
+            classroom=self.classroom,
+        )
+
+        def at(hour, minute=0):
+            return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+        during_first = room_timeline.now_and_next(
+            self.institution.id, classroom_id=self.classroom.id, at=at(9)
+        )["classrooms"][0]
+        self.assertEqual(during_first["current"]["session_id"], first.id)
+        self.assertEqual(during_first["next"]["makeup_id"], makeup.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            between = room_timeline.now_and_next(
+                self.institution.id, classroom_id=self.classroom.id, at=at(11)
+            )["classrooms"][0]
+        self.assertEqual(len(queries), 0)
+        self.assertIsNone(between["current"])
+        self.assertTrue(between["next"]["is_makeup"])
+
+        building = room_timeline.now_and_next(
+            self.institution.id, building_id=self.second_building.id, at=at(8, 30)
+        )
+        self.assertEqual(
+            [room["classroom_id"] for room in building["classrooms"]],
+            [self.second_classroom.id, free_classroom.id],
+        )
+        self.assertEqual(building["classrooms"][0]["current"]["group_code"], "C")
+        self.assertIsNone(building["classrooms"][1]["current"])
+        self.assertIsNone(building["classrooms"][1]["next"])
+        self.assertEqual(building["classrooms"][1]["classroom_title"], "103")
+
+    def test_room_now_next_view_is_scoped_to_the_screen(self):
+        url = f"/displays/{self.screen.slug}/now/"
+        unfiltered = self.client.get(url)
+        self.assertEqual(unfiltered.status_code, 400)
+        self.assertEqual(unfiltered.json()["code"], ErrorCodes.DISPLAY_ROOM_FILTER_MISSING["code"])
+        self.assertEqual(self.client.get("/displays/missing-screen/now/").status_code, 404)
+
+        # Query parameters cannot widen the screen's own room filter.
+        self._update_screen_filter(filter_classroom=self.classroom.id)
+        response = self.client.get(url, {"classroom": self.second_classroom.id})
+        self.assertEqual(response.status_code, 200)
+        classrooms = response.json()["data"]["classrooms"]
+        self.assertEqual([room["classroom_id"] for room in classrooms], [self.classroom.id])
+
+        self._update_screen_filter(filter_classroom=None, filter_building=self.second_building.id)
+        response = self.client.get(url)
+        self.assertEqual(
+            [room["classroom_id"] for room in response.json()["data"]["classrooms"]],
+            [self.second_classroom.id],
+        )
+
+    def test_display_bundle_resolves_each_day_locally(self):
+        self._update_screen_filter(filter_use_current_day_of_week=True, filter_semester=self.semester.id)
+        first = self._create_session()
+        self._create_session(group_code="B", day_of_week="یکشنبه")
+        ClassCancellation.objects.create(
+            institution=self.institution, class_session=first, date=date(2024, 9, 14)
+        )
+
+        bundle = display_bundle.build_display_bundle(self.screen, start=date(2024, 9, 7), days=8)
+
+        self.assertEqual(len(bundle["days"]), 8)
+        sessions = payload_compaction.expand_sessions(bundle["sessions"])
+        saturday, sunday, *_, next_saturday = bundle["days"]
+        self.assertEqual(saturday["day_of_week"], "شنبه")
+        self.assertEqual(saturday["count"], 1)
+        self.assertEqual(sessions[saturday["offset"]]["session_id"], first.id)
+        self.assertEqual(sessions[sunday["offset"]]["group_code"], "B")
+        self.assertTrue(sessions[next_saturday["offset"]]["is_cancelled"])
+        self.assertNotEqual(saturday["week_type"], next_saturday["week_type"])
+
+    def test_public_bundle_view_is_versioned(self):
+        url = f"/displays/{self.screen.slug}/bundle/"
+        response = self.client.get(url, {"days": 30})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(len(data["days"]), display_bundle.BUNDLE_MAX_DAYS)
+        # Unfiltered screens render once and every day shares the same slice.
+        self.assertEqual({day["offset"] for day in data["days"]}, {0})
+
+        cached = self.client.get(url, {"days": 30}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+        self._create_session()
+        changed = self.client.get(url, {"days": 30}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.json()["data"]["version"], data["version"])
+
     def test_admin_preview_action_returns_redirect(self):
         factory = RequestFactory()
         request = factory.get("/admin/displays/displayscreen/")
@@ -683,6 +1136,7 @@ class DisplayCacheInvalidationTests(TestCase):
             title="Spring",
             start_date=date(2024, 2, 1),
             end_date=date(2024, 6, 30),
+            is_active=True,
         )
         self.building = Building.objects.create(title="Main", institution=self.institution)
         self.classroom = Classroom.objects.create(title="201", building=self.building)
@@ -720,22 +1174,301 @@ class DisplayCacheInvalidationTests(TestCase):
         self.assertEqual(first_response.status_code, 200)
         first_sessions = first_response.json()["data"]["sessions"]
         self.assertEqual(first_sessions, [])
-        self.assertIsNotNone(cache.get(f"display:{self.screen.slug}"))
+        self.assertIsNotNone(cache.get(payload_cache_key(self.screen)))
 
         other_response = self.client.get(f"/displays/{self.other_screen.slug}/")
         self.assertEqual(other_response.status_code, 200)
-        self.assertIsNotNone(cache.get(f"display:{self.other_screen.slug}"))
+        self.assertIsNotNone(cache.get(payload_cache_key(self.other_screen)))
 
         class_session_service.create_class_session(
             self._session_payload(),
             self.institution,
         )
 
-        self.assertIsNone(cache.get(f"display:{self.screen.slug}"))
-        self.assertIsNotNone(cache.get(f"display:{self.other_screen.slug}"))
+        self.assertIsNone(cache.get(payload_cache_key(self.screen)))
+        self.assertIsNotNone(cache.get(payload_cache_key(self.other_screen)))
 
         refreshed_response = self.client.get(f"/displays/{self.screen.slug}/")
         self.assertEqual(refreshed_response.status_code, 200)
         refreshed_sessions = refreshed_response.json()["data"]["sessions"]
         self.assertEqual(len(refreshed_sessions), 1)
         self.assertEqual(refreshed_sessions[0]["course_title"], self.course.title)
+
+    def test_orm_session_write_invalidates_cached_payloads(self):
+        """Writes that bypass the services (e.g. Django admin) still retire payloads."""
+        self.client.get(f"/displays/{self.screen.slug}/")
+        self.assertIsNotNone(cache.get(payload_cache_key(self.screen)))
+
+        ClassSession.objects.create(
+            institution=self.institution,
+            course=self.course,
+            professor=self.professor,
+            classroom=self.classroom,
+            semester=self.semester,
+            day_of_week="شنبه",
+            start_time=time(8, 0),
+            end_time=time(10, 0),
+        )
+
+        sessions = self.client.get(f"/displays/{self.screen.slug}/").json()["data"]["sessions"]
+        self.assertEqual(len(sessions), 1)
+
+    def test_invalidation_uses_screen_index_without_queries(self):
+        """Only screens whose selectors match the session are invalidated."""
+        second_classroom = Classroom.objects.create(title="202", building=self.building)
+        unrelated_screen = DisplayScreen.objects.create(
+            institution=self.institution,
+            title="Room 202",
+            filter_classroom=second_classroom,
+            filter_is_active=True,
+        )
+        for screen in (self.screen, unrelated_screen):
+            self.client.get(f"/displays/{screen.slug}/")
+            self.assertIsNotNone(cache.get(payload_cache_key(screen)))
+
+        session = class_session_service.create_class_session(
+            self._session_payload(),
+            self.institution,
+        )
+        # The save signal retires every payload of the institution.
+        self.assertIsNone(cache.get(payload_cache_key(self.screen)))
+        self.assertIsNone(cache.get(payload_cache_key(unrelated_screen)))
+        for screen in (self.screen, unrelated_screen):
+            self.client.get(f"/displays/{screen.slug}/")
+
+        instance = ClassSession.objects.select_related("classroom", "semester").get(pk=session["id"])
+        with CaptureQueriesContext(connection) as queries:
+            invalidate_related_displays(instance)
+        self.assertIsNone(cache.get(payload_cache_key(self.screen)))
+        self.assertFalse(
+            [
+                query
+                for query in queries.captured_queries
+                if "displays_displayscreen" in query["sql"] or "semesters_semester" in query["sql"]
+            ]
+        )
+        self.assertIsNotNone(cache.get(payload_cache_key(unrelated_screen)))
+
+    def test_institution_generation_invalidates_every_screen(self):
+        """A single institution bump retires all payload keys of its screens."""
+        for screen in (self.screen, self.other_screen):
+            self.client.get(f"/displays/{screen.slug}/")
+        stale_key = payload_cache_key(self.screen)
+        self.assertIsNotNone(cache.get(stale_key))
+
+        bump_institution_generation(self.institution.id)
+
+        self.assertNotEqual(payload_cache_key(self.screen), stale_key)
+        self.assertIsNone(cache.get(payload_cache_key(self.screen)))
+        self.assertIsNotNone(cache.get(payload_cache_key(self.other_screen)))
+
+    def test_expired_payload_is_served_while_another_worker_rebuilds(self):
+        """Only the lock holder rebuilds; other readers get the previous copy."""
+        first = self.client.get(f"/displays/{self.screen.slug}/").json()["data"]
+        key = payload_cache_key(self.screen)
+        entry = cache.get(key)
+        entry["expires_at"] = time_module.time() - 1
+        cache.set(key, entry)
+
+        token = display_cache.acquire_rebuild_lock(key)
+        self.assertIsNotNone(token)
+        with patch.object(display_service, "_render_public_payload") as render:
+            payload = display_service.build_public_payload(self.screen)
+        render.assert_not_called()
+        self.assertEqual(payload["generated_at"], first["generated_at"])
+
+        display_cache.release_rebuild_lock(key, token)
+        refreshed = display_service.build_public_payload(self.screen)
+        self.assertNotEqual(refreshed["generated_at"], first["generated_at"])
+        self.assertGreater(cache.get(key)["expires_at"], entry["expires_at"])
+
+    def test_early_refresh_probability_depends_on_remaining_time(self):
+        entry = display_cache.make_entry({}, ttl=60, build_seconds=0.5)
+        now = entry["expires_at"] - 60
+        with patch("displays.services.display_cache.random.random", return_value=0.5):
+            self.assertFalse(display_cache.should_refresh(entry, now=now))
+            self.assertTrue(display_cache.should_refresh(entry, now=entry["expires_at"] - 0.1))
+        self.assertTrue(display_cache.should_refresh(entry, now=entry["expires_at"]))
+
+    def test_stale_while_revalidate_serves_previous_payload_and_refreshes(self):
+        """Kiosk reads return the last payload instantly and rebuild in background."""
+        first = display_service.build_public_payload(self.screen, stale_while_revalidate=True)
+        self.assertFalse(first["is_stale"])
+        key = payload_cache_key(self.screen)
+        entry = cache.get(key)
+        entry["expires_at"] = time_module.time() - 120
+        cache.set(key, entry)
+
+        with patch.object(display_service.background_refresh, "submit") as submit:
+            payload = display_service.build_public_payload(self.screen, stale_while_revalidate=True)
+        self.assertTrue(payload["is_stale"])
+        self.assertGreaterEqual(payload["stale_seconds"], 120)
+        self.assertEqual(payload["generated_at"], first["generated_at"])
+        submit.assert_called_once()
+
+        task, *args = submit.call_args.args
+        task(*args)
+        refreshed = display_service.build_public_payload(self.screen, stale_while_revalidate=True)
+        self.assertFalse(refreshed["is_stale"])
+        self.assertNotEqual(refreshed["generated_at"], first["generated_at"])
+        self.assertIsNone(cache.get(f"{key}:lock"))
+
+    def test_static_screen_payload_expires_after_max_ttl(self):
+        display_service.build_public_payload(self.screen)
+        entry = cache.get(payload_cache_key(self.screen))
+        self.assertEqual(entry["ttl"], payload_expiry.PAYLOAD_MAX_TTL_SECONDS)
+        self.assertNotIn(timezone.localdate().isoformat(), payload_cache_key(self.screen))
+
+    def test_current_day_screen_payload_expires_at_local_midnight(self):
+        self.screen.filter_use_current_day_of_week = True
+        self.screen.save()
+        plan = get_filter_plan(self.screen)
+        now = timezone.make_aware(datetime(2024, 3, 2, 23, 50))
+        self.assertTrue(plan.is_date_dependent)
+        self.assertEqual(payload_expiry.payload_ttl(plan, now), 10 * 60)
+
+        today_key = payload_cache_key(self.screen, for_date=date(2024, 3, 2))
+        tomorrow_key = payload_cache_key(self.screen, for_date=date(2024, 3, 3))
+        self.assertNotEqual(today_key, tomorrow_key)
+        self.assertTrue(tomorrow_key.endswith(":2024-03-03"))
+
+    def test_prewarm_stores_next_day_payload_without_new_version(self):
+        self.screen.filter_use_current_day_of_week = True
+        self.screen.save()
+        tomorrow = timezone.localdate() + timedelta(days=1)
+
+        warmed = display_service.prewarm_next_day_payloads(self.institution)
+
+        self.assertEqual(warmed, 1)
+        entry = cache.get(payload_cache_key(self.screen, for_date=tomorrow))
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry["payload"]["filter"]["computed_day_of_week"], PY_WEEKDAY_TO_PERSIAN[tomorrow.weekday()])
+        self.assertGreater(entry["ttl"], payload_expiry.PAYLOAD_MAX_TTL_SECONDS)
+        self.assertIsNone(display_cache.get_payload_version(self.screen.id))
+
+    def test_prewarmed_entry_keeps_its_version_and_expiry(self):
+        self.screen.filter_use_current_day_of_week = True
+        self.screen.save()
+        display_service.prewarm_display_screen(self.screen, timezone.localdate())
+        key = payload_cache_key(self.screen)
+        expires_at = cache.get(key)["expires_at"]
+
+        with patch.object(
+            display_cache, "record_payload_version", wraps=display_cache.record_payload_version
+        ) as record:
+            first = self.client.get(f"/displays/{self.screen.slug}/").json()["data"]["version"]
+            second = self.client.get(f"/displays/{self.screen.slug}/").json()["data"]["version"]
+
+        record.assert_called_once()
+        self.assertEqual(first, second)
+        entry = cache.get(key)
+        self.assertEqual(entry["version"], first)
+        self.assertEqual(entry["expires_at"], expires_at)
+
+    def test_prewarm_command_requires_a_shared_cache(self):
+        self.screen.filter_use_current_day_of_week = True
+        self.screen.save()
+
+        with self.assertRaises(CommandError):
+            call_command("prewarm_display_payloads", stdout=StringIO())
+
+        out = StringIO()
+        with patch.object(display_cache, "is_cache_shared", return_value=True):
+            call_command("prewarm_display_payloads", institution=self.institution.id, stdout=out)
+        self.assertIn("Pre-warmed 1 display payload(s)", out.getvalue())
+
+    def test_course_rename_invalidates_institution_payloads(self):
+        display_service.build_public_payload(self.screen)
+        key = payload_cache_key(self.screen)
+
+        self.course.title = "Algorithms"
+        self.course.save()
+
+        self.assertNotEqual(payload_cache_key(self.screen), key)
+
+    def test_warm_screens_populates_cache_and_reports_queries(self):
+        screen_ids = display_warmup.list_screen_ids_to_warm(self.institution)
+        self.assertEqual(screen_ids, [self.screen.id])
+
+        results = list(display_warmup.warm_screens(screen_ids, workers=1))
+
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0].error)
+        self.assertEqual(results[0].slug, self.screen.slug)
+        self.assertGreater(results[0].queries, 0)
+        self.assertIsNotNone(cache.get(payload_cache_key(self.screen)))
+
+    def test_warm_displays_command_reports_each_screen(self):
+        out, err = StringIO(), StringIO()
+        # The test cache is process-local, so the pool is skipped with a warning.
+        with patch("displays.services.display_warmup.ProcessPoolExecutor") as pool:
+            call_command("warm_displays", workers=4, stdout=out, stderr=err)
+        pool.assert_not_called()
+        self.assertIn("local to this process", err.getvalue())
+        self.assertEqual(display_warmup.effective_workers(4), 1)
+        output = out.getvalue()
+        self.assertIn(f"{self.screen.slug}:", output)
+        self.assertIn(f"{self.other_screen.slug}:", output)
+        self.assertIn("Warmed 2/2", output)
+        self.assertIsNotNone(cache.get(payload_cache_key(self.other_screen)))
+
+    def test_batch_endpoint_returns_payloads_and_missing_slugs(self):
+        second = DisplayScreen.objects.create(institution=self.institution, title="Hall Cache")
+        url = f"/displays/batch/?slugs={self.screen.slug},{second.slug},unknown"
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(list(data["screens"]), [self.screen.slug, second.slug])
+        self.assertEqual(data["missing"], ["unknown"])
+        self.assertEqual(
+            data["screens"][second.slug]["etag"],
+            cache.get(payload_cache_key(second))["etag"],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(url)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(cached.json()["data"], data)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_batch_endpoint_rejects_empty_slug_list(self):
+        response = self.client.get("/displays/batch/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["code"], "4805")
+
+    def test_batch_is_reserved_as_screen_slug(self):
+        screen = DisplayScreen.objects.create(institution=self.institution, title="Batch")
+        self.assertNotEqual(screen.slug, "batch")
+
+    def test_warm_public_poll_runs_no_queries(self):
+        self.client.get(f"/displays/{self.screen.slug}/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/displays/{self.screen.slug}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 0)
+
+    def test_screen_lookup_cache_follows_updates_and_deletes(self):
+        first = display_service.get_display_screen_by_slug_or_404(self.screen.slug)
+        self.assertIs(display_service.get_display_screen_by_slug_or_404(self.screen.slug), first)
+
+        display_service.update_display_screen(self.screen, {"title": "Renamed Lobby"})
+        renamed = display_service.get_display_screen_by_slug_or_404(self.screen.slug)
+        self.assertEqual(renamed.title, "Renamed Lobby")
+
+        self.institution.name = "Renamed Inst"
+        self.institution.save()
+        bump_institution_generation(self.institution.id)
+        self.assertEqual(
+            display_service.get_display_screen_by_slug_or_404(self.screen.slug).institution.name,
+            "Renamed Inst",
+        )
+
+        display_service.delete_display_screen(renamed)
+        with self.assertRaises(CustomValidationError):
+            display_service.get_display_screen_by_slug_or_404(self.screen.slug)
@@ -7,6 +7,11 @@ from displays.views import (
     update_display_screen_view,
     delete_display_screen_view,
     public_display_view,
+    public_display_delta_view,
+    public_display_batch_view,
+    public_display_bundle_view,
+    public_display_stream_view,
+    public_room_now_next_view,
 )
 
 app_name = "displays"
@@ -23,7 +28,13 @@ api_urlpatterns = [
 # by kiosk/TV clients that only know the screen slug.  Access should be limited
 # to opaque slugs shared with trusted devices.
 public_urlpatterns = [
+    # Must precede ``<slug>/``; "batch" is a reserved screen slug.
+    path("batch/", public_display_batch_view, name="public-display-batch"),
     path("<slug:slug>/", public_display_view, name="public-display"),
+    path("<slug:slug>/now/", public_room_now_next_view, name="public-room-now-next"),
+    path("<slug:slug>/stream/", public_display_stream_view, name="public-display-stream"),
+    path("<slug:slug>/changes/", public_display_delta_view, name="public-display-delta"),
+    path("<slug:slug>/bundle/", public_display_bundle_view, name="public-display-bundle"),
 ]
 
 urlpatterns = api_urlpatterns
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Any
+from typing import Any, Dict, Iterable
 
+from django.db.models import Q
 from django.utils import timezone
 
 from schedules.models import ClassSession
 
-from displays.models.display_models import PY_WEEKDAY_TO_PERSIAN
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
 from semesters.models import Semester
 from semesters.repositories import semester_repository
 
@@ -23,6 +24,12 @@ def parse_date(value: Any) -> date | None:
     return None
 
 
+def format_professor_name(first_name: str | None, last_name: str | None) -> str:
+    """Join a professor's first and last name as shown on display payloads."""
+
+    return f"{first_name} {last_name}".strip()
+
+
 def _get_value(filter_data: Any, key: str) -> Any:
     if isinstance(filter_data, dict):
         return filter_data.get(key)
@@ -48,7 +55,15 @@ def compute_filter_day_of_week(filter_data: Any) -> str | None:
     return None
 
 
-def compute_filter_week_type(filter_data: Any) -> str | None:
+_UNRESOLVED = object()
+
+
+def compute_filter_week_type(filter_data: Any, *, semester: Any = _UNRESOLVED) -> str | None:
+    """Return the effective week type of a filter.
+
+    ``semester`` lets callers that resolved semesters in bulk (see
+    :func:`resolve_screen_semesters`) skip the per-filter lookup.
+    """
     week_type = _get_value(filter_data, "week_type") or _get_value(
         filter_data, "filter_week_type"
     )
@@ -67,24 +82,17 @@ def compute_filter_week_type(filter_data: Any) -> str | None:
     if reference_date is None:
         reference_date = timezone.localdate()
 
-    semester = _resolve_semester(filter_data)
+    if semester is _UNRESOLVED:
+        semester = resolve_filter_semester(filter_data)
     if not semester:
         return None
 
-    start_date = getattr(semester, "start_date", None)
-    if not start_date:
-        return None
+    return ClassSession.week_type_for_date(getattr(semester, "start_date", None), reference_date)
 
-    delta_days = (reference_date - start_date).days
-    if delta_days < 0:
-        delta_days = 0
-    weeks_since_start = delta_days // 7
-    if weeks_since_start % 2 == 0:
-        return ClassSession.WeekTypeChoices.ODD
-    return ClassSession.WeekTypeChoices.EVEN
 
+def resolve_filter_semester(filter_data: Any) -> Semester | None:
+    """Return the semester a filter refers to, defaulting to the institution's active one."""
 
-def _resolve_semester(filter_data: Any) -> Semester | None:
     candidate = _get_value(filter_data, "filter_semester") or _get_value(filter_data, "semester")
     semester = _normalise_semester(candidate)
     if semester:
@@ -103,6 +111,55 @@ def _resolve_semester(filter_data: Any) -> Semester | None:
     return None
 
 
+def resolve_screen_semesters(screens: Iterable[Any]) -> Dict[int, Semester | None]:
+    """Resolve the week-type reference semester of many screens with one query.
+
+    Mirrors :func:`resolve_filter_semester` for screens that use the current week
+    type: the selected ``filter_semester`` wins, otherwise the institution's
+    active semester is used.
+
+    Args:
+        screens: صفحه‌نمایش‌های یک صفحه از فهرست.
+
+    Returns:
+        dict[int, Semester | None]: نگاشت شناسهٔ صفحه‌نمایش به ترم مرجع آن.
+    """
+
+    pending = [
+        screen
+        for screen in screens
+        if screen.filter_use_current_week_type and not screen.filter_week_type
+    ]
+    if not pending:
+        return {}
+
+    semester_ids = {screen.filter_semester_id for screen in pending if screen.filter_semester_id}
+    institution_ids = {
+        screen.institution_id for screen in pending if not screen.filter_semester_id
+    }
+    found = Semester.objects_with_deleted.filter(
+        Q(pk__in=semester_ids)
+        | Q(institution_id__in=institution_ids, is_active=True, is_deleted=False)
+    ).order_by("pk")
+
+    by_id: Dict[int, Semester] = {}
+    active_by_institution: Dict[int, Semester] = {}
+    for semester in found:
+        if semester.pk in semester_ids:
+            by_id[semester.pk] = semester
+        if semester.is_active and not semester.is_deleted:
+            active_by_institution.setdefault(semester.institution_id, semester)
+
+    return {
+        screen.pk: (
+            by_id.get(screen.filter_semester_id)
+            if screen.filter_semester_id
+            else active_by_institution.get(screen.institution_id)
+        )
+        for screen in pending
+    }
+
+
 def _normalise_semester(value: Any) -> Semester | None:
     if isinstance(value, Semester):
         return value
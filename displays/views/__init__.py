@@ -5,7 +5,12 @@ from .display_views import (
     update_display_screen_view,
     delete_display_screen_view,
     public_display_view,
+    public_display_delta_view,
+    public_display_batch_view,
+    public_display_bundle_view,
 )
+from .room_views import public_room_now_next_view
+from .display_stream_views import public_display_stream_view
 
 __all__ = [
     "list_display_screens_view",
@@ -14,4 +19,9 @@ __all__ = [
     "update_display_screen_view",
     "delete_display_screen_view",
     "public_display_view",
+    "public_display_delta_view",
+    "public_display_batch_view",
+    "public_display_bundle_view",
+    "public_room_now_next_view",
+    "public_display_stream_view",
 ]
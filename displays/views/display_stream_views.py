@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+"""Server-Sent Events channel for public display screens.
+
+کیوسک‌ها به‌جای پرس‌وجوی دوره‌ای، یک اتصال SSE باز نگه می‌دارند و فقط زمانی
+خروجی جدید دریافت می‌کنند که نسل کش صفحه‌نمایش (در اثر
+``invalidate_related_displays`` یا ``update_display_screen``) تغییر کند. در
+فواصل بی‌تغییر، پیام heartbeat ارسال می‌شود تا اتصال توسط پراکسی‌ها بسته نشود.
+"""
+
+import asyncio
+import json
+import time as time_module
+from typing import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from unischedule.core.exceptions import CustomValidationError
+
+from displays.services import display_cache, display_service
+
+# Seconds between two checks of the screen's cache generations.  Each check is
+# one async cache round trip per open stream, so this bounds the cache load of
+# a wall of screens; kiosks tolerate a few seconds of delay.
+POLL_INTERVAL_SECONDS = 5.0
+
+# Seconds of silence after which a heartbeat comment is sent.
+HEARTBEAT_INTERVAL_SECONDS = 15.0
+
+# Streams are recycled periodically; EventSource clients reconnect on their own.
+STREAM_MAX_SECONDS = 10 * 60
+
+# Reconnection delay advertised to EventSource clients (milliseconds).
+RETRY_MILLISECONDS = 5000
+
+
+def _format_event(event: str, data: dict, *, event_id: str | None = None) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    encoded = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    lines.extend(f"data: {line}" for line in encoded.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+async def _event_stream(slug: str, screen) -> AsyncIterator[str]:
+    """Yield payload events whenever the screen's payload generation changes."""
+
+    yield f"retry: {RETRY_MILLISECONDS}\n\n"
+
+    started = time_module.monotonic()
+    last_key = None
+    last_etag = None
+    next_rebuild_check = 0.0
+    last_sent = started
+
+    while time_module.monotonic() - started < STREAM_MAX_SECONDS:
+        now = time_module.monotonic()
+        cache_key = await display_cache.apayload_cache_key(screen)
+        if cache_key != last_key or now >= next_rebuild_check:
+            if last_key is not None and cache_key != last_key:
+                # The screen configuration may have changed with the generation.
+                try:
+                    screen = await sync_to_async(display_service.get_screen_with_plan_or_404)(slug)
+                except CustomValidationError as exc:
+                    yield _format_event("error", exc.detail)
+                    return
+                cache_key = await display_cache.apayload_cache_key(screen)
+
+            payload, etag = await sync_to_async(display_service.resolve_public_payload)(
+                screen, stale_while_revalidate=True
+            )
+            last_key = cache_key
+            # Day-dependent filters change without any invalidation, so the
+            # payload is also re-resolved once per refresh interval.
+            next_rebuild_check = now + screen.refresh_interval
+            if etag != last_etag:
+                last_etag = etag
+                last_sent = time_module.monotonic()
+                version = payload.get("version")
+                yield _format_event(
+                    "payload",
+                    payload,
+                    event_id=str(version) if version is not None else etag,
+                )
+
+        if time_module.monotonic() - last_sent >= HEARTBEAT_INTERVAL_SECONDS:
+            last_sent = time_module.monotonic()
+            yield ": heartbeat\n\n"
+
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+@require_GET
+async def public_display_stream_view(request, slug: str):
+    """Stream the public payload of a screen as Server-Sent Events.
+
+    Args:
+        request: درخواست HTTP کیوسک.
+        slug: شناسهٔ متنی صفحه‌نمایش.
+
+    Returns:
+        StreamingHttpResponse: جریان رویدادهای ``payload`` و heartbeat.
+    """
+
+    try:
+        screen = await sync_to_async(display_service.get_screen_with_plan_or_404)(slug)
+    except CustomValidationError as exc:
+        return JsonResponse(
+            {
+                "success": False,
+                "code": exc.detail["code"],
+                "message": exc.detail["message"],
+                "data": exc.detail.get("data", {}),
+                "errors": exc.detail.get("errors", []),
+            },
+            status=exc.status_code,
+        )
+
+    response = StreamingHttpResponse(_event_stream(slug, screen), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Disables response buffering in nginx so events reach kiosks immediately.
+    response["X-Accel-Buffering"] = "no"
+    return response
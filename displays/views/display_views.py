@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from django.http import JsonResponse
+import asyncio
+import math
+import time as time_module
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 
 from unischedule.core.base_response import BaseResponse
 from unischedule.core.error_codes import ErrorCodes
@@ -12,7 +21,25 @@ from unischedule.core.exceptions import CustomValidationError
 from unischedule.core.success_codes import SuccessCodes
 
 from displays.serializers import DisplayScreenSerializer
-from displays.services import display_service
+from displays.services import display_bundle, display_cache, display_service, payload_compaction
+
+# Long-poll parameters; they do not change the rendered body.
+VERSION_QUERY_PARAMS = frozenset({"since_version", "timeout"})
+
+# Long-poll requests wait at most this long before answering "unchanged";
+# the bound stays below common proxy read timeouts.
+LONG_POLL_DEFAULT_SECONDS = 25.0
+LONG_POLL_MAX_SECONDS = 30.0
+
+# Seconds between two checks of the screen's cache generations while a
+# long-poll request waits; each check is one async cache round trip.
+LONG_POLL_INTERVAL_SECONDS = 1.0
+
+# Precompressed body variants in order of preference.
+CONTENT_CODING_PREFERENCE = ("gzip",)
+
+# Upper bound on the number of screens a single batch request may ask for.
+BATCH_MAX_SLUGS = 32
 
 
 # Private API endpoints require authenticated institution staff.
@@ -172,12 +199,104 @@ def delete_display_screen_view(request, screen_id: int):
 
 
 # Public endpoint renders payload for unauthenticated kiosks/TVs.
+class CompactJSONRenderer(JSONRenderer):
+    """Lets kiosks negotiate the compact session layout via ``Accept``."""
+
+    media_type = payload_compaction.COMPACT_MEDIA_TYPE
+    format = payload_compaction.COMPACT_LAYOUT
+
+
+async def public_display_view(request, slug: str):
+    """Serve the public payload, holding ``since_version`` polls until it changes.
+
+    Players that cannot use the SSE stream send the version they hold; the
+    request is parked on the event loop, checking the screen's cache
+    generations like the stream does, until the version moves or ``timeout``
+    seconds (at most ``LONG_POLL_MAX_SECONDS``) pass.  The answer is then
+    rendered by :func:`render_public_display_view`: the new payload, or an
+    "unchanged" response.
+
+    Args:
+        request: درخواست HTTP کیوسک.
+        slug: شناسهٔ متنی صفحه‌نمایش.
+
+    Returns:
+        HttpResponse: خروجی صفحه‌نمایش یا پاسخ «بدون تغییر».
+    """
+
+    since_version = _long_poll_since_version(request)
+    if since_version is not None:
+        try:
+            await _wait_for_version_change(slug, since_version, _long_poll_timeout(request))
+        except CustomValidationError:
+            pass  # Rendered below with the regular error response.
+    return await sync_to_async(render_public_display_view)(request, slug)
+
+
+async def _wait_for_version_change(slug: str, since_version: int, timeout: float) -> None:
+    """Return once the screen's payload version differs from ``since_version`` or ``timeout`` passes."""
+
+    deadline = time_module.monotonic() + timeout
+    screen = await sync_to_async(display_service.get_screen_with_plan_or_404)(slug)
+    last_key = None
+    while True:
+        cache_key = await display_cache.apayload_cache_key(screen)
+        if cache_key != last_key:
+            if last_key is not None:
+                # The screen configuration may have changed with the generation.
+                screen = await sync_to_async(display_service.get_screen_with_plan_or_404)(slug)
+                cache_key = await display_cache.apayload_cache_key(screen)
+            payload, _ = await sync_to_async(display_service.resolve_public_payload)(
+                screen, stale_while_revalidate=True
+            )
+            if payload.get("version") != since_version:
+                return
+            last_key = cache_key
+        remaining = deadline - time_module.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(LONG_POLL_INTERVAL_SECONDS, remaining))
+
+
+def _long_poll_since_version(request) -> int | None:
+    # Invalid values are reported by ``render_public_display_view``.
+    try:
+        return int(request.GET.get("since_version", ""))
+    except ValueError:
+        return None
+
+
+def _long_poll_timeout(request) -> float:
+    """Return the requested wait time, clamped to ``LONG_POLL_MAX_SECONDS``."""
+
+    try:
+        timeout = float(request.GET.get("timeout", LONG_POLL_DEFAULT_SECONDS))
+    except ValueError:
+        timeout = LONG_POLL_DEFAULT_SECONDS
+    if not math.isfinite(timeout):
+        timeout = LONG_POLL_DEFAULT_SECONDS
+    return min(max(timeout, 0.0), LONG_POLL_MAX_SECONDS)
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
-def public_display_view(request, slug: str):
+@renderer_classes([JSONRenderer, CompactJSONRenderer])
+def render_public_display_view(request, slug: str):
     try:
         screen = display_service.get_display_screen_by_slug_or_404(slug)
-        payload = display_service.build_public_payload(screen)
+        since_version = _parse_since_version(request)
+        # Kiosks prefer an instant answer over sub-second freshness.
+        payload, etag = display_service.resolve_public_payload(
+            screen, stale_while_revalidate=True
+        )
+        if since_version is not None and payload.get("version") == since_version:
+            # Reached once a long-poll wait timed out without a change; the
+            # player polls again right away.
+            return BaseResponse.success(
+                message=SuccessCodes.DISPLAY_SCREEN_UNCHANGED["message"],
+                code=SuccessCodes.DISPLAY_SCREEN_UNCHANGED["code"],
+                data={"version": since_version, "changed": False},
+            )
     except CustomValidationError as exc:
         return BaseResponse.error(
             message=exc.detail["message"],
@@ -187,10 +306,44 @@ def public_display_view(request, slug: str):
             data=exc.detail.get("data", {}),
         )
 
+    compact = _wants_compact(request)
+    if compact:
+        etag = payload_compaction.compact_etag(etag)
+
+    # Conditional polls are answered before any pagination or JSON rendering.
+    if _etag_matches(request, etag):
+        # Carries the validator and Vary of the 200 it stands for; clients
+        # that received the gzip variant hold its weak ETag.
+        not_modified = _with_validators(
+            HttpResponseNotModified(), etag, weak=_holds_weak_etag(request, etag)
+        )
+        patch_vary_headers(not_modified, ("Accept-Encoding",))
+        return not_modified
+
+    # Fresh payloads are served from pre-encoded bodies; stale ones carry a
+    # per-request staleness counter and are rendered on demand.
+    body_key = None
+    if not payload.get("is_stale"):
+        body_key = display_cache.rendered_body_key(
+            screen.slug,
+            etag,
+            host=f"{request.scheme}://{request.get_host()}",
+            query=urlencode(
+                sorted(
+                    (key, value)
+                    for key, value in request.GET.items()
+                    if key not in VERSION_QUERY_PARAMS
+                )
+            ),
+        )
+        variants = display_cache.get_rendered_body(body_key)
+        if variants is not None:
+            return _with_validators(_encoded_body_response(request, variants, compact=compact), etag)
+
     sessions = payload.get("sessions", [])
     payload_without_sessions = {key: value for key, value in payload.items() if key != "sessions"}
 
-    return BaseResponse.paginate_queryset(
+    response = BaseResponse.paginate_queryset(
         queryset=sessions,
         request=request,
         serializer_class=None,
@@ -200,3 +353,259 @@ def public_display_view(request, slug: str):
         extra_data=payload_without_sessions,
         extra_data_key=None,
     )
+    if compact:
+        response.data["data"]["sessions"] = payload_compaction.compact_sessions(
+            response.data["data"]["sessions"]
+        )
+        response.data["data"]["layout"] = payload_compaction.COMPACT_LAYOUT
+    body = JSONRenderer().render(response.data)
+    if body_key is None:
+        return _with_validators(
+            _json_body_response(body, status_code=response.status_code, compact=compact), etag
+        )
+    # Bodies are compressed once, when stored; later hits only pick a variant.
+    variants = display_cache.store_rendered_body(body_key, body, ttl=screen.refresh_interval)
+    return _with_validators(
+        _encoded_body_response(request, variants, status_code=response.status_code, compact=compact),
+        etag,
+    )
+
+
+def _json_body_response(
+    body: bytes,
+    *,
+    status_code: int = status.HTTP_200_OK,
+    compact: bool = False,
+) -> HttpResponse:
+    """Wrap an already encoded JSON body without going through DRF renderers."""
+
+    content_type = CompactJSONRenderer.media_type if compact else JSONRenderer.media_type
+    return HttpResponse(body, status=status_code, content_type=content_type)
+
+
+def _encoded_body_response(
+    request,
+    variants: dict[str, bytes],
+    *,
+    status_code: int = status.HTTP_200_OK,
+    compact: bool = False,
+) -> HttpResponse:
+    """Serve the stored variant that best matches ``Accept-Encoding``."""
+
+    coding = _negotiate_content_coding(request.headers.get("Accept-Encoding", ""), variants)
+    response = _json_body_response(variants[coding], status_code=status_code, compact=compact)
+    if coding != "identity":
+        response["Content-Encoding"] = coding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def _negotiate_content_coding(header: str, variants: dict[str, bytes]) -> str:
+    """Pick the preferred available content-coding (RFC 9110 §12.5.3)."""
+
+    weights = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = "identity", weights.get("identity", weights.get("*", 1.0))
+    for coding in CONTENT_CODING_PREFERENCE:
+        if coding not in variants:
+            continue
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > 0 and quality >= best_quality:
+            return coding
+    return best
+
+
+def _wants_compact(request) -> bool:
+    """Return ``True`` when the client asked for the compact session layout."""
+
+    if request.query_params.get("layout") == payload_compaction.COMPACT_LAYOUT:
+        return True
+    return isinstance(getattr(request, "accepted_renderer", None), CompactJSONRenderer)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def public_display_delta_view(request, slug: str):
+    try:
+        screen = display_service.get_display_screen_by_slug_or_404(slug)
+        since_version = _parse_since_version(request)
+        if since_version is None:
+            raise CustomValidationError(
+                message=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["message"],
+                code=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["code"],
+                status_code=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["status_code"],
+                errors=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["errors"],
+            )
+        delta = display_service.build_payload_delta(screen, since_version)
+    except CustomValidationError as exc:
+        return BaseResponse.error(
+            message=exc.detail["message"],
+            code=exc.detail["code"],
+            status_code=exc.status_code,
+            errors=exc.detail.get("errors", []),
+            data=exc.detail.get("data", {}),
+        )
+
+    return BaseResponse.success(
+        message=SuccessCodes.DISPLAY_SCREEN_DELTA["message"],
+        code=SuccessCodes.DISPLAY_SCREEN_DELTA["code"],
+        data=delta,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def public_display_batch_view(request):
+    """Return the payloads of several screens (``?slugs=a,b,c``) in one response.
+
+    Video walls and kiosk controllers drive many screens at once; the batch
+    ETag combines the per-screen ETags so unchanged walls get a 304.
+    """
+    try:
+        slugs = _parse_batch_slugs(request)
+        resolved, missing = display_service.resolve_public_payloads(slugs)
+    except CustomValidationError as exc:
+        return BaseResponse.error(
+            message=exc.detail["message"],
+            code=exc.detail["code"],
+            status_code=exc.status_code,
+            errors=exc.detail.get("errors", []),
+            data=exc.detail.get("data", {}),
+        )
+
+    etag = display_cache.compute_etag(
+        {slug: resolved[slug][1] for slug in slugs if slug in resolved}
+    )
+    if _etag_matches(request, etag):
+        return _with_validators(HttpResponseNotModified(), etag)
+
+    screens = {
+        slug: {**resolved[slug][0], "etag": resolved[slug][1]}
+        for slug in slugs
+        if slug in resolved
+    }
+    response = BaseResponse.success(
+        message=SuccessCodes.DISPLAY_SCREENS_BATCH_RENDERED["message"],
+        code=SuccessCodes.DISPLAY_SCREENS_BATCH_RENDERED["code"],
+        data={"screens": screens, "missing": missing},
+    )
+    return _with_validators(response, etag)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def public_display_bundle_view(request, slug: str):
+    """Return a versioned multi-day bundle (``?days=1..14``) for offline kiosks."""
+    try:
+        screen = display_service.get_display_screen_by_slug_or_404(slug)
+        bundle, etag = display_bundle.get_display_bundle(screen, days=_bundle_days(request))
+    except CustomValidationError as exc:
+        return BaseResponse.error(
+            message=exc.detail["message"],
+            code=exc.detail["code"],
+            status_code=exc.status_code,
+            errors=exc.detail.get("errors", []),
+            data=exc.detail.get("data", {}),
+        )
+
+    if _etag_matches(request, etag):
+        return _with_validators(HttpResponseNotModified(), etag)
+    response = BaseResponse.success(
+        message=SuccessCodes.DISPLAY_SCREEN_BUNDLE["message"],
+        code=SuccessCodes.DISPLAY_SCREEN_BUNDLE["code"],
+        data=bundle,
+    )
+    return _with_validators(response, etag)
+
+
+def _bundle_days(request) -> int:
+    """Return the requested bundle length, falling back to the default."""
+
+    try:
+        return int(request.query_params.get("days", display_bundle.BUNDLE_DEFAULT_DAYS))
+    except (TypeError, ValueError):
+        return display_bundle.BUNDLE_DEFAULT_DAYS
+
+
+def _parse_batch_slugs(request) -> list[str]:
+    """Read ``slugs`` (comma separated or repeated) from the query string."""
+
+    slugs = []
+    for raw_value in request.query_params.getlist("slugs"):
+        slugs.extend(slug.strip() for slug in raw_value.split(",") if slug.strip())
+    slugs = list(dict.fromkeys(slugs))
+    if not slugs or len(slugs) > BATCH_MAX_SLUGS:
+        raise CustomValidationError(
+            message=ErrorCodes.DISPLAY_BATCH_SLUGS_INVALID["message"],
+            code=ErrorCodes.DISPLAY_BATCH_SLUGS_INVALID["code"],
+            status_code=ErrorCodes.DISPLAY_BATCH_SLUGS_INVALID["status_code"],
+            errors=ErrorCodes.DISPLAY_BATCH_SLUGS_INVALID["errors"],
+        )
+    return slugs
+
+
+def _parse_since_version(request) -> int | None:
+    """Read the optional ``since_version`` version-check parameter."""
+
+    raw_value = request.query_params.get("since_version")
+    if raw_value in (None, ""):
+        return None
+    try:
+        return int(raw_value)
+    except (TypeError, ValueError):
+        raise CustomValidationError(
+            message=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["message"],
+            code=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["code"],
+            status_code=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["status_code"],
+            errors=ErrorCodes.DISPLAY_PAYLOAD_VERSION_INVALID["errors"],
+        )
+
+
+def _etag_matches(request, etag: str) -> bool:
+    """Return ``True`` when the ``If-None-Match`` header already holds ``etag``."""
+
+    header = request.headers.get("If-None-Match")
+    if not header or not etag:
+        return False
+    candidates = parse_etags(header)
+    if "*" in candidates:
+        return True
+    # If-None-Match uses the weak comparison function (RFC 9110 §13.1.2).
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def _holds_weak_etag(request, etag: str) -> bool:
+    """Return ``True`` when ``If-None-Match`` carries the weak form of ``etag``."""
+
+    return f"W/{etag}" in parse_etags(request.headers.get("If-None-Match", ""))
+
+
+def _with_validators(response, etag: str, *, weak: bool = False):
+    """Attach the ETag and force kiosks to revalidate cached copies.
+
+    Content-coded bodies get the weak form of the tag: a strong validator must
+    differ between codings (RFC 9110), and like Django's
+    ``GZipMiddleware`` the tag is weakened rather than made coding-specific so
+    the same ``If-None-Match`` value revalidates either variant.
+    """
+
+    if (weak or response.has_header("Content-Encoding")) and not etag.startswith("W/"):
+        etag = f"W/{etag}"
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    # The session layout depends on content negotiation.
+    patch_vary_headers(response, ("Accept",))
+    return response
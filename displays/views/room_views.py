@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+
+from unischedule.core.base_response import BaseResponse
+from unischedule.core.exceptions import CustomValidationError
+from unischedule.core.success_codes import SuccessCodes
+
+from displays.services import display_service, room_timeline
+
+
+# Room-door tablets only need the current and the next class of the classroom
+# (or of every classroom in the building) their screen is filtered to.  Like
+# the other public endpoints it is keyed by the screen's opaque slug only.
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def public_room_now_next_view(request, slug: str):
+    try:
+        screen = display_service.get_display_screen_by_slug_or_404(slug)
+        data = room_timeline.screen_now_and_next(screen)
+    except CustomValidationError as exc:
+        return BaseResponse.error(
+            message=exc.detail["message"],
+            code=exc.detail["code"],
+            status_code=exc.status_code,
+            errors=exc.detail.get("errors", []),
+            data=exc.detail.get("data", {}),
+        )
+
+    return BaseResponse.success(
+        message=SuccessCodes.DISPLAY_ROOM_NOW_NEXT["message"],
+        code=SuccessCodes.DISPLAY_ROOM_NOW_NEXT["code"],
+        data=data,
+    )
@@ -47,15 +47,12 @@ def _invalidate_display_caches(institution) -> None:
 
     Notes:
         این تابع واردات تنبل انجام می‌دهد تا از حلقه‌های وابستگی جلوگیری کند و
-        سپس کش هر نمایش فعال را پاک می‌کند تا تغییر لوگو یا مشخصات مؤسسه در
-        لحظه منعکس شود.
+        سپس با یک افزایش اتمیک شمارندهٔ نسل مؤسسه، کش همهٔ نمایش‌ها را باطل
+        می‌کند تا تغییر لوگو یا مشخصات مؤسسه در لحظه منعکس شود.
     """
-    from displays.repositories import display_screen_repository
-    from displays.services import display_service
+    from displays.services.display_cache import bump_institution_generation
 
-    screens = display_screen_repository.list_active_display_screens_by_institution(institution)
-    for screen in screens:
-        display_service.invalidate_screen_cache(screen)
+    bump_institution_generation(institution.id)
 
 
 def list_institutions() -> list[dict]:
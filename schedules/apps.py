@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class SchedulesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "schedules"
+
+    def ready(self) -> None:
+        """Import signal handlers when the app is ready."""
+
+        # Import registers the hooks that keep timetable versions in sync.
+        from . import signals  # noqa: F401
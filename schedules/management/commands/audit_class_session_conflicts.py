@@ -0,0 +1,63 @@
+"""Report every overlapping pair of class sessions in one or more semesters.
+
+برای اجرای شبانه و پیش از انتشار برنامهٔ زمانی طراحی شده است؛ با گزینهٔ
+``--fail-on-conflict`` در صورت یافتن هر تداخل با کد خطا خارج می‌شود.
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schedules.services import conflict_audit
+from semesters.models import Semester
+
+
+class Command(BaseCommand):
+    help = "Audit class session overlaps per classroom and professor."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--semester",
+            type=int,
+            help="Only audit this semester id (defaults to every active semester).",
+        )
+        parser.add_argument(
+            "--institution",
+            type=int,
+            help="Only audit the active semester of this institution id.",
+        )
+        parser.add_argument(
+            "--fail-on-conflict",
+            action="store_true",
+            help="Exit with an error when any conflict is found.",
+        )
+
+    def handle(self, *args, **options):
+        semesters = Semester.objects.filter(is_deleted=False)
+        if options["semester"] is not None:
+            semesters = semesters.filter(id=options["semester"])
+            if not semesters.exists():
+                raise CommandError(f"Semester {options['semester']} does not exist.")
+        else:
+            semesters = semesters.filter(is_active=True)
+        if options["institution"] is not None:
+            semesters = semesters.filter(institution_id=options["institution"])
+
+        total = 0
+        for semester in semesters.order_by("institution_id", "id"):
+            report = conflict_audit.audit_semester_conflicts(semester)
+            total += report["conflict_count"]
+            self.stdout.write(
+                f"Semester {semester.id} ({semester.title}): {report['session_count']} session(s), "
+                f"{report['conflict_count']} conflict(s)."
+            )
+            for conflict in report["conflicts"]:
+                self.stdout.write(
+                    f"  #{conflict['first_session_id']} / #{conflict['second_session_id']} "
+                    f"{conflict['day_of_week']} {conflict['overlap_start']}-{conflict['overlap_end']} "
+                    f"({', '.join(conflict['resources'])})"
+                )
+
+        if total and options["fail_on_conflict"]:
+            raise CommandError(f"Found {total} conflicting session pair(s).")
+        self.stdout.write(self.style.SUCCESS(f"Audit finished with {total} conflict(s)."))
@@ -0,0 +1,63 @@
+"""Import the class sessions of a semester from a JSON or CSV file.
+
+فایل با همان ستون‌های API ورود گروهی (``course``، ``professor``، ``classroom``،
+``semester``، ``day_of_week``، ``start_time``، ``end_time``، ``week_type``، ...)
+خوانده می‌شود و در صورت وجود هر خطا یا تداخل هیچ جلسه‌ای ثبت نمی‌شود.
+"""
+
+from __future__ import annotations
+
+import json
+import time as time_module
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from institutions.models import Institution
+from schedules.services import class_session_import
+from unischedule.core.exceptions import CustomValidationError
+
+
+class Command(BaseCommand):
+    help = "Bulk import class sessions from a JSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the JSON or CSV file to import.")
+        parser.add_argument(
+            "--institution",
+            type=int,
+            required=True,
+            help="Id of the institution that owns the sessions.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=class_session_import.IMPORT_FORMATS,
+            help="File format (defaults to the file extension).",
+        )
+
+    def handle(self, *args, **options):
+        institution = Institution.objects.filter(id=options["institution"]).first()
+        if institution is None:
+            raise CommandError(f"Institution {options['institution']} does not exist.")
+
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"File {path} does not exist.")
+        import_format = options["format"] or path.suffix.lstrip(".")
+
+        started = time_module.monotonic()
+        try:
+            rows = class_session_import.parse_import_rows(
+                path.read_text(encoding="utf-8-sig"), import_format
+            )
+            result = class_session_import.import_class_sessions(rows, institution)
+        except CustomValidationError as exc:
+            errors = json.dumps(exc.detail["errors"], ensure_ascii=False, default=str, indent=2)
+            raise CommandError(f"{exc.detail['message']}\n{errors}")
+
+        elapsed = time_module.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} class session(s) in {elapsed:.2f}s."
+            )
+        )
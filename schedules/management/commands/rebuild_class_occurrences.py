@@ -0,0 +1,39 @@
+"""Rebuild the materialized class occurrence table from the weekly schedule.
+
+پس از استقرار این جدول یا پس از تغییراتی که خارج از سرویس‌ها (پنل مدیریت، اسکریپت‌ها)
+روی جلسات، لغوها یا جلسات جبرانی انجام شده‌اند اجرا می‌شود.
+"""
+
+from __future__ import annotations
+
+import time as time_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from institutions.models import Institution
+from schedules.services import occurrence_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild dated class occurrences from sessions, cancellations and makeups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--institution",
+            type=int,
+            help="Only rebuild the occurrences of this institution id.",
+        )
+
+    def handle(self, *args, **options):
+        institution = None
+        if options["institution"] is not None:
+            institution = Institution.objects.filter(id=options["institution"]).first()
+            if institution is None:
+                raise CommandError(f"Institution {options['institution']} does not exist.")
+
+        started = time_module.monotonic()
+        created = occurrence_service.rebuild_institution_occurrences(institution)
+        elapsed = time_module.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {created} class occurrence(s) in {elapsed:.2f}s.")
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institutions', '0003_institution_logo'),
+        ('locations', '0005_building_unique_building_title_per_institution'),
+        ('professors', '0002_alter_professor_options_alter_professor_created_at_and_more'),
+        ('schedules', '0004_makeupclasssession_classcancellation'),
+        ('semesters', '0002_alter_semester_options_alter_semester_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='تاریخ')),
+                ('start_time', models.TimeField(verbose_name='زمان شروع')),
+                ('end_time', models.TimeField(verbose_name='زمان پایان')),
+                ('is_cancelled', models.BooleanField(default=False, verbose_name='لغو شده')),
+                ('class_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='schedules.classsession', verbose_name='جلسه کلاس')),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_occurrences', to='locations.classroom', verbose_name='کلاس')),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_occurrences', to='institutions.institution', verbose_name='مؤسسه')),
+                ('makeup_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='schedules.makeupclasssession', verbose_name='جلسه جبرانی')),
+                ('professor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_occurrences', to='professors.professor', verbose_name='استاد')),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_occurrences', to='semesters.semester', verbose_name='ترم')),
+            ],
+            options={
+                'verbose_name': 'رخداد جلسه',
+                'verbose_name_plural': 'رخدادهای جلسات',
+                'ordering': ('date', 'start_time'),
+                'indexes': [models.Index(fields=['institution', 'date', 'start_time'], name='occurrence_inst_date_idx'), models.Index(fields=['classroom', 'date', 'start_time'], name='occurrence_room_date_idx'), models.Index(fields=['professor', 'date', 'start_time'], name='occurrence_prof_date_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('makeup_session__isnull', True)), fields=('class_session', 'date'), name='unique_weekly_occurrence_per_session_and_date'), models.UniqueConstraint(condition=models.Q(('makeup_session__isnull', False)), fields=('makeup_session',), name='unique_occurrence_per_makeup_session')],
+            },
+        ),
+    ]
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.db import migrations
+
+# Frozen copies of the rules in schedules.models.class_session_model and
+# schedules.services.occurrence_service, so the migration keeps working when
+# those modules change.
+PERSIAN_TO_PY_WEEKDAY = {
+    "شنبه": 5,
+    "یکشنبه": 6,
+    "دوشنبه": 0,
+    "سه‌شنبه": 1,
+    "چهارشنبه": 2,
+    "پنجشنبه": 3,
+    "جمعه": 4,
+}
+EVERY_WEEK = "هرهفته"
+ODD_WEEK = "فرد"
+EVEN_WEEK = "زوج"
+
+
+def _session_dates(session, semester):
+    weekday = PERSIAN_TO_PY_WEEKDAY.get(session.day_of_week)
+    if weekday is None or not semester.start_date or not semester.end_date:
+        return
+    day = semester.start_date + timedelta(days=(weekday - semester.start_date.weekday()) % 7)
+    while day <= semester.end_date:
+        weeks_since_start = max((day - semester.start_date).days, 0) // 7
+        week_type = ODD_WEEK if weeks_since_start % 2 == 0 else EVEN_WEEK
+        if session.week_type in (EVERY_WEEK, week_type):
+            yield day
+        day += timedelta(days=7)
+
+
+def backfill_class_occurrences(apps, schema_editor):
+    ClassSession = apps.get_model("schedules", "ClassSession")
+    ClassCancellation = apps.get_model("schedules", "ClassCancellation")
+    MakeupClassSession = apps.get_model("schedules", "MakeupClassSession")
+    ClassOccurrence = apps.get_model("schedules", "ClassOccurrence")
+    Semester = apps.get_model("semesters", "Semester")
+
+    sessions = list(ClassSession.objects.filter(is_deleted=False))
+    semesters = Semester.objects.in_bulk({session.semester_id for session in sessions})
+    cancelled = set(
+        ClassCancellation.objects.filter(is_deleted=False).values_list("class_session_id", "date")
+    )
+
+    occurrences = []
+    for session in sessions:
+        semester = semesters.get(session.semester_id)
+        if semester is None:
+            continue
+        occurrences.extend(
+            ClassOccurrence(
+                institution_id=session.institution_id,
+                class_session_id=session.pk,
+                semester_id=session.semester_id,
+                classroom_id=session.classroom_id,
+                professor_id=session.professor_id,
+                date=day,
+                start_time=session.start_time,
+                end_time=session.end_time,
+                is_cancelled=(session.pk, day) in cancelled,
+            )
+            for day in _session_dates(session, semester)
+        )
+    makeups = MakeupClassSession.objects.filter(
+        is_deleted=False, class_session__is_deleted=False
+    ).select_related("class_session")
+    occurrences.extend(
+        ClassOccurrence(
+            institution_id=makeup.institution_id,
+            class_session_id=makeup.class_session_id,
+            makeup_session_id=makeup.pk,
+            semester_id=makeup.class_session.semester_id,
+            classroom_id=makeup.classroom_id,
+            professor_id=makeup.class_session.professor_id,
+            date=makeup.date,
+            start_time=makeup.start_time,
+            end_time=makeup.end_time,
+        )
+        for makeup in makeups
+    )
+
+    ClassOccurrence.objects.all().delete()
+    ClassOccurrence.objects.bulk_create(occurrences, batch_size=1000)
+
+
+def clear_class_occurrences(apps, schema_editor):
+    apps.get_model("schedules", "ClassOccurrence").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedules", "0005_classoccurrence"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_class_occurrences, clear_class_occurrences),
+    ]
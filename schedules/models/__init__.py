@@ -1,8 +1,10 @@
 from .class_session_model import ClassSession
 from .class_adjustment_model import ClassCancellation, MakeupClassSession
+from .class_occurrence_model import ClassOccurrence
 
 __all__ = [
     "ClassSession",
     "ClassCancellation",
     "MakeupClassSession",
+    "ClassOccurrence",
 ]
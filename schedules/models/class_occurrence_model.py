@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from django.db import models
+
+from institutions.models import Institution
+from locations.models import Classroom
+from professors.models import Professor
+from semesters.models import Semester
+
+
+class ClassOccurrence(models.Model):
+    """One dated meeting of a class session, materialized from its weekly rule.
+
+    Rows are derived data maintained by
+    :mod:`schedules.services.occurrence_service`: one row per (session, date)
+    inside the semester with cancellations folded into ``is_cancelled``, plus
+    one row per makeup session.  Room, professor and time are copied so "what
+    runs on date D in room R / for professor P" is an indexed range scan.
+    """
+
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.CASCADE,
+        related_name="class_occurrences",
+        verbose_name="مؤسسه",
+    )
+    class_session = models.ForeignKey(
+        "schedules.ClassSession",
+        on_delete=models.CASCADE,
+        related_name="occurrences",
+        verbose_name="جلسه کلاس",
+    )
+    makeup_session = models.ForeignKey(
+        "schedules.MakeupClassSession",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="occurrences",
+        verbose_name="جلسه جبرانی",
+    )
+    semester = models.ForeignKey(
+        Semester,
+        on_delete=models.CASCADE,
+        related_name="class_occurrences",
+        verbose_name="ترم",
+    )
+    classroom = models.ForeignKey(
+        Classroom,
+        on_delete=models.CASCADE,
+        related_name="class_occurrences",
+        verbose_name="کلاس",
+    )
+    professor = models.ForeignKey(
+        Professor,
+        on_delete=models.CASCADE,
+        related_name="class_occurrences",
+        verbose_name="استاد",
+    )
+    date = models.DateField(verbose_name="تاریخ")
+    start_time = models.TimeField(verbose_name="زمان شروع")
+    end_time = models.TimeField(verbose_name="زمان پایان")
+    is_cancelled = models.BooleanField(default=False, verbose_name="لغو شده")
+
+    class Meta:
+        verbose_name = "رخداد جلسه"
+        verbose_name_plural = "رخدادهای جلسات"
+        ordering = ("date", "start_time")
+        indexes = [
+            models.Index(fields=("institution", "date", "start_time"), name="occurrence_inst_date_idx"),
+            models.Index(fields=("classroom", "date", "start_time"), name="occurrence_room_date_idx"),
+            models.Index(fields=("professor", "date", "start_time"), name="occurrence_prof_date_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("class_session", "date"),
+                condition=models.Q(makeup_session__isnull=True),
+                name="unique_weekly_occurrence_per_session_and_date",
+            ),
+            models.UniqueConstraint(
+                fields=("makeup_session",),
+                condition=models.Q(makeup_session__isnull=False),
+                name="unique_occurrence_per_makeup_session",
+            ),
+        ]
+
+    @property
+    def is_makeup(self) -> bool:
+        return self.makeup_session_id is not None
+
+    def __str__(self) -> str:  # pragma: no cover - debugging helper
+        return f"{self.class_session_id} در {self.date}"
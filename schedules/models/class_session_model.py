@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.db import models
 from unischedule.core.base_model import BaseModel
 from institutions.models import Institution
@@ -7,6 +9,18 @@ from locations.models import Classroom
 from semesters.models import Semester
 
 
+# Mapping Python's weekday index to the Persian labels stored on ClassSession
+PY_WEEKDAY_TO_PERSIAN = {
+    5: "شنبه",
+    6: "یکشنبه",
+    0: "دوشنبه",
+    1: "سه‌شنبه",
+    2: "چهارشنبه",
+    3: "پنجشنبه",
+    4: "جمعه",
+}
+
+
 class ClassSession(BaseModel):
     """Represents a single scheduled class session."""
 
@@ -75,4 +89,19 @@ class ClassSession(BaseModel):
         verbose_name_plural = "جلسات کلاس"
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
-        return f"{self.course.title} - {self.day_of_week}" 
+        return f"{self.course.title} - {self.day_of_week}"
+
+    @classmethod
+    def week_type_for_date(cls, semester_start: date | None, target_date: date | None) -> str | None:
+        """Return the odd/even week of ``target_date`` counted from ``semester_start``.
+
+        The first week of the semester is odd; dates before the start count as
+        part of the first week.  ``None`` is returned when either date is missing.
+        """
+
+        if not semester_start or not target_date:
+            return None
+        weeks_since_start = max((target_date - semester_start).days, 0) // 7
+        if weeks_since_start % 2 == 0:
+            return cls.WeekTypeChoices.ODD
+        return cls.WeekTypeChoices.EVEN
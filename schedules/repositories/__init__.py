@@ -1,4 +1,5 @@
 from .class_session_repository import *
 from .class_adjustment_repository import *
+from .class_occurrence_repository import *
 
 __all__ = []  # populated by star imports
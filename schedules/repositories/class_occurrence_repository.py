@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.db.models import QuerySet
+
+from schedules.models import ClassOccurrence
+
+
+def list_occurrences(
+    institution,
+    *,
+    start: date,
+    end: date,
+    classroom_id: int | None = None,
+    professor_id: int | None = None,
+    include_cancelled: bool = True,
+) -> QuerySet[ClassOccurrence]:
+    """رخدادهای مؤسسه را در بازهٔ تاریخی (و در صورت نیاز برای یک کلاس یا استاد) بازمی‌گرداند."""
+
+    # Each filter combination maps onto one of the (resource, date, start_time) indexes.
+    queryset = ClassOccurrence.objects.filter(
+        institution=institution,
+        date__gte=start,
+        date__lte=end,
+    )
+    if classroom_id is not None:
+        queryset = queryset.filter(classroom_id=classroom_id)
+    if professor_id is not None:
+        queryset = queryset.filter(professor_id=professor_id)
+    if not include_cancelled:
+        queryset = queryset.filter(is_cancelled=False)
+    return queryset.select_related(
+        "class_session__course",
+        "classroom__building",
+        "professor",
+    ).order_by("date", "start_time", "classroom_id")
@@ -1,4 +1,5 @@
 from .class_session_serializers import *
 from .class_adjustment_serializers import *
+from .class_occurrence_serializers import *
 
 __all__ = []  # populated by star imports
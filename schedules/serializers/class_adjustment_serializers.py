@@ -2,24 +2,11 @@ from __future__ import annotations
 
 from datetime import date
 
-from typing import Dict
-
 from rest_framework import serializers
 
 from locations.models import Classroom
 from schedules.models import ClassSession, ClassCancellation, MakeupClassSession
-
-
-# Mapping Python's weekday index to the Persian labels stored on ClassSession
-PY_WEEKDAY_TO_PERSIAN: Dict[int, str] = {
-    5: "شنبه",
-    6: "یکشنبه",
-    0: "دوشنبه",
-    1: "سه‌شنبه",
-    2: "چهارشنبه",
-    3: "پنجشنبه",
-    4: "جمعه",
-}
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
 
 
 class ClassCancellationSerializer(serializers.ModelSerializer):
@@ -76,19 +63,12 @@ class BaseClassCancellationWriteSerializer(serializers.ModelSerializer):
             if session.week_type != ClassSession.WeekTypeChoices.EVERY:
                 semester = getattr(session, "semester", None)
                 start_date = getattr(semester, "start_date", None)
-                if semester and start_date:
-                    delta_days = (cancellation_date - start_date).days
-                    if delta_days >= 0:
-                        weeks_since_start = delta_days // 7
-                        computed_week_type = (
-                            ClassSession.WeekTypeChoices.ODD
-                            if weeks_since_start % 2 == 0
-                            else ClassSession.WeekTypeChoices.EVEN
+                if semester and start_date and cancellation_date >= start_date:
+                    computed_week_type = ClassSession.week_type_for_date(start_date, cancellation_date)
+                    if computed_week_type != session.week_type:
+                        errors.setdefault("date", []).append(
+                            "تاریخ انتخابی با نوع هفته کلاس همخوانی ندارد."
                         )
-                        if computed_week_type != session.week_type:
-                            errors.setdefault("date", []).append(
-                                "تاریخ انتخابی با نوع هفته کلاس همخوانی ندارد."
-                            )
 
         if errors:
             raise serializers.ValidationError(errors)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from rest_framework import serializers
+
+from schedules.models import ClassOccurrence
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
+
+# Longest window a single occurrence query may cover.
+OCCURRENCE_MAX_RANGE_DAYS = 62
+
+
+class ClassOccurrenceSerializer(serializers.ModelSerializer):
+    """نمایش یک رخداد تاریخ‌دار جلسه به همراه عنوان درس، کلاس و استاد."""
+
+    day_of_week = serializers.SerializerMethodField()
+    is_makeup = serializers.BooleanField(read_only=True)
+    course_title = serializers.CharField(source="class_session.course.title", read_only=True)
+    group_code = serializers.SerializerMethodField()
+    classroom_title = serializers.CharField(source="classroom.title", read_only=True)
+    building_title = serializers.CharField(source="classroom.building.title", read_only=True)
+    professor_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ClassOccurrence
+        fields = [
+            "id",
+            "class_session",
+            "makeup_session",
+            "is_makeup",
+            "date",
+            "day_of_week",
+            "start_time",
+            "end_time",
+            "is_cancelled",
+            "course_title",
+            "group_code",
+            "classroom",
+            "classroom_title",
+            "building_title",
+            "professor",
+            "professor_name",
+        ]
+        read_only_fields = fields
+
+    def get_day_of_week(self, obj: ClassOccurrence) -> str:
+        return PY_WEEKDAY_TO_PERSIAN[obj.date.weekday()]
+
+    def get_group_code(self, obj: ClassOccurrence) -> str:
+        if obj.makeup_session_id is not None and obj.makeup_session.group_code:
+            return obj.makeup_session.group_code
+        return obj.class_session.group_code or ""
+
+    def get_professor_name(self, obj: ClassOccurrence) -> str:
+        return f"{obj.professor.first_name} {obj.professor.last_name}".strip()
+
+
+class ClassOccurrenceQuerySerializer(serializers.Serializer):
+    """اعتبارسنجی پارامترهای جست‌وجوی رخدادها: یک تاریخ یا بازهٔ ``start``/``end``."""
+
+    date = serializers.DateField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    classroom = serializers.IntegerField(required=False, min_value=1)
+    professor = serializers.IntegerField(required=False, min_value=1)
+    include_cancelled = serializers.BooleanField(required=False, default=True)
+
+    def validate(self, attrs: dict) -> dict:
+        """یک تاریخ منفرد را به بازهٔ یک‌روزه تبدیل و طول بازه را محدود می‌کند."""
+        single = attrs.pop("date", None)
+        if single is not None:
+            attrs["start"] = attrs["end"] = single
+        start, end = attrs.get("start"), attrs.get("end")
+        if start is None or end is None:
+            raise serializers.ValidationError("پارامتر date یا هر دو پارامتر start و end الزامی است.")
+        if end < start:
+            raise serializers.ValidationError("تاریخ پایان نمی‌تواند قبل از تاریخ شروع باشد.")
+        if end - start > timedelta(days=OCCURRENCE_MAX_RANGE_DAYS - 1):
+            raise serializers.ValidationError(
+                f"بازهٔ تاریخ حداکثر می‌تواند {OCCURRENCE_MAX_RANGE_DAYS} روز باشد."
+            )
+        return attrs
+
+
+class FreeClassroomQuerySerializer(serializers.Serializer):
+    """اعتبارسنجی پرسش کلاس‌های آزاد در یک تاریخ و بازهٔ ساعتی."""
+
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    building = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs: dict) -> dict:
+        """اطمینان می‌دهد زمان شروع قبل از زمان پایان باشد."""
+        if attrs["start_time"] >= attrs["end_time"]:
+            raise serializers.ValidationError("زمان شروع باید قبل از زمان پایان باشد.")
+        return attrs
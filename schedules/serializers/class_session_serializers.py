@@ -81,3 +81,32 @@ class UpdateClassSessionSerializer(serializers.ModelSerializer):
         if start and end and start >= end:
             raise serializers.ValidationError("زمان شروع باید قبل از زمان پایان باشد.")
         return attrs
+
+
+class ImportClassSessionRowSerializer(serializers.Serializer):
+    """سریالایزر یک ردیف ورود گروهی که شناسهٔ کلیدهای خارجی را بدون پرس‌وجو اعتبارسنجی می‌کند.
+
+    وجود و تعلق درس، استاد، کلاس و ترم به مؤسسه برای کل فایل یک‌جا در سرویس ورود
+    گروهی بررسی می‌شود.
+    """
+
+    course = serializers.IntegerField(min_value=1)
+    professor = serializers.IntegerField(min_value=1)
+    classroom = serializers.IntegerField(min_value=1)
+    semester = serializers.IntegerField(min_value=1)
+    day_of_week = serializers.ChoiceField(choices=ClassSession.DAY_OF_WEEK_CHOICES)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    week_type = serializers.ChoiceField(
+        choices=ClassSession.WeekTypeChoices.choices,
+        default=ClassSession.WeekTypeChoices.EVERY,
+    )
+    group_code = serializers.CharField(max_length=50, required=False, allow_blank=True, allow_null=True)
+    capacity = serializers.IntegerField(min_value=0, default=0)
+    note = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        """ترتیب زمان شروع و پایان را مانند سریالایزر ایجاد بررسی می‌کند."""
+        if attrs["start_time"] >= attrs["end_time"]:
+            raise serializers.ValidationError("زمان شروع باید قبل از زمان پایان باشد.")
+        return attrs
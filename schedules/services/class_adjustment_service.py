@@ -21,6 +21,7 @@ from schedules.serializers import (
     UpdateMakeupClassSessionSerializer,
 )
 from schedules import repositories as schedule_repository
+from schedules.services import occurrence_service
 from schedules.services.display_invalidation import invalidate_related_displays
 
 
@@ -194,6 +195,7 @@ def create_class_cancellation(data: dict, institution) -> dict:
 
     validated["institution"] = institution
     cancellation = schedule_repository.create_class_cancellation(validated)
+    occurrence_service.refresh_session_cancellations(session)
     invalidate_related_displays(session, force=True)
     return ClassCancellationSerializer(cancellation).data
 
@@ -235,8 +237,10 @@ def update_class_cancellation(
     )
 
     updated = serializer.save()
+    occurrence_service.refresh_session_cancellations(original_session)
     invalidate_related_displays(original_session, force=True)
     if original_session.id != updated_session.id:
+        occurrence_service.refresh_session_cancellations(updated_session)
         invalidate_related_displays(updated_session, force=True)
     return ClassCancellationSerializer(updated).data
 
@@ -303,6 +307,7 @@ def delete_class_cancellation(cancellation: ClassCancellation) -> None:
 
     _ensure_institution(cancellation.institution)
     schedule_repository.soft_delete_class_cancellation(cancellation)
+    occurrence_service.refresh_session_cancellations(cancellation.class_session)
     invalidate_related_displays(cancellation.class_session, force=True)
 
 
@@ -406,6 +411,7 @@ def create_makeup_class_session(data: dict, institution) -> dict:
 
     validated["institution"] = institution
     makeup = schedule_repository.create_makeup_class_session(validated)
+    occurrence_service.sync_makeup_occurrence(makeup)
     invalidate_related_displays(session, force=True)
     return MakeupClassSessionSerializer(makeup).data
 
@@ -468,6 +474,7 @@ def update_makeup_class_session(
     )
 
     updated = serializer.save()
+    occurrence_service.sync_makeup_occurrence(updated)
     invalidate_related_displays(original_session, force=True)
     if original_session.id != updated_session.id:
         invalidate_related_displays(updated_session, force=True)
@@ -546,4 +553,5 @@ def delete_makeup_class_session(makeup_session: MakeupClassSession) -> None:
 
     _ensure_institution(makeup_session.institution)
     schedule_repository.soft_delete_makeup_class_session(makeup_session)
+    occurrence_service.sync_makeup_occurrence(makeup_session)
     invalidate_related_displays(makeup_session.class_session, force=True)
@@ -0,0 +1,284 @@
+"""Bulk import of class sessions from JSON or CSV rows.
+
+بارگذاری برنامهٔ یک ترم با هزاران فراخوانی جداگانهٔ ``create_class_session``
+انجام می‌شد که هر کدام اعتبارسنجی، پرس‌وجوی تداخل، درج و نامعتبرسازی نمایشگرها را
+تکرار می‌کرد. در ورود گروهی:
+
+* کلیدهای خارجی هر مدل تنها با یک پرس‌وجو بررسی می‌شوند؛
+* تداخل‌ها، هم درون فایل و هم با جلسات موجود، با sweep-line مشترک با ممیزی تداخل‌ها
+  به تفکیک کلاس/روز و استاد/روز یافت می‌شوند؛
+* همهٔ ردیف‌ها با ``bulk_create`` در یک تراکنش درج و نمایشگرهای مؤسسه تنها یک‌بار
+  نامعتبر می‌شوند.
+
+The import is all-or-nothing: any invalid or conflicting row rejects the whole
+file and every problem is reported with its 1-based row number.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Iterable, List, NamedTuple, Optional
+
+from django.db import transaction
+
+from courses.models import Course
+from locations.models import Classroom
+from professors.models import Professor
+from schedules.models import ClassSession
+from schedules.serializers import ImportClassSessionRowSerializer
+from schedules.services import conflict_audit, conflict_index, occurrence_service
+from schedules.services.display_invalidation import invalidate_institution_displays
+from semesters.models import Semester
+from unischedule.core.error_codes import ErrorCodes
+from unischedule.core.exceptions import CustomValidationError
+
+CLASS_SESSION_IMPORT_MAX_ROWS = 10000
+IMPORT_FORMATS = ("json", "csv")
+_BULK_CREATE_BATCH_SIZE = 1000
+
+
+class _Interval(NamedTuple):
+    semester_id: int
+    classroom_id: int
+    professor_id: int
+    day_of_week: str
+    start_time: object
+    end_time: object
+    week_type: str
+    row: Optional[int] = None
+    session_id: Optional[int] = None
+
+
+def _raise(error: dict, errors) -> None:
+    raise CustomValidationError(
+        message=error["message"],
+        code=error["code"],
+        status_code=error["status_code"],
+        errors=errors,
+    )
+
+
+def parse_import_rows(content: str, import_format: str) -> List[dict]:
+    """Decode a JSON or CSV document into a list of row dictionaries.
+
+    JSON may be a list of objects or an object with a ``rows`` list.  CSV must
+    have a header line naming the fields; empty cells are treated as missing.
+
+    Args:
+        content: متن فایل ورودی.
+        import_format: قالب فایل (``json`` یا ``csv``).
+
+    Returns:
+        list[dict]: ردیف‌های خام.
+
+    Raises:
+        CustomValidationError: اگر قالب پشتیبانی نشود یا فایل قابل خواندن نباشد.
+    """
+
+    import_format = (import_format or "").lower()
+    if import_format not in IMPORT_FORMATS:
+        _raise(
+            ErrorCodes.CLASS_SESSION_IMPORT_INVALID,
+            {"format": [f"قالب باید یکی از {', '.join(IMPORT_FORMATS)} باشد."]},
+        )
+
+    if import_format == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        return [
+            {key.strip(): value for key, value in row.items() if key and value not in ("", None)}
+            for row in reader
+        ]
+
+    try:
+        data = json.loads(content)
+    except ValueError:
+        _raise(ErrorCodes.CLASS_SESSION_IMPORT_INVALID, {"file": ["فایل JSON قابل خواندن نیست."]})
+    if isinstance(data, dict):
+        data = data.get("rows")
+    if not isinstance(data, list):
+        _raise(ErrorCodes.CLASS_SESSION_IMPORT_INVALID, {"rows": ["فهرستی از ردیف‌ها ارسال نشده است."]})
+    return data
+
+
+def _validate_rows(rows: List) -> tuple[List[dict], List[dict]]:
+    validated: List[dict] = []
+    errors: List[dict] = []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": number, "errors": {"non_field_errors": ["ردیف باید یک شیء باشد."]}})
+            continue
+        serializer = ImportClassSessionRowSerializer(data=row)
+        if serializer.is_valid():
+            validated.append(dict(serializer.validated_data, row=number))
+        else:
+            errors.append({"row": number, "errors": serializer.errors})
+    return validated, errors
+
+
+def _existing_ids(model, field: str, rows: List[dict], **filters) -> set:
+    ids = {row[field] for row in rows}
+    return set(model.objects.filter(id__in=ids, **filters).values_list("id", flat=True))
+
+
+def _validate_foreign_keys(rows: List[dict], institution) -> List[dict]:
+    # One query per model, regardless of the number of rows.
+    known = {
+        "course": _existing_ids(Course, "course", rows, institution=institution),
+        "professor": _existing_ids(Professor, "professor", rows, institution=institution),
+        "classroom": _existing_ids(Classroom, "classroom", rows, building__institution=institution),
+        "semester": _existing_ids(Semester, "semester", rows, institution=institution),
+    }
+    errors = []
+    for row in rows:
+        row_errors = {
+            field: ["شناسه در این مؤسسه یافت نشد."]
+            for field, ids in known.items()
+            if row[field] not in ids
+        }
+        if row_errors:
+            errors.append({"row": row["row"], "errors": row_errors})
+    return errors
+
+
+def _group_keys(interval: _Interval) -> tuple:
+    day = (interval.semester_id, interval.day_of_week)
+    return (("classroom", interval.classroom_id, *day), ("professor", interval.professor_id, *day))
+
+
+def find_interval_conflicts(intervals: Iterable[_Interval]) -> List[dict]:
+    """Report overlaps per classroom/day and professor/day that involve imported rows.
+
+    Clashes between two existing sessions are not the import's concern (see
+    :mod:`schedules.services.conflict_audit` for those).
+
+    Args:
+        intervals: بازه‌های ردیف‌های ورودی و جلسات موجود.
+
+    Returns:
+        list[dict]: هر تداخل با شمارهٔ ردیف و ردیف یا جلسهٔ متداخل.
+    """
+
+    seen = set()
+    conflicts: List[dict] = []
+    for _, other, interval in conflict_audit.iter_overlapping_pairs(intervals, _group_keys):
+        if other.row is None and interval.row is None:
+            continue
+        first, second = sorted(
+            (other, interval), key=lambda item: (item.row is None, item.row or 0)
+        )
+        pair = (first.row, second.row, second.session_id)
+        if pair in seen:
+            continue
+        seen.add(pair)
+        conflict = {"row": first.row}
+        if second.row is not None:
+            conflict["conflicts_with_row"] = second.row
+        else:
+            conflict["conflicts_with_session"] = second.session_id
+        conflicts.append(conflict)
+    conflicts.sort(key=lambda item: (item["row"], item.get("conflicts_with_row") or 0))
+    return conflicts
+
+
+def _detect_conflicts(rows: List[dict], institution) -> List[dict]:
+    existing = ClassSession.objects.filter(
+        institution=institution,
+        semester_id__in={row["semester"] for row in rows},
+        day_of_week__in={row["day_of_week"] for row in rows},
+        is_deleted=False,
+    ).values_list(
+        "id",
+        "semester_id",
+        "classroom_id",
+        "professor_id",
+        "day_of_week",
+        "start_time",
+        "end_time",
+        "week_type",
+    )
+    intervals = [
+        _Interval(*values, session_id=session_id) for session_id, *values in existing
+    ]
+    intervals.extend(
+        _Interval(
+            semester_id=row["semester"],
+            classroom_id=row["classroom"],
+            professor_id=row["professor"],
+            day_of_week=row["day_of_week"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            week_type=row["week_type"],
+            row=row["row"],
+        )
+        for row in rows
+    )
+    return find_interval_conflicts(intervals)
+
+
+def import_class_sessions(rows: List, institution) -> dict:
+    """Validate, conflict-check and insert a batch of class sessions.
+
+    Args:
+        rows: ردیف‌های خام (خروجی :func:`parse_import_rows` یا بدنهٔ JSON درخواست).
+        institution: مؤسسهٔ مالک جلسات.
+
+    Returns:
+        dict: تعداد و شناسهٔ جلسات ایجادشده.
+
+    Raises:
+        CustomValidationError: اگر ردیفی نامعتبر باشد یا تداخلی وجود داشته باشد؛
+        در این صورت هیچ جلسه‌ای ثبت نمی‌شود.
+    """
+
+    if not institution:
+        _raise(ErrorCodes.INSTITUTION_REQUIRED, ErrorCodes.INSTITUTION_REQUIRED["errors"])
+    if not rows:
+        _raise(ErrorCodes.CLASS_SESSION_IMPORT_INVALID, {"rows": ["هیچ ردیفی ارسال نشده است."]})
+    if len(rows) > CLASS_SESSION_IMPORT_MAX_ROWS:
+        _raise(
+            ErrorCodes.CLASS_SESSION_IMPORT_INVALID,
+            {"rows": [f"حداکثر {CLASS_SESSION_IMPORT_MAX_ROWS} ردیف در هر بار مجاز است."]},
+        )
+
+    validated, errors = _validate_rows(rows)
+    if validated:
+        errors.extend(_validate_foreign_keys(validated, institution))
+    if errors:
+        errors.sort(key=lambda item: item["row"])
+        _raise(ErrorCodes.CLASS_SESSION_IMPORT_INVALID, errors)
+
+    conflicts = _detect_conflicts(validated, institution)
+    if conflicts:
+        _raise(ErrorCodes.CLASS_SESSION_IMPORT_CONFLICT, conflicts)
+
+    sessions = [
+        ClassSession(
+            institution=institution,
+            course_id=row["course"],
+            professor_id=row["professor"],
+            classroom_id=row["classroom"],
+            semester_id=row["semester"],
+            day_of_week=row["day_of_week"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            week_type=row["week_type"],
+            group_code=row.get("group_code"),
+            capacity=row["capacity"],
+            note=row.get("note"),
+        )
+        for row in validated
+    ]
+    with transaction.atomic():
+        created = ClassSession.objects.bulk_create(sessions, batch_size=_BULK_CREATE_BATCH_SIZE)
+        occurrence_service.rebuild_occurrences(created)
+
+    # ``bulk_create`` sends no ``post_save`` signals, so the versions that the
+    # signal handlers normally bump are advanced here, once for the batch.
+    conflict_index.bump_index_version_on_commit(institution.id)
+    invalidate_institution_displays(institution.id)
+    return {
+        "created": len(created),
+        "class_session_ids": [session.pk for session in created],
+    }
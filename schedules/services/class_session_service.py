@@ -13,6 +13,7 @@ from schedules.serializers import (
 )
 from schedules import repositories as class_session_repository
 from schedules.models import ClassSession
+from schedules.services import conflict_index, occurrence_service
 from schedules.services.display_invalidation import invalidate_related_displays
 
 
@@ -39,6 +40,9 @@ def _ensure_institution(institution) -> None:
 def _check_conflict(data, institution):
     """بررسی می‌کند که زمان‌بندی کلاس با سایر جلسات در همان موسسه تداخل نداشته باشد.
 
+    ایندکس بازه‌های درون‌حافظه‌ای بررسی می‌شود؛ پرس‌وجوی پایگاه داده تنها زمانی
+    اجرا می‌گردد که ایندکس از آخرین نوشتهٔ ثبت‌شده عقب مانده باشد.
+
     Args:
         data: داده‌های معتبرشدهٔ جلسه که باید بررسی شوند.
         institution: مؤسسه‌ای که جلسه به آن تعلق دارد.
@@ -46,13 +50,25 @@ def _check_conflict(data, institution):
     Raises:
         CustomValidationError: اگر بازهٔ زمانی انتخابی با جلسه دیگری هم‌پوشانی داشته باشد.
     """
-    if class_session_repository.has_time_conflict(
+    week_type = data.get("week_type", ClassSession.WeekTypeChoices.EVERY)
+    conflicts, index_current = conflict_index.lookup_conflicts(
+        institution.id,
+        data["semester"].pk,
+        day_of_week=data["day_of_week"],
+        start_time=data["start_time"],
+        end_time=data["end_time"],
+        week_type=week_type,
+        classroom_id=data["classroom"].pk,
+        professor_id=data["professor"].pk,
+        exclude_id=data.get("id"),
+    )
+    if conflicts or not index_current and class_session_repository.has_time_conflict(
         institution=institution,
         semester=data["semester"],
         day_of_week=data["day_of_week"],
         start_time=data["start_time"],
         end_time=data["end_time"],
-        week_type=data.get("week_type", ClassSession.WeekTypeChoices.EVERY),
+        week_type=week_type,
         classroom=data["classroom"],
         professor=data["professor"],
         exclude_id=data.get("id"),
@@ -92,6 +108,10 @@ def create_class_session(data: dict, institution) -> dict:
     validated_data["institution"] = institution
     _check_conflict(validated_data, institution)
     session = class_session_repository.create_class_session(validated_data)
+    conflict_index.record_session_write(
+        institution.id, after=conflict_index.session_interval(session)
+    )
+    occurrence_service.rebuild_session_occurrences(session)
     invalidate_related_displays(session)
     return ClassSessionSerializer(session).data
 
@@ -125,6 +145,12 @@ def update_class_session(session: ClassSession, data: dict) -> dict:
     validated_data.setdefault("institution", session.institution)
     _check_conflict(validated_data, session.institution)
     updated_instance = serializer.save()
+    conflict_index.record_session_write(
+        updated_instance.institution_id,
+        before=conflict_index.session_interval(original_session),
+        after=conflict_index.session_interval(updated_instance),
+    )
+    occurrence_service.rebuild_session_occurrences(updated_instance)
     invalidate_related_displays(updated_instance)
     invalidate_related_displays(original_session)
     return ClassSessionSerializer(updated_instance).data
@@ -180,6 +206,10 @@ def delete_class_session(session: ClassSession) -> None:
 
     _ensure_institution(session.institution)
     class_session_repository.soft_delete_class_session(session)
+    conflict_index.record_session_write(
+        session.institution_id, before=conflict_index.session_interval(session)
+    )
+    occurrence_service.rebuild_session_occurrences(session)
     invalidate_related_displays(session)
 
 
@@ -0,0 +1,394 @@
+"""In-process interval index used to detect class session conflicts.
+
+در هفتهٔ ثبت‌نام مدیران هزاران جلسه را ایجاد یا ویرایش می‌کنند و هر بار یک پرس‌وجوی
+هم‌پوشانی جدید اجرا می‌شد. این ماژول برای هر (مؤسسه، ترم) بازه‌های زمانی جلسات را
+به تفکیک «کلاس و روز» و «استاد و روز» مرتب نگه می‌دارد تا بررسی تداخل با یک
+جست‌وجوی دودویی در حافظه انجام شود.
+
+The index is versioned by a per-institution counter that every committed save
+or delete of a :class:`~schedules.models.ClassSession` increments (see
+:mod:`schedules.signals`).  Writes made through ``class_session_service`` are
+applied to the loaded indexes incrementally once their transaction commits;
+any other change (admin, another process) makes the counter skip ahead and the
+affected indexes are reloaded with a single query on their next use.
+
+Because the counter only moves once a write is visible in the database, an
+index whose version still equals the counter holds every committed session,
+and :func:`lookup_conflicts` reports it as current so callers can skip the
+database overlap query.  Inside an atomic block the caller's own uncommitted
+writes are not counted yet, so the index is never reported as current there.
+The counter only reflects other workers' writes when the default cache is
+shared between processes; with a process-local cache (LocMem, the default)
+the index is never reported as current and the database query always runs.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from displays.services import display_cache
+from schedules.models import ClassSession
+from schedules.services.conflict_audit import weeks_clash
+
+
+class SessionInterval(NamedTuple):
+    """The scheduling fields of one session that matter for conflicts."""
+
+    session_id: int
+    semester_id: Optional[int]
+    classroom_id: int
+    professor_id: int
+    day_of_week: str
+    start_time: time
+    end_time: time
+    week_type: str
+
+
+_INTERVAL_FIELDS = (
+    "id",
+    "semester_id",
+    "classroom_id",
+    "professor_id",
+    "day_of_week",
+    "start_time",
+    "end_time",
+    "week_type",
+)
+
+
+@dataclass(frozen=True)
+class _Bucket:
+    """Intervals of one classroom or professor on one day, sorted by start.
+
+    ``max_ends[i]`` is the latest end among ``intervals[:i + 1]``; scanning
+    backwards from the last interval starting before a candidate's end can
+    stop as soon as it drops to the candidate's start.
+    """
+
+    starts: Tuple[time, ...]
+    max_ends: Tuple[time, ...]
+    intervals: Tuple[SessionInterval, ...]
+
+    @classmethod
+    def build(cls, intervals) -> "_Bucket":
+        ordered = tuple(sorted(intervals, key=lambda item: (item.start_time, item.end_time)))
+        max_ends: List[time] = []
+        for interval in ordered:
+            latest = max_ends[-1] if max_ends else interval.end_time
+            max_ends.append(max(latest, interval.end_time))
+        return cls(
+            starts=tuple(item.start_time for item in ordered),
+            max_ends=tuple(max_ends),
+            intervals=ordered,
+        )
+
+    def overlapping(self, start_time: time, end_time: time, week_type: str, exclude_id):
+        position = bisect_left(self.starts, end_time) - 1
+        while position >= 0 and self.max_ends[position] > start_time:
+            interval = self.intervals[position]
+            if (
+                interval.end_time > start_time
+                and interval.session_id != exclude_id
+                and weeks_clash(interval.week_type, week_type)
+            ):
+                yield interval.session_id
+            position -= 1
+
+
+def _bucket_keys(interval: SessionInterval) -> Tuple[tuple, tuple]:
+    return (
+        ("classroom", interval.classroom_id, interval.day_of_week),
+        ("professor", interval.professor_id, interval.day_of_week),
+    )
+
+
+class ConflictIndex:
+    """Interval buckets of one institution's semester."""
+
+    def __init__(self, institution_id: int, semester_id: Optional[int], version: int, intervals):
+        self.institution_id = institution_id
+        self.semester_id = semester_id
+        self.version = version
+        self._sessions: Dict[int, SessionInterval] = {}
+        grouped: Dict[tuple, List[SessionInterval]] = {}
+        for interval in intervals:
+            self._sessions[interval.session_id] = interval
+            for key in _bucket_keys(interval):
+                grouped.setdefault(key, []).append(interval)
+        self._buckets: Dict[tuple, _Bucket] = {
+            key: _Bucket.build(items) for key, items in grouped.items()
+        }
+
+    def find(
+        self,
+        *,
+        day_of_week: str,
+        start_time: time,
+        end_time: time,
+        week_type: str,
+        classroom_id: int,
+        professor_id: int,
+        exclude_id: Optional[int] = None,
+    ) -> List[int]:
+        """Return the ids of indexed sessions that clash with the given slot."""
+
+        conflicts = set()
+        for key in (
+            ("classroom", classroom_id, day_of_week),
+            ("professor", professor_id, day_of_week),
+        ):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                conflicts.update(bucket.overlapping(start_time, end_time, week_type, exclude_id))
+        return sorted(conflicts)
+
+    def discard(self, session_id: int) -> None:
+        interval = self._sessions.pop(session_id, None)
+        if interval is None:
+            return
+        for key in _bucket_keys(interval):
+            remaining = [
+                item for item in self._buckets[key].intervals if item.session_id != session_id
+            ]
+            # Buckets are replaced rather than mutated so concurrent readers
+            # always see a consistent one.
+            if remaining:
+                self._buckets[key] = _Bucket.build(remaining)
+            else:
+                del self._buckets[key]
+
+    def add(self, interval: SessionInterval) -> None:
+        self.discard(interval.session_id)
+        self._sessions[interval.session_id] = interval
+        for key in _bucket_keys(interval):
+            bucket = self._buckets.get(key)
+            existing = bucket.intervals if bucket is not None else ()
+            self._buckets[key] = _Bucket.build((*existing, interval))
+
+
+def _version_key(institution_id: int) -> str:
+    return f"schedules:conflict-index-version:{institution_id}"
+
+
+def get_index_version(institution_id: int) -> int:
+    """Return the conflict index counter of an institution.
+
+    A random starting value is used when the counter is missing (for example
+    after a cache flush) so stale in-process indexes never match it.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+
+    Returns:
+        int: مقدار فعلی شمارنده.
+    """
+
+    key = _version_key(institution_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, random.getrandbits(48), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_index_version_on_commit(institution_id: int | None) -> None:
+    """Advance the conflict index counter once the current transaction commits.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه‌ای که جلسات آن تغییر کرده است.
+    """
+
+    transaction.on_commit(lambda: bump_index_version(institution_id))
+
+
+def bump_index_version(institution_id: int | None) -> None:
+    """Advance the conflict index counter after a class session write.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه‌ای که جلسات آن تغییر کرده است.
+    """
+
+    if institution_id is None:
+        return
+    try:
+        cache.incr(_version_key(institution_id))
+    except ValueError:
+        cache.add(_version_key(institution_id), random.getrandbits(48), timeout=None)
+
+
+_indexes: Dict[Tuple[int, Optional[int]], ConflictIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _load_index(institution_id: int, semester_id: Optional[int], version: int) -> ConflictIndex:
+    rows = ClassSession.objects.filter(
+        institution_id=institution_id,
+        semester_id=semester_id,
+        is_deleted=False,
+    ).values_list(*_INTERVAL_FIELDS)
+    return ConflictIndex(
+        institution_id,
+        semester_id,
+        version,
+        (SessionInterval(*row) for row in rows),
+    )
+
+
+def get_conflict_index(institution_id: int, semester_id: Optional[int]) -> ConflictIndex:
+    """Return the up-to-date conflict index of a semester, loading it if needed.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        semester_id: شناسهٔ ترم.
+
+    Returns:
+        ConflictIndex: ایندکس بازه‌ها برای نسخهٔ فعلی.
+    """
+
+    version = get_index_version(institution_id)
+    index = _indexes.get((institution_id, semester_id))
+    if index is not None and index.version == version:
+        return index
+
+    index = _load_index(institution_id, semester_id, version)
+    with _indexes_lock:
+        _indexes[(institution_id, semester_id)] = index
+    return index
+
+
+def _in_atomic_block() -> bool:
+    return transaction.get_connection().in_atomic_block
+
+
+def lookup_conflicts(
+    institution_id: int,
+    semester_id: Optional[int],
+    **slot,
+) -> Tuple[List[int], bool]:
+    """Like :func:`find_conflicts`, also telling whether the index was current.
+
+    The counter is read again after the lookup; when it has not moved, no
+    session write was committed since the index was loaded or last updated.
+    Lookups made inside an atomic block are never current, since writes of
+    the same transaction only reach the counter on commit, and neither are
+    lookups against a process-local cache, whose counter never sees writes
+    committed by other workers.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        semester_id: شناسهٔ ترم.
+        **slot: همان آرگومان‌های کلیدی :func:`find_conflicts`.
+
+    Returns:
+        tuple[list[int], bool]: شناسهٔ جلسات متداخل و اینکه ایندکس به‌روز بوده است یا نه.
+    """
+
+    index = get_conflict_index(institution_id, semester_id)
+    conflicts = index.find(**slot)
+    current = (
+        display_cache.is_cache_shared()
+        and not _in_atomic_block()
+        and cache.get(_version_key(institution_id)) == index.version
+    )
+    return conflicts, current
+
+
+def find_conflicts(
+    institution_id: int,
+    semester_id: Optional[int],
+    *,
+    day_of_week: str,
+    start_time: time,
+    end_time: time,
+    week_type: str,
+    classroom_id: int,
+    professor_id: int,
+    exclude_id: Optional[int] = None,
+) -> List[int]:
+    """Return ids of sessions that overlap the given slot in the same room or with the same professor.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        semester_id: شناسهٔ ترم.
+        day_of_week: روز هفته.
+        start_time: ساعت شروع.
+        end_time: ساعت پایان.
+        week_type: نوع هفته (هرهفته، زوج یا فرد).
+        classroom_id: شناسهٔ کلاس.
+        professor_id: شناسهٔ استاد.
+        exclude_id: شناسهٔ جلسه‌ای که باید نادیده گرفته شود (در ویرایش).
+
+    Returns:
+        list[int]: شناسهٔ جلسات متداخل به ترتیب صعودی.
+    """
+
+    return get_conflict_index(institution_id, semester_id).find(
+        day_of_week=day_of_week,
+        start_time=start_time,
+        end_time=end_time,
+        week_type=week_type,
+        classroom_id=classroom_id,
+        professor_id=professor_id,
+        exclude_id=exclude_id,
+    )
+
+
+def session_interval(session: ClassSession) -> SessionInterval:
+    """Capture the conflict-relevant fields of ``session``."""
+
+    return SessionInterval(*(getattr(session, field) for field in _INTERVAL_FIELDS))
+
+
+def _apply_write(
+    institution_id: int,
+    before: Optional[SessionInterval],
+    after: Optional[SessionInterval],
+) -> None:
+    current = cache.get(_version_key(institution_id))
+    with _indexes_lock:
+        for key, index in list(_indexes.items()):
+            if index.institution_id != institution_id:
+                continue
+            # Exactly one save happened since the index was loaded: it is the
+            # write being applied.  Anything else means other writers were
+            # involved and the index is dropped to be reloaded.
+            if current is None or current != index.version + 1:
+                del _indexes[key]
+                continue
+            if before is not None and before.semester_id == index.semester_id:
+                index.discard(before.session_id)
+            if after is not None and after.semester_id == index.semester_id:
+                index.add(after)
+            index.version = current
+
+
+def record_session_write(
+    institution_id: int,
+    *,
+    before: Optional[SessionInterval] = None,
+    after: Optional[SessionInterval] = None,
+) -> None:
+    """Apply a service-level create, update or delete to the loaded indexes on commit.
+
+    Args:
+        institution_id: شناسهٔ مؤسسهٔ مالک جلسه.
+        before: وضعیت جلسه پیش از تغییر (برای ویرایش و حذف).
+        after: وضعیت جلسه پس از تغییر (برای ایجاد و ویرایش).
+    """
+
+    transaction.on_commit(lambda: _apply_write(institution_id, before, after))
+
+
+def clear_conflict_indexes() -> None:
+    """Forget every in-process conflict index (used by tests and cache flushes)."""
+
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,268 @@
+"""Maintenance and queries of the materialized class occurrence calendar.
+
+هر مصرف‌کننده‌ای که می‌خواست بداند یک جلسه در تاریخ D برگزار می‌شود یا نه، قاعدهٔ
+روز هفته، نوع هفته و تاریخ شروع ترم را دوباره محاسبه می‌کرد. جدول
+:class:`~schedules.models.ClassOccurrence` برای هر (جلسه، تاریخ) درون ترم یک ردیف
+دارد، لغوها در ``is_cancelled`` و جلسات جبرانی به صورت ردیف‌های جداگانه در آن
+ادغام شده‌اند و سرویس‌های برنامه‌ریزی آن را به‌صورت افزایشی به‌روز نگه می‌دارند.
+
+Writes that bypass the services (Django admin, shell scripts) can be repaired
+with the ``rebuild_class_occurrences`` management command.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List
+
+from django.db import transaction
+
+from schedules import repositories as schedule_repository
+from schedules.models import ClassCancellation, ClassOccurrence, ClassSession, MakeupClassSession
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
+from schedules.serializers import ClassOccurrenceQuerySerializer, ClassOccurrenceSerializer
+from schedules.services.timetable_version import bump_timetable_version
+from semesters.models import Semester
+from unischedule.core.error_codes import ErrorCodes
+from unischedule.core.exceptions import CustomValidationError
+
+PERSIAN_TO_PY_WEEKDAY = {label: weekday for weekday, label in PY_WEEKDAY_TO_PERSIAN.items()}
+
+
+def iter_session_dates(session: ClassSession, semester: Semester) -> Iterator[date]:
+    """Yield every date inside ``semester`` on which the weekly rule of ``session`` applies.
+
+    Args:
+        session: جلسهٔ هفتگی.
+        semester: ترم جلسه (برای جلوگیری از پرس‌وجوی جداگانه ارسال می‌شود).
+
+    Yields:
+        date: تاریخ‌های برگزاری به ترتیب صعودی.
+    """
+
+    weekday = PERSIAN_TO_PY_WEEKDAY.get(session.day_of_week)
+    if weekday is None or not semester.start_date or not semester.end_date:
+        return
+    day = semester.start_date + timedelta(days=(weekday - semester.start_date.weekday()) % 7)
+    every = session.week_type == ClassSession.WeekTypeChoices.EVERY
+    while day <= semester.end_date:
+        if every or session.week_type == ClassSession.week_type_for_date(semester.start_date, day):
+            yield day
+        day += timedelta(days=7)
+
+
+def _makeup_occurrence(makeup: MakeupClassSession, session: ClassSession) -> ClassOccurrence:
+    """Build the (unsaved) occurrence row that represents ``makeup``."""
+
+    return ClassOccurrence(
+        institution_id=makeup.institution_id,
+        class_session_id=session.pk,
+        makeup_session=makeup,
+        semester_id=session.semester_id,
+        classroom_id=makeup.classroom_id,
+        professor_id=session.professor_id,
+        date=makeup.date,
+        start_time=makeup.start_time,
+        end_time=makeup.end_time,
+    )
+
+
+def rebuild_occurrences(
+    sessions: Iterable[ClassSession], makeups: Iterable[MakeupClassSession] = ()
+) -> int:
+    """Recreate the weekly occurrences of ``sessions`` from their current rule.
+
+    Deleted sessions lose all their occurrences, makeups included.  Makeup rows
+    of the remaining sessions keep their date and room but follow the session's
+    professor and semester.  Rows of the given ``makeups`` are recreated in the
+    same ``bulk_create`` as the weekly ones, so the number of queries depends
+    neither on the number of sessions nor on the number of makeups.
+
+    Args:
+        sessions: جلساتی که رخدادهای آن‌ها باید بازسازی شود.
+        makeups: جلسات جبرانی که ردیف آن‌ها باید از نو ساخته شود (با
+            ``class_session`` بارگذاری‌شده).
+
+    Returns:
+        int: تعداد رخدادهای ایجادشده (هفتگی و جبرانی).
+    """
+
+    sessions = list(sessions)
+    makeups = list(makeups)
+    if not sessions and not makeups:
+        return 0
+    session_ids = [session.pk for session in sessions]
+    active = [session for session in sessions if not session.is_deleted]
+    semesters = Semester.objects_with_deleted.in_bulk({session.semester_id for session in active})
+    cancelled = set(
+        ClassCancellation.objects.filter(class_session_id__in=session_ids).values_list(
+            "class_session_id", "date"
+        )
+    )
+
+    occurrences: List[ClassOccurrence] = []
+    for session in active:
+        semester = semesters.get(session.semester_id)
+        if semester is None:
+            continue
+        occurrences.extend(
+            ClassOccurrence(
+                institution_id=session.institution_id,
+                class_session_id=session.pk,
+                semester_id=session.semester_id,
+                classroom_id=session.classroom_id,
+                professor_id=session.professor_id,
+                date=day,
+                start_time=session.start_time,
+                end_time=session.end_time,
+                is_cancelled=(session.pk, day) in cancelled,
+            )
+            for day in iter_session_dates(session, semester)
+        )
+    occurrences.extend(
+        _makeup_occurrence(makeup, makeup.class_session)
+        for makeup in makeups
+        if not makeup.is_deleted and not makeup.class_session.is_deleted
+    )
+
+    deleted_ids = [session.pk for session in sessions if session.is_deleted]
+    with transaction.atomic():
+        ClassOccurrence.objects.filter(
+            class_session_id__in=session_ids, makeup_session__isnull=True
+        ).delete()
+        if deleted_ids:
+            ClassOccurrence.objects.filter(class_session_id__in=deleted_ids).delete()
+        if makeups:
+            ClassOccurrence.objects.filter(
+                makeup_session_id__in=[makeup.pk for makeup in makeups]
+            ).delete()
+        with_makeups = set(
+            ClassOccurrence.objects.filter(
+                class_session_id__in=session_ids, makeup_session__isnull=False
+            ).values_list("class_session_id", flat=True)
+        )
+        for session in active:
+            if session.pk in with_makeups:
+                ClassOccurrence.objects.filter(
+                    class_session_id=session.pk, makeup_session__isnull=False
+                ).update(professor_id=session.professor_id, semester_id=session.semester_id)
+        ClassOccurrence.objects.bulk_create(occurrences, batch_size=1000)
+    return len(occurrences)
+
+
+def rebuild_session_occurrences(session: ClassSession) -> int:
+    """Recreate the occurrences of one session after it was created, edited or deleted."""
+
+    return rebuild_occurrences([session])
+
+
+def rebuild_semester_occurrences(semester: Semester) -> int:
+    """Recreate the occurrences of every session of ``semester`` (e.g. after its dates changed)."""
+
+    created = rebuild_occurrences(ClassSession.objects.filter(semester=semester))
+    bump_timetable_version(semester.institution_id)
+    return created
+
+
+def refresh_session_cancellations(session: ClassSession) -> None:
+    """Fold the active cancellations of ``session`` into its weekly occurrences.
+
+    Args:
+        session: جلسه‌ای که لغوهای آن تغییر کرده است.
+    """
+
+    cancelled_dates = ClassCancellation.objects.filter(class_session=session).values("date")
+    weekly = ClassOccurrence.objects.filter(class_session=session, makeup_session__isnull=True)
+    weekly.filter(is_cancelled=True).exclude(date__in=cancelled_dates).update(is_cancelled=False)
+    weekly.filter(is_cancelled=False, date__in=cancelled_dates).update(is_cancelled=True)
+
+
+def sync_makeup_occurrence(makeup: MakeupClassSession) -> None:
+    """Create, move or remove the occurrence that represents ``makeup``.
+
+    Args:
+        makeup: جلسهٔ جبرانی ایجادشده، ویرایش‌شده یا حذف‌شده.
+    """
+
+    session = makeup.class_session
+    with transaction.atomic():
+        ClassOccurrence.objects.filter(makeup_session=makeup).delete()
+        if makeup.is_deleted or session.is_deleted:
+            return
+        _makeup_occurrence(makeup, session).save()
+
+
+def rebuild_institution_occurrences(institution=None) -> int:
+    """Rebuild the whole occurrence table, optionally for a single institution.
+
+    Args:
+        institution: مؤسسهٔ هدف (``None`` برای همهٔ مؤسسه‌ها).
+
+    Returns:
+        int: تعداد کل رخدادهای ایجادشده.
+    """
+
+    sessions = ClassSession.objects.all()
+    makeups = MakeupClassSession.objects.filter(class_session__is_deleted=False).select_related(
+        "class_session"
+    )
+    if institution is not None:
+        sessions = sessions.filter(institution=institution)
+        makeups = makeups.filter(institution=institution)
+
+    with transaction.atomic():
+        stale = ClassOccurrence.objects.all()
+        if institution is not None:
+            stale = stale.filter(institution=institution)
+        stale.delete()
+        created = rebuild_occurrences(sessions, makeups)
+    institution_ids = (
+        [institution.id]
+        if institution is not None
+        else ClassSession.objects_with_deleted.values_list("institution_id", flat=True).distinct()
+    )
+    for institution_id in institution_ids:
+        bump_timetable_version(institution_id)
+    return created
+
+
+def list_class_occurrences(institution, params) -> list[dict]:
+    """List the occurrences of a date or date range, optionally for one room or professor.
+
+    Args:
+        institution: مؤسسهٔ درخواست‌کننده.
+        params: پارامترهای جست‌وجو (``date`` یا ``start``/``end``، ``classroom``،
+            ``professor`` و ``include_cancelled``).
+
+    Returns:
+        list[dict]: رخدادهای سریال‌شده به ترتیب تاریخ و ساعت.
+
+    Raises:
+        CustomValidationError: اگر مؤسسه تعیین نشده یا پارامترها نامعتبر باشند.
+    """
+
+    if not institution:
+        raise CustomValidationError(
+            message=ErrorCodes.INSTITUTION_REQUIRED["message"],
+            code=ErrorCodes.INSTITUTION_REQUIRED["code"],
+            status_code=ErrorCodes.INSTITUTION_REQUIRED["status_code"],
+            errors=ErrorCodes.INSTITUTION_REQUIRED["errors"],
+        )
+    serializer = ClassOccurrenceQuerySerializer(data=params)
+    if not serializer.is_valid():
+        raise CustomValidationError(
+            message=ErrorCodes.VALIDATION_FAILED["message"],
+            code=ErrorCodes.VALIDATION_FAILED["code"],
+            status_code=ErrorCodes.VALIDATION_FAILED["status_code"],
+            errors=serializer.errors,
+        )
+    query = serializer.validated_data
+    queryset = schedule_repository.list_occurrences(
+        institution,
+        start=query["start"],
+        end=query["end"],
+        classroom_id=query.get("classroom"),
+        professor_id=query.get("professor"),
+        include_cancelled=query["include_cancelled"],
+    ).select_related("makeup_session")
+    return ClassOccurrenceSerializer(queryset, many=True).data
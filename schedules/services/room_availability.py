@@ -0,0 +1,332 @@
+"""Free classroom finder backed by per-room occupancy bitmaps.
+
+کارکنان برای جای‌دادن جلسات جبرانی مدام می‌پرسند «کدام کلاس‌های ساختمان X روز
+سه‌شنبه ۱۰ تا ۱۲ خالی است؟». این سرویس برای هر (مؤسسه، تاریخ) اشغال هر کلاس را به
+صورت یک bitmap با برش‌های ثابت پنج‌دقیقه‌ای نگه می‌دارد؛ پاسخ به هر پرسش تنها یک
+AND بیتی به ازای هر کلاس است.
+
+Bitmaps are built from :class:`~schedules.models.ClassOccurrence`, which already
+accounts for odd/even weeks, cancellations and makeups, with one query for the
+occupied intervals and one for the institution's classrooms.  They are kept
+in-process and validated against the institution's timetable version, which
+every session, cancellation, makeup, classroom or semester write bumps.
+
+The occurrence table is only kept current by the scheduling services and the
+version counter lives in the default cache, which is process-local unless a
+shared backend is configured.  Bitmaps therefore expire after
+``AVAILABILITY_MAX_AGE`` seconds, and the rooms they report free are checked
+against :class:`~schedules.models.ClassSession` and
+:class:`~schedules.models.MakeupClassSession` with two indexed queries before
+they are returned.
+"""
+
+from __future__ import annotations
+
+import threading
+import time as time_module
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, time
+from typing import Dict, List, Optional, Set, Tuple
+
+from locations.models import Classroom
+from schedules.models import ClassCancellation, ClassOccurrence, ClassSession, MakeupClassSession
+from schedules.models.class_session_model import PY_WEEKDAY_TO_PERSIAN
+from schedules.serializers import FreeClassroomQuerySerializer
+from schedules.services.timetable_version import get_timetable_version
+from unischedule.core.error_codes import ErrorCodes
+from unischedule.core.exceptions import CustomValidationError
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+# Number of (institution, date) bitmaps kept per process.
+AVAILABILITY_CACHE_MAX_ENTRIES = 128
+# Seconds a bitmap is trusted even when the timetable version has not moved;
+# picks up writes from other workers under a process-local cache.
+AVAILABILITY_MAX_AGE = 5 * 60
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute + (1 if value.second or value.microsecond else 0)
+
+
+def slot_mask(start_time: time, end_time: time) -> int:
+    """Return the bitmap of the slots touched by ``[start_time, end_time)``.
+
+    A range that covers only part of a slot occupies the whole slot, so a room
+    is never reported free for a window it is partly busy in.
+
+    Args:
+        start_time: ساعت شروع.
+        end_time: ساعت پایان.
+
+    Returns:
+        int: عدد صحیحی که بیت ``i`` آن نشان‌دهندهٔ برش ``i`` روز است.
+    """
+
+    first = _minutes(start_time) // SLOT_MINUTES
+    last = min(-(-_minutes(end_time) // SLOT_MINUTES), SLOTS_PER_DAY)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+@dataclass(frozen=True)
+class RoomInfo:
+    """Labels of a classroom returned with availability answers."""
+
+    classroom_id: int
+    classroom_title: str
+    building_id: int
+    building_title: str
+
+
+@dataclass(frozen=True)
+class DayAvailability:
+    """Occupancy bitmaps of every classroom of an institution on one date."""
+
+    institution_id: int
+    day: date
+    version: str
+    rooms: Tuple[RoomInfo, ...]
+    occupancy: Dict[int, int]
+    loaded_at: float = field(default_factory=time_module.monotonic)
+
+    def is_fresh(self, version: str) -> bool:
+        """Return whether the bitmaps were built for ``version`` and are not too old."""
+
+        return (
+            self.version == version
+            and time_module.monotonic() - self.loaded_at < AVAILABILITY_MAX_AGE
+        )
+
+    def free_rooms(self, mask: int, building_id: Optional[int] = None) -> List[RoomInfo]:
+        """Return the rooms whose bitmap has none of the bits of ``mask`` set."""
+
+        occupancy = self.occupancy
+        return [
+            room
+            for room in self.rooms
+            if (building_id is None or room.building_id == building_id)
+            and not occupancy.get(room.classroom_id, 0) & mask
+        ]
+
+
+def build_day_availability(institution_id: int, day: date, version: str = "") -> DayAvailability:
+    """Load the occupied intervals of ``day`` and fold them into per-room bitmaps.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        day: تاریخ مورد نظر.
+        version: نسخهٔ جدول زمانی که bitmap برای آن ساخته می‌شود.
+
+    Returns:
+        DayAvailability: bitmapهای اشغال کلاس‌ها.
+    """
+
+    occupancy: Dict[int, int] = {}
+    rows = ClassOccurrence.objects.filter(
+        institution_id=institution_id,
+        date=day,
+        is_cancelled=False,
+    ).values_list("classroom_id", "start_time", "end_time")
+    for classroom_id, start_time, end_time in rows:
+        occupancy[classroom_id] = occupancy.get(classroom_id, 0) | slot_mask(start_time, end_time)
+
+    rooms = tuple(
+        RoomInfo(*row)
+        for row in Classroom.objects.filter(
+            building__institution_id=institution_id,
+            building__is_deleted=False,
+        )
+        .order_by("building__title", "title")
+        .values_list("id", "title", "building_id", "building__title")
+    )
+    return DayAvailability(
+        institution_id=institution_id,
+        day=day,
+        version=version,
+        rooms=rooms,
+        occupancy=occupancy,
+    )
+
+
+_availability: "OrderedDict[Tuple[int, date], DayAvailability]" = OrderedDict()
+_availability_lock = threading.Lock()
+
+
+def get_day_availability(institution_id: int, day: date) -> DayAvailability:
+    """Return the current bitmaps of an institution's date, rebuilding them when stale.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        day: تاریخ مورد نظر.
+
+    Returns:
+        DayAvailability: bitmapهای معتبر برای نسخهٔ فعلی جدول زمانی.
+    """
+
+    version = get_timetable_version(institution_id)
+    key = (institution_id, day)
+    with _availability_lock:
+        availability = _availability.get(key)
+        if availability is not None and availability.is_fresh(version):
+            _availability.move_to_end(key)
+            return availability
+
+    availability = build_day_availability(institution_id, day, version)
+    with _availability_lock:
+        _availability[key] = availability
+        _availability.move_to_end(key)
+        while len(_availability) > AVAILABILITY_CACHE_MAX_ENTRIES:
+            _availability.popitem(last=False)
+    return availability
+
+
+def clear_availability_cache() -> None:
+    """Forget every in-process bitmap (used by tests and cache flushes)."""
+
+    with _availability_lock:
+        _availability.clear()
+
+
+def _busy_classroom_ids(
+    institution_id: int,
+    day: date,
+    start_time: time,
+    end_time: time,
+    classroom_ids: List[int],
+) -> Set[int]:
+    """Return the rooms of ``classroom_ids`` that a session or makeup occupies in the window.
+
+    Reads the scheduling tables directly, so rows that never reached
+    ``ClassOccurrence`` (admin or shell writes) still keep their room busy.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        day: تاریخ مورد نظر.
+        start_time: ساعت شروع بازه.
+        end_time: ساعت پایان بازه.
+        classroom_ids: کلاس‌هایی که bitmap آن‌ها را آزاد گزارش کرده است.
+
+    Returns:
+        set[int]: شناسهٔ کلاس‌هایی که در واقع اشغال هستند.
+    """
+
+    if not classroom_ids:
+        return set()
+    busy: Set[int] = set()
+    sessions = (
+        ClassSession.objects.filter(
+            institution_id=institution_id,
+            classroom_id__in=classroom_ids,
+            day_of_week=PY_WEEKDAY_TO_PERSIAN[day.weekday()],
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+            semester__start_date__lte=day,
+            semester__end_date__gte=day,
+        )
+        .exclude(id__in=ClassCancellation.objects.filter(date=day).values("class_session_id"))
+        .values_list("classroom_id", "week_type", "semester__start_date")
+    )
+    for classroom_id, week_type, semester_start in sessions:
+        if week_type in (
+            ClassSession.WeekTypeChoices.EVERY,
+            ClassSession.week_type_for_date(semester_start, day),
+        ):
+            busy.add(classroom_id)
+    busy.update(
+        MakeupClassSession.objects.filter(
+            institution_id=institution_id,
+            classroom_id__in=classroom_ids,
+            date=day,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+            class_session__is_deleted=False,
+        ).values_list("classroom_id", flat=True)
+    )
+    return busy
+
+
+def find_free_classrooms(
+    institution_id: int,
+    *,
+    day: date,
+    start_time: time,
+    end_time: time,
+    building_id: Optional[int] = None,
+) -> List[dict]:
+    """List the classrooms with no class or makeup between ``start_time`` and ``end_time`` on ``day``.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+        day: تاریخ مورد نظر.
+        start_time: ساعت شروع بازه.
+        end_time: ساعت پایان بازه.
+        building_id: محدود کردن نتیجه به یک ساختمان (اختیاری).
+
+    Returns:
+        list[dict]: کلاس‌های آزاد به ترتیب عنوان ساختمان و کلاس.
+    """
+
+    availability = get_day_availability(institution_id, day)
+    candidates = availability.free_rooms(slot_mask(start_time, end_time), building_id)
+    busy = _busy_classroom_ids(
+        institution_id, day, start_time, end_time, [room.classroom_id for room in candidates]
+    )
+    return [
+        {
+            "classroom_id": room.classroom_id,
+            "classroom_title": room.classroom_title,
+            "building_id": room.building_id,
+            "building_title": room.building_title,
+        }
+        for room in candidates
+        if room.classroom_id not in busy
+    ]
+
+
+def list_free_classrooms(institution, params) -> dict:
+    """Validate a free-room query and answer it from the occupancy bitmaps.
+
+    Args:
+        institution: مؤسسهٔ درخواست‌کننده.
+        params: پارامترهای ``date``، ``start_time``، ``end_time`` و ``building`` (اختیاری).
+
+    Returns:
+        dict: پارامترهای بازه و فهرست کلاس‌های آزاد.
+
+    Raises:
+        CustomValidationError: اگر مؤسسه تعیین نشده یا پارامترها نامعتبر باشند.
+    """
+
+    if not institution:
+        raise CustomValidationError(
+            message=ErrorCodes.INSTITUTION_REQUIRED["message"],
+            code=ErrorCodes.INSTITUTION_REQUIRED["code"],
+            status_code=ErrorCodes.INSTITUTION_REQUIRED["status_code"],
+            errors=ErrorCodes.INSTITUTION_REQUIRED["errors"],
+        )
+    serializer = FreeClassroomQuerySerializer(data=params)
+    if not serializer.is_valid():
+        raise CustomValidationError(
+            message=ErrorCodes.VALIDATION_FAILED["message"],
+            code=ErrorCodes.VALIDATION_FAILED["code"],
+            status_code=ErrorCodes.VALIDATION_FAILED["status_code"],
+            errors=serializer.errors,
+        )
+    query = serializer.validated_data
+    classrooms = find_free_classrooms(
+        institution.id,
+        day=query["date"],
+        start_time=query["start_time"],
+        end_time=query["end_time"],
+        building_id=query.get("building"),
+    )
+    return {
+        "date": query["date"],
+        "start_time": query["start_time"],
+        "end_time": query["end_time"],
+        "building": query.get("building"),
+        "classrooms": classrooms,
+    }
@@ -0,0 +1,61 @@
+"""Per-institution timetable version tokens shared across processes.
+
+هر تغییر در جلسات، لغوها یا جلسات جبرانی یک مؤسسه نسخهٔ جدول زمانی آن را
+تغییر می‌دهد تا مصرف‌کنندگانی مانند snapshot نمایشگرها بدانند دادهٔ درون‌حافظه‌ای
+آن‌ها دیگر معتبر نیست.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(institution_id: int) -> str:
+    return f"schedules:timetable-version:{institution_id}"
+
+
+def get_timetable_version(institution_id: int) -> str:
+    """Return the current version token of an institution's timetable.
+
+    A fresh random token is created when none exists (for example after a
+    cache flush) so stale in-process copies are never mistaken for current.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه.
+
+    Returns:
+        str: توکن نسخهٔ فعلی.
+    """
+
+    key = _version_key(institution_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _set_new_version(institution_id: int) -> None:
+    cache.set(_version_key(institution_id), uuid.uuid4().hex, timeout=None)
+
+
+def bump_timetable_version(institution_id: int | None) -> None:
+    """Mark the timetable of ``institution_id`` as changed.
+
+    The version is bumped immediately and once more after the surrounding
+    transaction commits, so a reader that reloads while the write is still
+    uncommitted cannot keep serving the pre-commit rows under the new token.
+
+    Args:
+        institution_id: شناسهٔ مؤسسه‌ای که برنامهٔ آن تغییر کرده است.
+    """
+
+    if institution_id is None:
+        return
+    _set_new_version(institution_id)
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _set_new_version(institution_id))
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from schedules.models import ClassCancellation, ClassSession, MakeupClassSession
+from schedules.services.conflict_index import bump_index_version_on_commit
+from schedules.services.display_invalidation import invalidate_institution_displays
+
+
+# Writes that bypass ``schedules.services`` (Django admin, shell scripts, data
+# migrations) must still invalidate in-memory timetable snapshots and cached
+# display payloads, which live for up to an hour.  Every save or delete of a
+# scheduling row therefore bumps the owning institution's timetable version
+# and display generation; the latter also retires prewarmed next-day payloads.
+@receiver(post_save, sender=ClassSession)
+@receiver(post_save, sender=ClassCancellation)
+@receiver(post_save, sender=MakeupClassSession)
+@receiver(post_delete, sender=ClassSession)
+@receiver(post_delete, sender=ClassCancellation)
+@receiver(post_delete, sender=MakeupClassSession)
+def invalidate_displays_on_change(sender, instance, **kwargs) -> None:
+    invalidate_institution_displays(instance.institution_id)
+
+
+# Every session write advances the conflict index counter exactly once, which
+# lets ``conflict_index`` tell its own incremental updates apart from writes it
+# has not seen.  The bump waits for the commit so an index loaded while the
+# write was still invisible is always detected as stale.
+@receiver(post_save, sender=ClassSession)
+@receiver(post_delete, sender=ClassSession)
+def bump_conflict_index_on_change(sender, instance, **kwargs) -> None:
+    bump_index_version_on_commit(instance.institution_id)
@@ -1,4 +1,15 @@
+import json
+import tempfile
+import time as time_module
 from datetime import date, time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.test import TestCase
 from rest_framework.test import APIClient
 
@@ -8,8 +19,16 @@ from professors.models import Professor
 from courses.models import Course
 from locations.models import Building, Classroom
 from semesters.models import Semester
-from schedules.models import ClassSession, ClassCancellation
-from schedules.services import class_session_service, class_adjustment_service
+from semesters.services import semester_service
+from schedules.models import ClassSession, ClassCancellation, ClassOccurrence, MakeupClassSession
+from schedules.services import (
+    class_adjustment_service,
+    class_session_import,
+    class_session_service,
+    conflict_audit,
+    conflict_index,
+    room_availability,
+)
 from schedules.serializers.class_adjustment_serializers import (
     CreateClassCancellationSerializer,
 )
@@ -238,3 +257,809 @@ class ClassCancellationValidationTests(TestCase):
             ErrorCodes.CLASS_CANCELLATION_DATE_MISMATCH["code"],
         )
         self.assertIn("روز برگزاری", exc.detail["errors"]["date"][0])
+
+
+class ClassSessionConflictIndexTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        conflict_index.clear_conflict_indexes()
+        self.institution = Institution.objects.create(name="Uni", slug="uni-index")
+        self.professor = Professor.objects.create(
+            institution=self.institution,
+            first_name="Reza",
+            last_name="Moradi",
+            national_code="1122334455",
+        )
+        self.other_professor = Professor.objects.create(
+            institution=self.institution,
+            first_name="Neda",
+            last_name="Rahimi",
+            national_code="5544332211",
+        )
+        self.course = Course.objects.create(
+            institution=self.institution,
+            code="C3",
+            title="Course 3",
+            professor=self.professor,
+            offer_code="O3",
+            unit_count=3,
+        )
+        self.building = Building.objects.create(title="Index", institution=self.institution)
+        self.classroom = Classroom.objects.create(title="301", building=self.building)
+        self.other_classroom = Classroom.objects.create(title="302", building=self.building)
+        self.semester = Semester.objects.create(
+            institution=self.institution,
+            title="Spring",
+            start_date=date(2024, 2, 3),
+            end_date=date(2024, 6, 1),
+        )
+
+    def _payload(self, **overrides) -> dict:
+        data = {
+            "course": self.course.id,
+            "professor": self.professor.id,
+            "classroom": self.classroom.id,
+            "semester": self.semester.id,
+            "day_of_week": "شنبه",
+            "start_time": "08:00",
+            "end_time": "10:00",
+            "week_type": ClassSession.WeekTypeChoices.ODD,
+            "group_code": "A",
+            "capacity": 30,
+            "note": "",
+        }
+        data.update(overrides)
+        return data
+
+    def _find(self, **overrides) -> list:
+        query = {
+            "day_of_week": "شنبه",
+            "start_time": time(9, 0),
+            "end_time": time(11, 0),
+            "week_type": ClassSession.WeekTypeChoices.EVERY,
+            "classroom_id": self.other_classroom.id,
+            "professor_id": self.other_professor.id,
+        }
+        query.update(overrides)
+        return conflict_index.find_conflicts(self.institution.id, self.semester.id, **query)
+
+    def test_lookup_matches_room_professor_and_week_type_rules(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            created = class_session_service.create_class_session(self._payload(), self.institution)
+
+        self.assertEqual(self._find(classroom_id=self.classroom.id), [created["id"]])
+        self.assertEqual(self._find(professor_id=self.professor.id), [created["id"]])
+        self.assertEqual(
+            self._find(classroom_id=self.classroom.id, week_type=ClassSession.WeekTypeChoices.EVEN),
+            [],
+        )
+        self.assertEqual(
+            self._find(classroom_id=self.classroom.id, start_time=time(10, 0), end_time=time(11, 0)),
+            [],
+        )
+        self.assertEqual(self._find(classroom_id=self.classroom.id, day_of_week="یکشنبه"), [])
+        self.assertEqual(
+            self._find(classroom_id=self.classroom.id, exclude_id=created["id"]),
+            [],
+        )
+
+    def test_service_writes_update_loaded_index_without_reloading(self) -> None:
+        self.assertEqual(self._find(classroom_id=self.classroom.id), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            created = class_session_service.create_class_session(self._payload(), self.institution)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._find(classroom_id=self.classroom.id), [created["id"]])
+
+        session = ClassSession.objects.get(pk=created["id"])
+        with self.captureOnCommitCallbacks(execute=True):
+            class_session_service.update_class_session(
+                session, self._payload(start_time="12:00", end_time="14:00")
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(self._find(classroom_id=self.classroom.id), [])
+            self.assertEqual(
+                self._find(classroom_id=self.classroom.id, start_time=time(13, 0), end_time=time(15, 0)),
+                [created["id"]],
+            )
+
+        session.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            class_session_service.delete_class_session(session)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self._find(classroom_id=self.classroom.id, start_time=time(13, 0), end_time=time(15, 0)),
+                [],
+            )
+
+    def test_writes_outside_the_service_reload_the_index(self) -> None:
+        self.assertEqual(self._find(classroom_id=self.classroom.id), [])
+
+        # The counter moves when the write commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            session = ClassSession.objects.create(
+                institution=self.institution,
+                course=self.course,
+                professor=self.professor,
+                classroom=self.classroom,
+                semester=self.semester,
+                day_of_week="شنبه",
+                start_time=time(8, 0),
+                end_time=time(10, 0),
+                week_type=ClassSession.WeekTypeChoices.EVERY,
+            )
+
+        self.assertEqual(self._find(classroom_id=self.classroom.id), [session.id])
+
+    def test_current_index_skips_the_database_check(self) -> None:
+        db_check = "schedules.services.class_session_service.class_session_repository.has_time_conflict"
+        # Requests run in autocommit mode; TestCase wraps every test in a transaction.
+        outside_atomic = mock.patch.object(conflict_index, "_in_atomic_block", return_value=False)
+        shared_cache = mock.patch.object(
+            conflict_index.display_cache, "is_cache_shared", return_value=True
+        )
+
+        with shared_cache, outside_atomic, mock.patch(db_check) as check:
+            with self.captureOnCommitCallbacks(execute=True):
+                class_session_service.create_class_session(self._payload(), self.institution)
+            with self.captureOnCommitCallbacks(execute=True):
+                class_session_service.create_class_session(
+                    self._payload(classroom=self.other_classroom.id, professor=self.other_professor.id),
+                    self.institution,
+                )
+        check.assert_not_called()
+
+        # Inside a transaction its own uncommitted writes are not counted yet.
+        with shared_cache, mock.patch(db_check, return_value=False) as check:
+            class_session_service.create_class_session(
+                self._payload(day_of_week="یکشنبه"), self.institution
+            )
+        check.assert_called_once()
+
+    def test_process_local_cache_always_runs_the_database_check(self) -> None:
+        db_check = "schedules.services.class_session_service.class_session_repository.has_time_conflict"
+        outside_atomic = mock.patch.object(conflict_index, "_in_atomic_block", return_value=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            class_session_service.create_class_session(self._payload(), self.institution)
+
+        # Another worker's commit never reaches a LocMem counter.
+        with outside_atomic, mock.patch(db_check, return_value=True) as check:
+            with self.assertRaises(CustomValidationError) as ctx:
+                class_session_service.create_class_session(
+                    self._payload(day_of_week="یکشنبه"), self.institution
+                )
+        check.assert_called_once()
+        self.assertEqual(ctx.exception.detail["code"], ErrorCodes.CLASS_SESSION_CONFLICT["code"])
+
+    def test_index_hit_rejects_without_database_check(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            class_session_service.create_class_session(self._payload(), self.institution)
+
+        with mock.patch(
+            "schedules.services.class_session_service.class_session_repository.has_time_conflict"
+        ) as db_check:
+            with self.assertRaises(CustomValidationError) as ctx:
+                class_session_service.create_class_session(
+                    self._payload(classroom=self.other_classroom.id, start_time="09:00", end_time="11:00"),
+                    self.institution,
+                )
+
+        db_check.assert_not_called()
+        self.assertEqual(ctx.exception.detail["code"], ErrorCodes.CLASS_SESSION_CONFLICT["code"])
+
+
+class ClassSessionImportTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.institution = Institution.objects.create(name="Uni", slug="uni-import")
+        self.user = User.objects.create_user(username="importer", password="pass", institution=self.institution)
+        self.professor = Professor.objects.create(
+            institution=self.institution,
+            first_name="Mina",
+            last_name="Jafari",
+            national_code="6677889900",
+        )
+        self.course = Course.objects.create(
+            institution=self.institution,
+            code="C4",
+            title="Course 4",
+            professor=self.professor,
+            offer_code="O4",
+            unit_count=3,
+        )
+        self.building = Building.objects.create(title="Import", institution=self.institution)
+        self.classrooms = [
+            Classroom.objects.create(title=f"4{index:02d}", building=self.building) for index in range(4)
+        ]
+        self.semester = Semester.objects.create(
+            institution=self.institution,
+            title="Summer",
+            start_date=date(2024, 6, 22),
+            end_date=date(2024, 9, 1),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _row(self, **overrides) -> dict:
+        row = {
+            "course": self.course.id,
+            "professor": self.professor.id,
+            "classroom": self.classrooms[0].id,
+            "semester": self.semester.id,
+            "day_of_week": "شنبه",
+            "start_time": "08:00",
+            "end_time": "10:00",
+            "week_type": ClassSession.WeekTypeChoices.EVERY,
+            "group_code": "A",
+            "capacity": 30,
+        }
+        row.update(overrides)
+        return row
+
+    def _weekly_rows(self, count: int) -> list:
+        days = [choice for choice, _ in ClassSession.DAY_OF_WEEK_CHOICES]
+        return [
+            self._row(
+                day_of_week=days[index % len(days)],
+                start_time=f"{8 + index // len(days):02d}:00",
+                end_time=f"{9 + index // len(days):02d}:00",
+            )
+            for index in range(count)
+        ]
+
+    def test_import_creates_rows_with_constant_query_count(self) -> None:
+        with CaptureQueriesContext(connection) as single:
+            class_session_import.import_class_sessions(self._weekly_rows(1), self.institution)
+        self.semester = Semester.objects.create(
+            institution=self.institution,
+            title="Fall",
+            start_date=date(2024, 9, 22),
+            end_date=date(2025, 1, 20),
+        )
+
+        with CaptureQueriesContext(connection) as many:
+            result = class_session_import.import_class_sessions(self._weekly_rows(40), self.institution)
+
+        self.assertEqual(result["created"], 40)
+        self.assertEqual(ClassSession.objects.filter(semester=self.semester).count(), 40)
+        # SQLite splits the materialized occurrences into batches by its
+        # parameter limit; every other query is shared by the whole batch.
+        self.assertEqual(self._queries_without_occurrence_inserts(many), self._queries_without_occurrence_inserts(single))
+
+    def _queries_without_occurrence_inserts(self, context) -> int:
+        return sum(
+            1
+            for query in context.captured_queries
+            if not query["sql"].startswith('INSERT INTO "schedules_classoccurrence"')
+        )
+
+    def test_conflicts_inside_batch_and_with_existing_rows_reject_import(self) -> None:
+        existing = ClassSession.objects.create(
+            institution=self.institution,
+            course=self.course,
+            professor=self.professor,
+            classroom=self.classrooms[0],
+            semester=self.semester,
+            day_of_week="یکشنبه",
+            start_time=time(8, 0),
+            end_time=time(10, 0),
+            week_type=ClassSession.WeekTypeChoices.ODD,
+        )
+        rows = [
+            self._row(),
+            self._row(classroom=self.classrooms[1].id, start_time="09:00", end_time="11:00"),
+            self._row(day_of_week="یکشنبه", classroom=self.classrooms[2].id, start_time="09:30", end_time="10:30"),
+        ]
+
+        with self.assertRaises(CustomValidationError) as ctx:
+            class_session_import.import_class_sessions(rows, self.institution)
+
+        self.assertEqual(ctx.exception.detail["code"], ErrorCodes.CLASS_SESSION_IMPORT_CONFLICT["code"])
+        self.assertEqual(
+            ctx.exception.detail["errors"],
+            [
+                {"row": 1, "conflicts_with_row": 2},
+                {"row": 3, "conflicts_with_session": existing.id},
+            ],
+        )
+        self.assertEqual(ClassSession.objects.count(), 1)
+
+    def test_unknown_foreign_keys_are_reported_per_row(self) -> None:
+        other = Institution.objects.create(name="Other", slug="other-import")
+        foreign_semester = Semester.objects.create(
+            institution=other,
+            title="Other",
+            start_date=date(2024, 6, 22),
+            end_date=date(2024, 9, 1),
+        )
+
+        with self.assertRaises(CustomValidationError) as ctx:
+            class_session_import.import_class_sessions(
+                [self._row(), self._row(semester=foreign_semester.id, start_time="11:00", end_time="12:00")],
+                self.institution,
+            )
+        self.assertEqual(ctx.exception.detail["code"], ErrorCodes.CLASS_SESSION_IMPORT_INVALID["code"])
+        self.assertEqual(ctx.exception.detail["errors"], [{"row": 2, "errors": {"semester": mock.ANY}}])
+        self.assertFalse(ClassSession.objects.exists())
+
+    def test_api_accepts_csv_upload_and_json_body(self) -> None:
+        header = "course,professor,classroom,semester,day_of_week,start_time,end_time,week_type,group_code,capacity,note"
+        line = (
+            f"{self.course.id},{self.professor.id},{self.classrooms[0].id},{self.semester.id},"
+            f"شنبه,08:00,10:00,{ClassSession.WeekTypeChoices.EVERY},A,,"
+        )
+        upload = SimpleUploadedFile("sessions.csv", f"{header}\n{line}\n".encode("utf-8"))
+
+        response = self.client.post("/api/schedules/import/", {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["code"], "2616")
+        self.assertEqual(response.data["data"]["created"], 1)
+
+        response = self.client.post(
+            "/api/schedules/import/",
+            {"rows": [self._row(day_of_week="دوشنبه")]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ClassSession.objects.count(), 2)
+
+    def test_management_command_imports_json_file(self) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".json", encoding="utf-8") as handle:
+            json.dump(self._weekly_rows(3), handle, ensure_ascii=False)
+            handle.flush()
+            call_command(
+                "import_class_sessions",
+                handle.name,
+                institution=self.institution.id,
+                stdout=mock.MagicMock(),
+            )
+
+        self.assertEqual(ClassSession.objects.count(), 3)
+
+
+class ClassSessionConflictAuditTests(TestCase):
+    def setUp(self) -> None:
+        self.institution = Institution.objects.create(name="Uni", slug="uni-audit")
+        self.user = User.objects.create_user(username="auditor", password="pass", institution=self.institution)
+        self.professor = Professor.objects.create(
+            institution=self.institution,
+            first_name="Hadi",
+            last_name="Sadeghi",
+            national_code="1029384756",
+        )
+        self.other_professor = Professor.objects.create(
+            institution=self.institution,
+            first_name="Laleh",
+            last_name="Amini",
+            national_code="6574839201",
+        )
+        self.course = Course.objects.create(
+            institution=self.institution,
+            code="C5",
+            title="Course 5",
+            professor=self.professor,
+            offer_code="O5",
+            unit_count=3,
+        )
+        self.building = Building.objects.create(title="Audit", institution=self.institution)
+        self.classroom = Classroom.objects.create(title="501", building=self.building)
+        self.other_classroom = Classroom.objects.create(title="502", building=self.building)
+        self.semester = Semester.objects.create(
+            institution=self.institution,
+            title="Audit",
+            start_date=date(2024, 2, 3),
+            end_date=date(2024, 6, 1),
+            is_active=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _session(self, start, end, **overrides) -> ClassSession:
+        payload = {
+            "institution": self.institution,
+            "course": self.course,
+            "professor": self.professor,
+            "classroom": self.classroom,
+            "semester": self.semester,
+            "day_of_week": "شنبه",
+            "start_time": start,
+            "end_time": end,
+            "week_type": ClassSession.WeekTypeChoices.EVERY,
+        }
+        payload.update(overrides)
+        return ClassSession.objects.create(**payload)
+
+    def test_audit_reports_every_pair_once_with_week_type_rules(self) -> None:
+        first = self._session(time(8, 0), time(10, 0))
+        same_room = self._session(time(9, 0), time(11, 0), professor=self.other_professor)
+        same_professor = self._session(
+            time(9, 30), time(10, 30), classroom=self.other_classroom, week_type=ClassSession.WeekTypeChoices.ODD
+        )
+        self._session(
+            time(10, 0), time(12, 0),
+            classroom=self.other_classroom,
+            week_type=ClassSession.WeekTypeChoices.EVEN,
+        )
+        self._session(time(9, 0), time(10, 0), day_of_week="یکشنبه", professor=self.other_professor)
+
+        with self.assertNumQueries(1):
+            report = conflict_audit.audit_semester_conflicts(self.semester)
+
+        self.assertEqual(report["session_count"], 5)
+        pairs = {
+            (item["first_session_id"], item["second_session_id"]): item for item in report["conflicts"]
+        }
+        self.assertEqual(
+            set(pairs),
+            {(first.id, same_room.id), (first.id, same_professor.id)},
+        )
+        self.assertEqual(pairs[(first.id, same_room.id)]["resources"], ["classroom"])
+        self.assertEqual(pairs[(first.id, same_room.id)]["overlap_start"], "09:00:00")
+        self.assertEqual(pairs[(first.id, same_professor.id)]["resources"], ["professor"])
+
+    def test_pair_sharing_room_and_professor_lists_both_resources(self) -> None:
+        first = self._session(time(8, 0), time(10, 0))
+        second = self._session(time(9, 0), time(11, 0))
+
+        report = conflict_audit.audit_semester_conflicts(self.semester)
+
+        self.assertEqual(report["conflict_count"], 1)
+        self.assertEqual(report["conflicts"][0]["resources"], ["classroom", "professor"])
+        self.assertEqual(
+            (report["conflicts"][0]["first_session_id"], report["conflicts"][0]["second_session_id"]),
+            (first.id, second.id),
+        )
+
+    def test_endpoint_defaults_to_active_semester(self) -> None:
+        self._session(time(8, 0), time(10, 0))
+        self._session(time(9, 0), time(11, 0))
+
+        response = self.client.get("/api/schedules/conflicts/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["code"], "2617")
+        self.assertEqual(response.data["data"]["semester_id"], self.semester.id)
+        self.assertEqual(response.data["data"]["conflict_count"], 1)
+
+        missing = self.client.get("/api/schedules/conflicts/", {"semester": self.semester.id + 100})
+        self.assertEqual(missing.data["code"], ErrorCodes.SEMESTER_NOT_FOUND["code"])
+
+    def test_command_fails_when_asked_and_conflicts_exist(self) -> None:
+        self._session(time(8, 0), time(10, 0))
+        self._session(time(9, 0), time(11, 0))
+
+        with self.assertRaises(CommandError):
+            call_command("audit_class_session_conflicts", fail_on_conflict=True, stdout=mock.MagicMock())
+
+
+class ClassOccurrenceTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.institution = Institution.objects.create(name="Uni", slug="uni-occurrence")
+        self.user = User.objects.create_user(username="calendar", password="pass", institution=self.institution)
+        self.professor = Professor.objects.create(
+            institution=self.institution,
+            first_name="Parisa",
+            last_name="Kazemi",
+            national_code="2468013579",
+        )
+        self.course = Course.objects.create(
+            institution=self.institution,
+            code="C6",
+            title="Course 6",
+            professor=self.professor,
+            offer_code="O6",
+            unit_count=2,
+        )
+        self.building = Building.objects.create(title="Calendar", institution=self.institution)
+        self.classroom = Classroom.objects.create(title="601", building=self.building)
+        self.other_classroom = Classroom.objects.create(title="602", building=self.building)
+        # 2024-02-03 is a Saturday, so the semester holds nine Saturdays.
+        self.semester = Semester.objects.create(
+            institution=self.institution,
+            title="Calendar",
+            start_date=date(2024, 2, 3),
+            end_date=date(2024, 3, 30),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_session(self, **overrides) -> ClassSession:
+        payload = {
+            "course": self.course.id,
+            "professor": self.professor.id,
+            "classroom": self.classroom.id,
+            "semester": self.semester.id,
+            "day_of_week": "شنبه",
+            "start_time": "08:00",
+            "end_time": "10:00",
+            "week_type": ClassSession.WeekTypeChoices.ODD,
+        }
+        payload.update(overrides)
+        created = class_session_service.create_class_session(payload, self.institution)
+        return ClassSession.objects.get(pk=created["id"])
+
+    def _dates(self, session: ClassSession, **filters) -> list:
+        return list(
+            ClassOccurrence.objects.filter(class_session=session, **filters)
+            .order_by("date")
+            .values_list("date", flat=True)
+        )
+
+    def test_week_type_for_date_counts_weeks_from_semester_start(self) -> None:
+        start = date(2024, 2, 3)
+        self.assertEqual(ClassSession.week_type_for_date(start, start), ClassSession.WeekTypeChoices.ODD)
+        self.assertEqual(ClassSession.week_type_for_date(start, date(2024, 2, 10)), ClassSession.WeekTypeChoices.EVEN)
+        self.assertEqual(ClassSession.week_type_for_date(start, date(2024, 1, 1)), ClassSession.WeekTypeChoices.ODD)
+        self.assertIsNone(ClassSession.week_type_for_date(None, start))
+
+    def test_session_writes_materialize_occurrences(self) -> None:
+        session = self._create_session()
+        self.assertEqual(
+            self._dates(session),
+            [date(2024, 2, 3), date(2024, 2, 17), date(2024, 3, 2), date(2024, 3, 16), date(2024, 3, 30)],
+        )
+
+        class_session_service.update_class_session(
+            session,
+            {
+                "course": self.course.id,
+                "professor": self.professor.id,
+                "classroom": self.other_classroom.id,
+                "semester": self.semester.id,
+                "day_of_week": "یکشنبه",
+                "start_time": "08:00",
+                "end_time": "10:00",
+                "week_type": ClassSession.WeekTypeChoices.EVERY,
+            },
+        )
+        self.assertEqual(len(self._dates(session)), 8)
+        self.assertFalse(
+            ClassOccurrence.objects.filter(class_session=session).exclude(classroom=self.other_classroom).exists()
+        )
+
+        session.refresh_from_db()
+        class_session_service.delete_class_session(session)
+        self.assertEqual(self._dates(session), [])
+
+    def test_cancellations_and_makeups_are_folded_in(self) -> None:
+        session = self._create_session()
+        cancellation = class_adjustment_service.create_class_cancellation(
+            {"class_session": session.id, "date": date(2024, 2, 17)},
+            self.institution,
+        )
+        self.assertEqual(self._dates(session, is_cancelled=True), [date(2024, 2, 17)])
+
+        makeup = class_adjustment_service.create_makeup_class_session(
+            {
+                "class_session": session.id,
+                "date": date(2024, 2, 19),
+                "start_time": "14:00",
+                "end_time": "16:00",
+                "classroom": self.other_classroom.id,
+            },
+            self.institution,
+        )
+        self.assertEqual(self._dates(session, makeup_session_id=makeup["id"]), [date(2024, 2, 19)])
+
+        class_adjustment_service.delete_class_cancellation(ClassCancellation.objects.get(pk=cancellation["id"]))
+        self.assertEqual(self._dates(session, is_cancelled=True), [])
+
+    def test_semester_date_change_rebuilds_occurrences(self) -> None:
+        session = self._create_session(week_type=ClassSession.WeekTypeChoices.EVERY)
+        semester_service.update_semester(self.semester, {"end_date": date(2024, 2, 17)})
+
+        self.assertEqual(self._dates(session), [date(2024, 2, 3), date(2024, 2, 10), date(2024, 2, 17)])
+
+    def test_endpoint_scans_a_day_for_one_room(self) -> None:
+        session = self._create_session()
+        self._create_session(classroom=self.other_classroom.id, start_time="10:00", end_time="12:00")
+
+        response = self.client.get(
+            "/api/schedules/occurrences/",
+            {"date": "2024-02-17", "classroom": self.classroom.id},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["code"], "2618")
+        occurrences = response.data["data"]["occurrences"]
+        self.assertEqual(len(occurrences), 1)
+        self.assertEqual(occurrences[0]["class_session"], session.id)
+        self.assertEqual(occurrences[0]["course_title"], "Course 6")
+
+        too_long = self.client.get("/api/schedules/occurrences/", {"start": "2024-02-01", "end": "2024-06-01"})
+        self.assertEqual(too_long.status_code, ErrorCodes.VALIDATION_FAILED["status_code"])
+
+    def test_rebuild_command_restores_rows_written_outside_services(self) -> None:
+        session = ClassSession.objects.create(
+            institution=self.institution,
+            course=self.course,
+            professor=self.professor,
+            classroom=self.classroom,
+            semester=self.semester,
+            day_of_week="شنبه",
+            start_time=time(8, 0),
+            end_time=time(10, 0),
+        )
+        makeup = MakeupClassSession.objects.create(
+            institution=self.institution,
+            class_session=session,
+            date=self.semester.start_date + timedelta(days=2),
+            start_time=time(14, 0),
+            end_time=time(16, 0),
+            classroom=self.classroom,
+        )
+        self.assertEqual(self._dates(session), [])
+
+        call_command("rebuild_class_occurrences", institution=self.institution.id, stdout=mock.MagicMock())
+
+        self.assertEqual(len(self._dates(session, makeup_session__isnull=True)), 9)
+        self.assertEqual(self._dates(session, makeup_session=makeup), [makeup.date])
+
+
+class RoomAvailabilityTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        room_availability.clear_availability_cache()
+        self.institution = Institution.objects.create(name="Uni", slug="uni-rooms")
+        self.user = User.objects.create_user(username="rooms", password="pass", institution=self.institution)
+        self.professor = Professor.objects.create(
+            institution=self.institution,
+            first_name="Nima",
+            last_name="Sadeghi",
+            national_code="1357924680",
+        )
+        self.course = Course.objects.create(
+            institution=self.institution,
+            code="C7",
+            title="Course 7",
+            professor=self.professor,
+            offer_code="O7",
+            unit_count=2,
+        )
+        self.building = Building.objects.create(title="Main", institution=self.institution)
+        self.annex = Building.objects.create(title="Annex", institution=self.institution)
+        self.classroom = Classroom.objects.create(title="701", building=self.building)
+        self.other_classroom = Classroom.objects.create(title="702", building=self.building)
+        self.annex_classroom = Classroom.objects.create(title="A1", building=self.annex)
+        # 2024-02-03 is a Saturday and starts an odd week.
+        self.semester = Semester.objects.create(
+            institution=self.institution,
+            title="Rooms",
+            start_date=date(2024, 2, 3),
+            end_date=date(2024, 3, 30),
+        )
+        self.session = ClassSession.objects.get(
+            pk=class_session_service.create_class_session(
+                {
+                    "course": self.course.id,
+                    "professor": self.professor.id,
+                    "classroom": self.classroom.id,
+                    "semester": self.semester.id,
+                    "day_of_week": "شنبه",
+                    "start_time": "10:00",
+                    "end_time": "12:00",
+                    "week_type": ClassSession.WeekTypeChoices.ODD,
+                },
+                self.institution,
+            )["id"]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _free_ids(self, day: date, start: time, end: time, **kwargs) -> list:
+        return [
+            room["classroom_id"]
+            for room in room_availability.find_free_classrooms(
+                self.institution.id, day=day, start_time=start, end_time=end, **kwargs
+            )
+        ]
+
+    def test_slot_mask_rounds_partial_slots_outward(self) -> None:
+        self.assertEqual(room_availability.slot_mask(time(0, 0), time(0, 5)), 0b1)
+        self.assertEqual(room_availability.slot_mask(time(0, 3), time(0, 11)), 0b111)
+        self.assertEqual(room_availability.slot_mask(time(10, 0), time(10, 0)), 0)
+        self.assertFalse(
+            room_availability.slot_mask(time(8, 0), time(10, 0))
+            & room_availability.slot_mask(time(10, 0), time(12, 0))
+        )
+
+    def test_rooms_follow_odd_and_even_weeks(self) -> None:
+        odd_saturday, even_saturday = date(2024, 2, 3), date(2024, 2, 10)
+
+        self.assertEqual(
+            self._free_ids(odd_saturday, time(11, 0), time(13, 0)),
+            [self.annex_classroom.id, self.other_classroom.id],
+        )
+        self.assertIn(self.classroom.id, self._free_ids(odd_saturday, time(8, 0), time(10, 0)))
+        self.assertIn(self.classroom.id, self._free_ids(even_saturday, time(11, 0), time(13, 0)))
+
+    def test_bitmaps_are_reused_until_the_timetable_changes(self) -> None:
+        day = date(2024, 2, 3)
+        self._free_ids(day, time(8, 0), time(9, 0))
+        with CaptureQueriesContext(connection) as queries:
+            self._free_ids(day, time(11, 0), time(12, 0))
+        # Only the two checks of the candidate rooms run; no bitmap is rebuilt.
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any("schedules_classoccurrence" in query["sql"] for query in queries))
+
+        class_adjustment_service.create_class_cancellation(
+            {"class_session": self.session.id, "date": day},
+            self.institution,
+        )
+        self.assertIn(self.classroom.id, self._free_ids(day, time(11, 0), time(12, 0)))
+
+    def test_rows_written_outside_the_services_keep_their_room_busy(self) -> None:
+        monday = date(2024, 2, 5)
+        self.assertIn(self.other_classroom.id, self._free_ids(monday, time(8, 0), time(9, 0)))
+
+        # Admin writes go through the bare ORM and never reach ClassOccurrence.
+        ClassSession.objects.create(
+            institution=self.institution,
+            course=self.course,
+            professor=self.professor,
+            classroom=self.other_classroom,
+            semester=self.semester,
+            day_of_week="دوشنبه",
+            start_time=time(8, 0),
+            end_time=time(9, 0),
+        )
+        MakeupClassSession.objects.create(
+            institution=self.institution,
+            class_session=self.session,
+            date=monday,
+            start_time=time(8, 30),
+            end_time=time(9, 30),
+            classroom=self.annex_classroom,
+        )
+
+        self.assertEqual(self._free_ids(monday, time(8, 0), time(9, 0)), [self.classroom.id])
+
+    def test_bitmaps_expire_after_the_maximum_age(self) -> None:
+        day = date(2024, 2, 3)
+        self._free_ids(day, time(8, 0), time(9, 0))
+        expired = time_module.monotonic() + room_availability.AVAILABILITY_MAX_AGE + 1
+        with mock.patch.object(room_availability.time_module, "monotonic", return_value=expired):
+            with CaptureQueriesContext(connection) as queries:
+                self._free_ids(day, time(8, 0), time(9, 0))
+        self.assertTrue(any("schedules_classoccurrence" in query["sql"] for query in queries))
+
+    def test_makeups_occupy_their_room(self) -> None:
+        monday = date(2024, 2, 5)
+        class_adjustment_service.create_makeup_class_session(
+            {
+                "class_session": self.session.id,
+                "date": monday,
+                "start_time": "14:00",
+                "end_time": "15:30",
+                "classroom": self.annex_classroom.id,
+            },
+            self.institution,
+        )
+
+        self.assertNotIn(self.annex_classroom.id, self._free_ids(monday, time(15, 0), time(16, 0)))
+        self.assertIn(self.annex_classroom.id, self._free_ids(monday, time(15, 30), time(16, 0)))
+
+    def test_building_filter(self) -> None:
+        self.assertEqual(
+            self._free_ids(date(2024, 2, 3), time(10, 0), time(12, 0), building_id=self.building.id),
+            [self.other_classroom.id],
+        )
+
+    def test_free_classrooms_endpoint(self) -> None:
+        response = self.client.get(
+            "/api/schedules/free-classrooms/",
+            {"date": "2024-02-03", "start_time": "10:00", "end_time": "12:00", "building": self.building.id},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["code"], "2619")
+        classrooms = response.data["data"]["classrooms"]
+        self.assertEqual([room["classroom_title"] for room in classrooms], ["702"])
+
+        invalid = self.client.get(
+            "/api/schedules/free-classrooms/",
+            {"date": "2024-02-03", "start_time": "12:00", "end_time": "10:00"},
+        )
+        self.assertEqual(invalid.status_code, ErrorCodes.VALIDATION_FAILED["status_code"])
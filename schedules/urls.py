@@ -10,6 +10,10 @@ app_name = "schedules"
 urlpatterns = [
     path("", class_session_view.list_class_sessions_view, name="list-class-sessions"),
     path("create/", class_session_view.create_class_session_view, name="create-class-session"),
+    path("import/", class_session_view.import_class_sessions_view, name="import-class-sessions"),
+    path("conflicts/", class_session_view.audit_class_session_conflicts_view, name="audit-class-session-conflicts"),
+    path("occurrences/", class_session_view.list_class_occurrences_view, name="list-class-occurrences"),
+    path("free-classrooms/", class_session_view.list_free_classrooms_view, name="list-free-classrooms"),
     path("<int:session_id>/", class_session_view.retrieve_class_session_view, name="retrieve-class-session"),
     path("<int:session_id>/update/", class_session_view.update_class_session_view, name="update-class-session"),
     path("<int:session_id>/delete/", class_session_view.delete_class_session_view, name="delete-class-session"),
@@ -8,7 +8,13 @@ from unischedule.core.exceptions import CustomValidationError
 from unischedule.core.success_codes import SuccessCodes
 from unischedule.core.error_codes import ErrorCodes
 
-from schedules.services import class_session_service
+from schedules.services import (
+    class_session_import,
+    class_session_service,
+    conflict_audit,
+    occurrence_service,
+    room_availability,
+)
 
 
 @api_view(["GET"])
@@ -162,3 +168,126 @@ def delete_class_session_view(request, session_id):
             status_code=ErrorCodes.CLASS_SESSION_DELETION_FAILED["status_code"],
             errors=ErrorCodes.CLASS_SESSION_DELETION_FAILED["errors"],
         )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def import_class_sessions_view(request):
+    """جلسات را به صورت گروهی از فایل CSV/JSON یا بدنهٔ JSON درخواست ثبت می‌کند."""
+    institution = request.user.institution
+    try:
+        upload = request.FILES.get("file")
+        if upload is not None:
+            import_format = request.data.get("format") or upload.name.rsplit(".", 1)[-1]
+            rows = class_session_import.parse_import_rows(
+                upload.read().decode("utf-8-sig"), import_format
+            )
+        else:
+            rows = request.data.get("rows") if hasattr(request.data, "get") else request.data
+        result = class_session_import.import_class_sessions(rows, institution)
+        return BaseResponse.success(
+            message=SuccessCodes.CLASS_SESSIONS_IMPORTED["message"],
+            code=SuccessCodes.CLASS_SESSIONS_IMPORTED["code"],
+            data=result,
+            status_code=status.HTTP_201_CREATED,
+        )
+    except CustomValidationError as e:
+        return BaseResponse.error(
+            message=e.detail["message"],
+            code=e.detail["code"],
+            status_code=e.status_code,
+            errors=e.detail["errors"],
+            data=e.detail["data"],
+        )
+    except UnicodeDecodeError:
+        return BaseResponse.error(
+            message=ErrorCodes.CLASS_SESSION_IMPORT_INVALID["message"],
+            code=ErrorCodes.CLASS_SESSION_IMPORT_INVALID["code"],
+            status_code=ErrorCodes.CLASS_SESSION_IMPORT_INVALID["status_code"],
+            errors={"file": ["فایل باید با کدگذاری UTF-8 باشد."]},
+        )
+    except Exception:
+        # خطاهای پیش‌بینی‌نشده (مانند شکست درج گروهی) با پیام کلی بازگردانده می‌شوند
+        return BaseResponse.error(
+            message=ErrorCodes.CLASS_SESSION_IMPORT_FAILED["message"],
+            code=ErrorCodes.CLASS_SESSION_IMPORT_FAILED["code"],
+            status_code=ErrorCodes.CLASS_SESSION_IMPORT_FAILED["status_code"],
+            errors=ErrorCodes.CLASS_SESSION_IMPORT_FAILED["errors"],
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def audit_class_session_conflicts_view(request):
+    """همهٔ جفت جلسات متداخل ترم (پیش‌فرض: ترم فعال) را بازمی‌گرداند."""
+    institution = request.user.institution
+    try:
+        semester_id = request.query_params.get("semester")
+        if semester_id not in (None, "") and not str(semester_id).isdigit():
+            return BaseResponse.error(
+                message=ErrorCodes.VALIDATION_FAILED["message"],
+                code=ErrorCodes.VALIDATION_FAILED["code"],
+                status_code=ErrorCodes.VALIDATION_FAILED["status_code"],
+                errors={"semester": ["شناسهٔ ترم باید عدد صحیح باشد."]},
+            )
+        semester = conflict_audit.get_audit_semester_or_404(
+            institution, int(semester_id) if semester_id else None
+        )
+        report = conflict_audit.audit_semester_conflicts(semester)
+        return BaseResponse.success(
+            message=SuccessCodes.CLASS_SESSION_CONFLICTS_AUDITED["message"],
+            code=SuccessCodes.CLASS_SESSION_CONFLICTS_AUDITED["code"],
+            data=report,
+        )
+    except CustomValidationError as e:
+        return BaseResponse.error(
+            message=e.detail["message"],
+            code=e.detail["code"],
+            status_code=e.status_code,
+            errors=e.detail["errors"],
+            data=e.detail["data"],
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def list_class_occurrences_view(request):
+    """رخدادهای تاریخ‌دار جلسات را برای یک تاریخ یا بازه (و در صورت نیاز یک کلاس یا استاد) برمی‌گرداند."""
+    institution = request.user.institution
+    try:
+        occurrences = occurrence_service.list_class_occurrences(institution, request.query_params)
+        return BaseResponse.success(
+            message=SuccessCodes.CLASS_OCCURRENCES_LISTED["message"],
+            code=SuccessCodes.CLASS_OCCURRENCES_LISTED["code"],
+            data={"occurrences": occurrences},
+        )
+    except CustomValidationError as e:
+        return BaseResponse.error(
+            message=e.detail["message"],
+            code=e.detail["code"],
+            status_code=e.status_code,
+            errors=e.detail["errors"],
+            data=e.detail["data"],
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def list_free_classrooms_view(request):
+    """کلاس‌های آزاد مؤسسه یا یک ساختمان را برای تاریخ و بازهٔ ساعتی درخواستی برمی‌گرداند."""
+    institution = request.user.institution
+    try:
+        result = room_availability.list_free_classrooms(institution, request.query_params)
+        return BaseResponse.success(
+            message=SuccessCodes.FREE_CLASSROOMS_LISTED["message"],
+            code=SuccessCodes.FREE_CLASSROOMS_LISTED["code"],
+            data=result,
+        )
+    except CustomValidationError as e:
+        return BaseResponse.error(
+            message=e.detail["message"],
+            code=e.detail["code"],
+            status_code=e.status_code,
+            errors=e.detail["errors"],
+            data=e.detail["data"],
+        )
@@ -14,6 +14,34 @@ from unischedule.core.exceptions import CustomValidationError
 from unischedule.core.error_codes import ErrorCodes
 
 
+def _invalidate_display_filter_plans(institution) -> None:
+    """Reset compiled display filter plans that depend on semester dates.
+
+    Args:
+        institution: مؤسسه‌ای که ترم‌های آن تغییر کرده است.
+
+    Notes:
+        واردات به صورت تنبل انجام می‌شود تا وابستگی حلقوی میان اپ‌ها ایجاد نشود.
+    """
+    from displays.services.filter_plan import invalidate_institution_filter_plans
+
+    invalidate_institution_filter_plans(institution)
+
+
+def _rebuild_class_occurrences(semester) -> None:
+    """Re-materialize the dated class occurrences of a semester whose dates changed.
+
+    Args:
+        semester: ترمی که تاریخ شروع یا پایان آن تغییر کرده است.
+
+    Notes:
+        واردات به صورت تنبل انجام می‌شود تا وابستگی حلقوی میان اپ‌ها ایجاد نشود.
+    """
+    from schedules.services.occurrence_service import rebuild_semester_occurrences
+
+    rebuild_semester_occurrences(semester)
+
+
 def list_semesters(institution):
     """Return all semesters of a given institution.
 
@@ -52,6 +80,7 @@ def create_semester(data, institution):
         semester_repository.deactivate_all_semesters(institution)
 
     semester = semester_repository.create_semester(validated_data)
+    _invalidate_display_filter_plans(institution)
     return SemesterSerializer(semester).data
 
 
@@ -78,7 +107,14 @@ def update_semester(semester, data):
     if validated_data.get("is_active", False):
         semester_repository.deactivate_all_semesters(semester.institution)
 
+    dates_changed = any(
+        field in validated_data and validated_data[field] != getattr(semester, field)
+        for field in ("start_date", "end_date")
+    )
     updated_semester = semester_repository.update_semester(semester, validated_data)
+    if dates_changed:
+        _rebuild_class_occurrences(updated_semester)
+    _invalidate_display_filter_plans(updated_semester.institution)
     return SemesterSerializer(updated_semester).data
 
 
@@ -88,7 +124,9 @@ def delete_semester(semester):
     Args:
         semester: نمونهٔ ترمی که باید حذف نرم شود.
     """
-    return semester_repository.soft_delete_semester(semester)
+    deleted = semester_repository.soft_delete_semester(semester)
+    _invalidate_display_filter_plans(semester.institution)
+    return deleted
 
 
 def get_semester_by_id_or_404(semester_id, institution):
@@ -133,4 +171,5 @@ def set_active_semester(semester):
     semester_repository.deactivate_all_semesters(semester.institution)
     semester.is_active = True
     semester.save()
+    _invalidate_display_filter_plans(semester.institution)
     return SemesterSerializer(semester).data
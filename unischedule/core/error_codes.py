@@ -368,6 +368,27 @@ class ErrorCodes:
         "errors": [],
         "data": {},
     }
+    CLASS_SESSION_IMPORT_INVALID = {
+        "code": "4615",
+        "message": "فایل یا ردیف‌های ورود گروهی جلسات نامعتبر است.",
+        "status_code": status.HTTP_400_BAD_REQUEST,
+        "errors": [],
+        "data": {},
+    }
+    CLASS_SESSION_IMPORT_CONFLICT = {
+        "code": "4616",
+        "message": "برخی از جلسات ورود گروهی با یکدیگر یا با جلسات موجود تداخل دارند.",
+        "status_code": status.HTTP_400_BAD_REQUEST,
+        "errors": [],
+        "data": {},
+    }
+    CLASS_SESSION_IMPORT_FAILED = {
+        "code": "4617",
+        "message": "ورود گروهی جلسات کلاس با خطا مواجه شد.",
+        "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "errors": [],
+        "data": {},
+    }
 
     # Display screens: 48xx is dedicated to signage endpoints.
     DISPLAY_SCREEN_NOT_FOUND = {
@@ -398,6 +419,27 @@ class ErrorCodes:
         "errors": [],
         "data": {},
     }
+    DISPLAY_PAYLOAD_VERSION_INVALID = {
+        "code": "4804",
+        "message": "نسخهٔ اعلام‌شده برای صفحه نمایش معتبر نیست.",
+        "status_code": status.HTTP_400_BAD_REQUEST,
+        "errors": [],
+        "data": {},
+    }
+    DISPLAY_BATCH_SLUGS_INVALID = {
+        "code": "4805",
+        "message": "فهرست شناسه‌های صفحه نمایش خالی یا بیش از حد مجاز است.",
+        "status_code": status.HTTP_400_BAD_REQUEST,
+        "errors": [],
+        "data": {},
+    }
+    DISPLAY_ROOM_FILTER_MISSING = {
+        "code": "4806",
+        "message": "این صفحه‌نمایش به کلاس یا ساختمان مشخصی محدود نشده است.",
+        "status_code": status.HTTP_400_BAD_REQUEST,
+        "errors": [],
+        "data": {},
+    }
 
     # Auth: 47xx concentrates on authentication and security workflows.
     INVALID_CREDENTIALS = {
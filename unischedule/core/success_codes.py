@@ -274,6 +274,26 @@ class SuccessCodes:
         "message": "جلسه جبرانی با موفقیت حذف شد.",
         "data": {},
     }
+    CLASS_SESSIONS_IMPORTED = {
+        "code": "2616",
+        "message": "جلسات کلاس با موفقیت به صورت گروهی ثبت شدند.",
+        "data": {},
+    }
+    CLASS_SESSION_CONFLICTS_AUDITED = {
+        "code": "2617",
+        "message": "بررسی تداخل جلسات ترم با موفقیت انجام شد.",
+        "data": {},
+    }
+    CLASS_OCCURRENCES_LISTED = {
+        "code": "2618",
+        "message": "لیست رخدادهای جلسات کلاس با موفقیت دریافت شد.",
+        "data": {},
+    }
+    FREE_CLASSROOMS_LISTED = {
+        "code": "2619",
+        "message": "لیست کلاس‌های آزاد با موفقیت دریافت شد.",
+        "data": {},
+    }
 
     # Display screens: 27xx is dedicated to digital signage endpoints.
     DISPLAY_SCREEN_CREATED = {
@@ -306,6 +326,31 @@ class SuccessCodes:
         "message": "اطلاعات صفحه نمایش با موفقیت بارگذاری شد.",
         "data": {},
     }
+    DISPLAY_SCREEN_UNCHANGED = {
+        "code": "2791",
+        "message": "اطلاعات صفحه نمایش تغییری نکرده است.",
+        "data": {},
+    }
+    DISPLAY_SCREEN_DELTA = {
+        "code": "2792",
+        "message": "تغییرات صفحه نمایش با موفقیت دریافت شد.",
+        "data": {},
+    }
+    DISPLAY_SCREENS_BATCH_RENDERED = {
+        "code": "2793",
+        "message": "اطلاعات صفحه‌های نمایش با موفقیت بارگذاری شد.",
+        "data": {},
+    }
+    DISPLAY_ROOM_NOW_NEXT = {
+        "code": "2794",
+        "message": "جلسهٔ جاری و بعدی کلاس با موفقیت بارگذاری شد.",
+        "data": {},
+    }
+    DISPLAY_SCREEN_BUNDLE = {
+        "code": "2795",
+        "message": "بستهٔ چندروزهٔ صفحه نمایش با موفقیت بارگذاری شد.",
+        "data": {},
+    }
 
     # ✅ Auth: success codes used by authentication flows.
     LOGIN_SUCCESS = {